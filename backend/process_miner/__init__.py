@@ -19,6 +19,12 @@ import process_miner.log_handling.graylog_access as ga
 import process_miner.log_handling.log_retriever as lr
 import process_miner.log_handling.log_tagger as lt
 import process_miner.mining.dataset_factory as dsf
+import process_miner.mining.util.data as data_util
+from process_miner.mining.dfg_cube import DfgCube
+from process_miner.mining.render_cache import RenderCache
+from process_miner.mining.render_pool import RenderPool
+from process_miner.mining.session_summaries import SessionSummaries
+from process_miner.mining.sharding import ShardedFrequencyCounter
 from process_miner.access.blueprints import logs, request_result, graphs, \
     metadata
 from process_miner.access.work.request_processing import RequestManager
@@ -72,12 +78,89 @@ def setup_components(process_miner_config_file=_DEFAULT_CONFIG_FILE,
                                 filter_cfg['filter_expressions'],
                                 taggers)
 
+    _setup_ingestion_listeners(retriever, Path(global_cfg['log_directory']))
+
     log.info('setting up metadata factory')
     dataset_factory = dsf.DatasetFactory(Path(global_cfg['log_directory']))
 
     return pm_cfg_loader, retriever, dataset_factory
 
 
+def _setup_ingestion_listeners(retriever: lr.LogRetriever,
+                               log_directory: Path) -> None:
+    # logs stored before the catalog existed aren't covered by the data
+    # derived from it
+    log.info('cataloging untracked logs')
+    retriever.catalog.add_untracked_files(
+        f'*.{data_util.FILE_EXTENSION}')
+
+    log.info('setting up DFG cube')
+    cube = DfgCube(log_directory)
+    if not cube.is_current():
+        log.info('building DFG cube from stored logs')
+        cube.rebuild()
+    retriever.add_ingestion_listener(cube)
+
+    log.info('setting up session summaries')
+    summaries = SessionSummaries(log_directory)
+    if not summaries.is_current():
+        log.info('building session summaries from stored logs')
+        summaries.rebuild()
+    retriever.add_ingestion_listener(summaries)
+
+
+def _create_render_cache(cfg: cl.ConfigurationLoader) -> RenderCache:
+    # the cache must not be located inside the log directory as that gets
+    # cleared when logs are retrieved forcefully
+    try:
+        directory = cfg.get_entry('global', 'render_cache_directory')
+    except KeyError:
+        directory = 'render_cache'
+    try:
+        max_size = int(cfg.get_entry('global', 'render_cache_size'))
+    except KeyError:
+        max_size = 100
+    log.info('caching up to %sMB of rendered graphs in "%s"', max_size,
+             directory)
+    return RenderCache(Path(directory), max_size * 1024 * 1024)
+
+
+def _create_render_pool(cfg: cl.ConfigurationLoader) -> RenderPool:
+    try:
+        workers = int(cfg.get_entry('global', 'render_workers'))
+    except KeyError:
+        workers = 2
+    try:
+        timeout = float(cfg.get_entry('global', 'render_timeout'))
+    except KeyError:
+        timeout = 60
+    log.info('rendering graphs with %s worker(s) and a timeout of %ss',
+             workers, timeout)
+    return RenderPool(workers, timeout)
+
+
+def _create_request_manager(cfg: cl.ConfigurationLoader,
+                            app: Flask) -> RequestManager:
+    try:
+        result_ttl = float(cfg.get_entry('global', 'result_ttl'))
+    except KeyError:
+        result_ttl = 600
+    try:
+        max_size = int(cfg.get_entry('global', 'result_store_size'))
+    except KeyError:
+        max_size = 200
+    log.info('keeping up to %sMB of request results for %ss', max_size,
+             result_ttl)
+    try:
+        pools = {pool: int(workers) for pool, workers
+                 in cfg.get_entry('global', 'request_pools').items()}
+    except KeyError:
+        pools = {}
+    return RequestManager(app, result_ttl=result_ttl,
+                          max_result_size=max_size * 1024 * 1024,
+                          pools=pools)
+
+
 def create_app():
     """
     Factory method for creating the Flask object representing the actual
@@ -96,13 +179,22 @@ def create_app():
     log.info('setting up cache')
     cache = Cache(process_miner_app, config={'CACHE_TYPE': 'simple'})
     log.info('linking request manager to flask app')
-    request_manager = RequestManager(process_miner_app)
+    request_manager = _create_request_manager(cfg, process_miner_app)
+    try:
+        mining_workers = int(cfg.get_entry('global', 'mining_workers'))
+    except KeyError:
+        mining_workers = 1
+    log.info('using %s worker process(es) for mining', mining_workers)
+    frequency_counter = ShardedFrequencyCounter(mining_workers)
+    render_cache = _create_render_cache(cfg)
+    render_pool = _create_render_pool(cfg)
 
     # create all required blueprints
     used_blueprints = [
         request_result.create_blueprint(request_manager),
         logs.create_blueprint(request_manager, cache, retriever),
-        graphs.create_blueprint(request_manager, cache, dataset_factory),
+        graphs.create_blueprint(request_manager, cache, graphs.GraphMiner(
+            dataset_factory, frequency_counter, render_cache, render_pool)),
         metadata.create_blueprint(request_manager, cache, dataset_factory)
     ]
     # register created blueprints on the flask app
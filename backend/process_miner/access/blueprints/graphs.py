@@ -2,17 +2,30 @@
 Blueprint module responsible for retrieving different graph types
 """
 import logging
-import os
+import mimetypes
+from typing import Dict, NamedTuple, Tuple
 
 import datauri
-from flask import Blueprint, request
+from flask import Blueprint, jsonify
 from flask_caching import Cache
-from werkzeug.utils import unescape
 
-from process_miner.access.blueprints.request_result import get_state_response
-from process_miner.access.work.request_processing import RequestManager
-from process_miner.mining import graphs, metadata
-from process_miner.mining.dataset_factory import DatasetFactory
+from process_miner.access.blueprints.request_parameters import \
+    get_unescaped_parameter, get_time_range_parameters, \
+    get_sampling_ratio_parameter, get_choice_parameter, \
+    get_simplification_parameters, get_heuristics_thresholds_parameters
+from process_miner.access.blueprints.request_result import \
+    get_state_response, BinaryResult
+from process_miner.access.work.request_processing import POOL_MINING, \
+    RequestManager
+from process_miner.mining import graphs, metadata, performance
+from process_miner.mining.dataset_factory import DatasetFactory, DataFilter
+from process_miner.mining.frequencies import Frequencies
+from process_miner.mining.graphs import HeuristicsThresholds
+from process_miner.mining.render_cache import RenderCache, get_cache_key
+from process_miner.mining.render_pool import RenderPool, RenderTimeoutError
+from process_miner.mining.sharding import ShardedFrequencyCounter
+from process_miner.mining.simplification import Simplification, \
+    simplify_frequencies
 
 log = logging.getLogger(__name__)
 
@@ -20,73 +33,294 @@ ARG_APPROACH = 'approach'
 ARG_METHOD_TYPE = 'method_type'
 ARG_ERROR_TYPE = 'error_type'
 ARG_BANK = 'bank'
+ARG_FORMAT = 'format'
+ARG_OUTPUT = 'output'
+FORMAT_JSON = 'json'
+OUTPUT_DATA_URI = 'datauri'
+OUTPUT_RAW = 'raw'
+
+
+# frequencies counted for a data set and the details describing the data set
+CountedFrequencies = Tuple[Frequencies, Dict]
+
+
+class GraphOutput(NamedTuple):
+    """
+    Describes how a graph is returned. The string representation is stable
+    and can therefore be used as part of cache keys.
+    """
+    output_format: str = 'svg'
+    output: str = OUTPUT_DATA_URI
+
+
+class GraphMiner:
+    """
+    Class used for mining graphs from the stored logs and rendering them.
+    Frequencies are answered from the DFG cube if possible, otherwise they
+    are counted by the frequency counter. Rendered graphs are looked up in
+    the render cache before they are rendered by the render pool.
+    """
+    def __init__(self, dataset_factory: DatasetFactory,
+                 frequency_counter: ShardedFrequencyCounter = None,
+                 render_cache: RenderCache = None,
+                 render_pool: RenderPool = None):
+        self.dataset_factory = dataset_factory
+        self.frequency_counter = frequency_counter \
+            or ShardedFrequencyCounter()
+        self.render_cache = render_cache
+        self.render_pool = render_pool or RenderPool()
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'frequency_counter <{self.frequency_counter}>, ' \
+               f'render_pool <{self.render_pool}>]'
+
+    def get_frequencies(self, data_filter: DataFilter,
+                        sampling_ratio: float) -> CountedFrequencies:
+        """
+        Counts the frequencies of the requested data set.
+        :param data_filter: describes the entries that should be included
+        :param sampling_ratio: fraction of sessions that should be sampled
+        :return: tuple containing the frequencies (scaled back up if
+        sessions were sampled) and the details describing the data set
+        """
+        # prefer the pre-aggregated cube which doesn't require reading logs
+        aggregate = None
+        if sampling_ratio >= 1:
+            aggregate = self.dataset_factory.get_aggregate(data_filter)
+        if aggregate is not None:
+            counts = aggregate.session_value_counts
+            return aggregate.frequencies, _get_details(
+                aggregate.session_count, 1.0, {
+                    'methods': counts['method'],
+                    'banks': counts['bank'],
+                    'errors': counts['errortype']
+                })
+        if sampling_ratio >= 1:
+            # mining effort depends on the number of variants instead of the
+            # number of sessions; metadata is still counted per session
+            variants = self.dataset_factory.get_variants(data_filter)
+            return self.frequency_counter.count_variants(variants), \
+                _get_details(variants.session_count, 1.0,
+                             _extract_metadata(variants.session_values))
+        frame = self.dataset_factory.get_filtered_data_frame(data_filter)
+        session_count = _extract_session_count(frame)
+        additional_metadata = _extract_metadata(frame)
+        sample, effective_ratio = self.dataset_factory.sample_sessions(
+            frame, sampling_ratio)
+        frequencies = self.frequency_counter.count(sample).scaled(
+            1 / effective_ratio)
+        return frequencies, _get_details(session_count, effective_ratio,
+                                         additional_metadata)
+
+    def create_dfg(self, counted: CountedFrequencies,
+                   simplification: Simplification,
+                   graph_output: GraphOutput):
+        """
+        Creates a Directly Follows Graph from counted frequencies.
+        :param counted: the frequencies and the details of their data set
+        :param simplification: describes how the graph should be simplified
+        :param graph_output: describes how the graph is returned
+        :return: the result of the request
+        """
+        frequencies, details = counted[0], dict(counted[1])
+        frequencies, details['pruned'] = simplify_frequencies(
+            frequencies, simplification)
+        structure = graphs.get_directly_follows_graph_structure(frequencies)
+        if graph_output.output_format == FORMAT_JSON:
+            return {'graph': structure, **details}
+
+        def _render_dfg(rendered_frequencies):
+            return graphs.render_directly_follows_graph(
+                rendered_frequencies, graph_output.output_format)
+        image, details['trimmed'] = self._render_image(
+            structure, graph_output.output_format,
+            lambda: _render_dfg(frequencies),
+            lambda: _render_dfg(graphs.trim_frequencies(frequencies)))
+        return _package_image(image, graph_output, details)
+
+    def create_heuristic_net(self, counted: CountedFrequencies,
+                             simplification: Simplification,
+                             thresholds: HeuristicsThresholds,
+                             graph_output: GraphOutput):
+        """
+        Mines a Heuristic Net from counted frequencies.
+        :param counted: the frequencies and the details of their data set
+        :param simplification: describes how the frequencies should be
+        simplified before mining
+        :param thresholds: thresholds used for pruning the net
+        :param graph_output: describes how the net is returned
+        :return: the result of the request
+        """
+        frequencies, details = counted[0], dict(counted[1])
+        frequencies, details['pruned'] = simplify_frequencies(
+            frequencies, simplification)
+        net = graphs.mine_heuristic_net(frequencies, thresholds)
+        structure = graphs.get_heuristic_net_structure(net)
+        if graph_output.output_format == FORMAT_JSON:
+            return {'graph': structure, **details}
+
+        def _render_net(rendered_net):
+            return graphs.draw_heuristic_net(rendered_net,
+                                             graph_output.output_format)
+        image, details['trimmed'] = self._render_image(
+            structure, graph_output.output_format, lambda: _render_net(net),
+            lambda: _render_net(graphs.mine_heuristic_net(
+                graphs.trim_frequencies(frequencies), thresholds)))
+        return _package_image(image, graph_output, details)
+
+    def create_performance_dfg(self, data_filter: DataFilter,
+                               graph_output: GraphOutput):
+        """
+        Creates a Directly Follows Graph whose edges are annotated with the
+        time passing between the connected activities.
+        :param data_filter: describes the entries that should be included
+        :param graph_output: describes how the graph is returned
+        :return: the result of the request
+        """
+        # transition times can't be pre-aggregated so the logs are always read
+        frame = self.dataset_factory.get_filtered_data_frame(data_filter)
+        details = _get_details(_extract_session_count(frame), 1.0,
+                               _extract_metadata(frame))
+        frequencies = self.frequency_counter.count(frame)
+        transition_times = performance.calculate_transition_times(frame)
+        structure = graphs.get_performance_graph_structure(frequencies,
+                                                           transition_times)
+        if graph_output.output_format == FORMAT_JSON:
+            return {'graph': structure, **details}
+
+        def _render_performance(rendered_frequencies):
+            return graphs.render_performance_graph(
+                rendered_frequencies, transition_times,
+                graph_output.output_format)
+        image, details['trimmed'] = self._render_image(
+            structure, graph_output.output_format,
+            lambda: _render_performance(frequencies),
+            lambda: _render_performance(graphs.trim_frequencies(frequencies)))
+        return _package_image(image, graph_output, details)
+
+    def _render_image(self, structure, output_format, render,
+                      render_trimmed):
+        # identical graphs are only laid out once even if they were mined
+        # from different filters or data versions
+        key = get_cache_key(structure, output_format)
+        if self.render_cache is not None:
+            image = self.render_cache.get(key)
+            if image is not None:
+                log.info('using cached rendering %s', key)
+                return image, False
+        try:
+            # a graph finishing after the timeout is still cached, so it
+            # doesn't have to be rendered again
+            return self.render_pool.render(
+                render, key, self._cache_rendering(key)), False
+        except RenderTimeoutError:
+            # a trimmed graph is better than no graph at all; it isn't cached
+            # so the complete graph is tried again on the next request
+            log.warning('rendering trimmed graph instead')
+        try:
+            return self.render_pool.render(render_trimmed), True
+        except RenderTimeoutError as error:
+            raise RenderTimeoutError(
+                f'neither the graph nor a trimmed version of it could be '
+                f'rendered: {error}') from error
+
+    def _cache_rendering(self, key):
+        if self.render_cache is None:
+            return None
+        return lambda image: self.render_cache.put(key, image)
+
+
+def _get_mimetype(output_format: str) -> str:
+    mimetype, _ = mimetypes.guess_type(f'graph.{output_format}')
+    return mimetype or 'application/octet-stream'
+
+
+def _get_data_filter():
+    approach = get_unescaped_parameter(ARG_APPROACH)
+    method_type = get_unescaped_parameter(ARG_METHOD_TYPE)
+    error_type = get_unescaped_parameter(ARG_ERROR_TYPE)
+    bank = get_unescaped_parameter(ARG_BANK)
+    start, end = get_time_range_parameters()
+    return DataFilter(approach, method_type, error_type, bank, start, end)
+
+
+def _get_graph_output():
+    return GraphOutput(
+        get_unescaped_parameter(ARG_FORMAT, 'svg'),
+        get_choice_parameter(ARG_OUTPUT, [OUTPUT_DATA_URI, OUTPUT_RAW],
+                             OUTPUT_DATA_URI))
+
+
+def _extract_session_count(frame):
+    return len(frame.groupby('correlationId'))
+
+
+def _extract_metadata(frame):
+    counts = metadata.get_sessions_per_value(
+        frame, ['method', 'bank', 'errortype'])
+    return {
+        'methods': counts['method'],
+        'banks': counts['bank'],
+        'errors': counts['errortype']
+    }
+
+
+def _get_details(session_count, sampling_ratio, additional_metadata):
+    return {
+        'numberOfSessions': session_count,
+        'samplingRatio': sampling_ratio,
+        'metadata': additional_metadata
+    }
+
+
+def _package_image(image, graph_output, details):
+    mimetype = _get_mimetype(graph_output.output_format)
+    if graph_output.output == OUTPUT_RAW:
+        return BinaryResult(image, mimetype, details)
+    uri = datauri.DataURI.make(mimetype, 'utf-8', True, image)
+    return {
+        # make sure there are no newlines/carriage returns in the uri
+        'image': uri.replace('\n', '').replace('\r', ''),
+        **details
+    }
 
 
 def create_blueprint(request_manager: RequestManager, cache: Cache,
-                     dataset_factory: DatasetFactory):
+                     miner: GraphMiner):
     """
     Creates an instance of the blueprint.
     """
     blueprint = Blueprint('graphs', __name__, url_prefix='/graphs')
 
-    def _get_filter_parameters():
-        approach = _get_unescaped_parameter(ARG_APPROACH)
-        method_type = _get_unescaped_parameter(ARG_METHOD_TYPE)
-        error_type = _get_unescaped_parameter(ARG_ERROR_TYPE)
-        bank = _get_unescaped_parameter(ARG_BANK)
-        return approach, bank, error_type, method_type
+    # the counts don't depend on the simplification or the thresholds, so
+    # changing those only repeats the pruning, mining and rendering
+    @cache.memoize()
+    def _get_cached_frequencies(data_filter, sampling_ratio, _data_version):
+        return miner.get_frequencies(data_filter, sampling_ratio)
 
-    def _get_unescaped_parameter(parameter, default=''):
-        return unescape(request.args.get(parameter, default, str))
+    # the data version is part of the cache key so results computed before
+    # new logs were retrieved are not reused
+    @cache.memoize()
+    def _create_dfg(data_filter, simplification, sampling_ratio,
+                    graph_output, data_version):
+        return miner.create_dfg(
+            _get_cached_frequencies(data_filter, sampling_ratio,
+                                    data_version),
+            simplification, graph_output)
 
+    # pylint: disable=too-many-arguments
     @cache.memoize()
-    def _create_dfg(approach, method_type, error_type, bank, output_format):
-        frame = dataset_factory.get_prepared_data_frame(approach,
-                                                        method_type,
-                                                        error_type,
-                                                        bank)
-        session_count = _extract_session_count(frame)
-        additional_metadata = _extract_metadata(frame)
-        dfg = graphs.create_directly_follows_graph(frame, output_format)
-        response = _package_response(dfg.name, session_count,
-                                     additional_metadata)
-        os.remove(dfg.name)
-        return response
+    def _create_heuristic_net(data_filter, simplification, thresholds,
+                              sampling_ratio, graph_output, *, data_version):
+        return miner.create_heuristic_net(
+            _get_cached_frequencies(data_filter, sampling_ratio,
+                                    data_version),
+            simplification, thresholds, graph_output)
 
     @cache.memoize()
-    def _create_heuristic_net(approach, method_type, error_type, bank,
-                              output_format):
-        frame = dataset_factory.get_prepared_data_frame(approach,
-                                                        method_type,
-                                                        error_type,
-                                                        bank)
-        session_count = _extract_session_count(frame)
-        additional_metadata = _extract_metadata(frame)
-        net = graphs.create_heuristic_net(frame, output_format)
-        return _package_response(net.name, session_count, additional_metadata)
-
-    def _extract_session_count(frame):
-        return len(frame.groupby('correlationId'))
-
-    def _extract_metadata(frame):
-        method_counts = metadata.get_sessions_per_method_type(frame)
-        bank_counts = metadata.get_sessions_per_bank(frame)
-        error_counts = metadata.get_sessions_per_error_type(frame)
-        return {
-            'methods': method_counts,
-            'banks': bank_counts,
-            'errors': error_counts
-        }
-
-    def _package_response(filename, session_count, additional_metadata):
-        uri = datauri.DataURI.from_file(filename, 'utf-8')
-        # make sure there are no newlines/carriage returns in the uri
-        sanitized_uri = uri.replace('\n', '').replace('\r', '')
-        return {
-            'image': sanitized_uri,
-            'numberOfSessions': session_count,
-            'metadata': additional_metadata
-        }
+    def _create_performance_dfg(data_filter, graph_output, _data_version):
+        return miner.create_performance_dfg(data_filter, graph_output)
 
     # pylint: disable=unused-variable
     @blueprint.route('dfg/get')
@@ -123,22 +357,173 @@ def create_blueprint(request_manager: RequestManager, cache: Cache,
             example: 'ADORSYS'
             description: the bank the data used for creating the graph
                          should be limited to
+          - name: from
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-01T00:00:00.000Z'
+            description: timestamp of the earliest log entry the data used for
+                         creating the graph should contain
+          - name: to
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-02T00:00:00.000Z'
+            description: timestamp of the latest log entry the data used for
+                         creating the graph should contain
+          - name: sample
+            in: query
+            type: number
+            default: 1
+            example: 0.1
+            description: fraction of sessions (stratified by approach and bank)
+                         that is used for mining; frequencies are scaled back
+                         up accordingly
+          - name: min_activity_frequency
+            in: query
+            type: integer
+            default: 0
+            example: 10
+            description: activities occurring less often are removed from
+                         the graph
+          - name: min_edge_frequency
+            in: query
+            type: integer
+            default: 0
+            example: 10
+            description: directly-follows relations occurring less often are
+                         removed from the graph
+          - name: max_edges
+            in: query
+            type: integer
+            example: 50
+            description: number of the most frequent directly-follows
+                         relations that are kept
+          - name: exclude
+            in: query
+            type: array
+            items:
+              type: string
+            collectionFormat: multi
+            default: []
+            example: ['_else_']
+            description: activities that are removed from the graph
           - name: format
             in: query
             type: string
             default: 'svg'
+            example: 'json'
+            description: format the graph is rendered to by graphviz (eg.
+                         svg or png); json returns the nodes, edges and
+                         frequencies of the graph without rendering it
+          - name: output
+            in: query
+            type: string
+            default: 'datauri'
+            enum: ['datauri', 'raw']
+            description: whether the rendered graph is returned as base64
+                         encoded DataURI inside of a JSON object or as raw
+                         bytes with the matching content type (ignored for
+                         the json format)
         responses:
           200:
-            description: The result will contain a base64 encoded DataURI
-                         representing the generated graph.
+            description: The result will contain the graph (as DataURI or in
+                         the json format), the ratio of sessions that was
+                         sampled, the pruned activities and number of
+                         pruned relations and whether the graph had to be
+                         trimmed because rendering it timed out. Raw graphs
+                         contain this information as JSON in the header
+                         X-Result-Details.
             schema:
               $ref: '#/definitions/RequestResponse'
         """
-        approach, bank, error_type, method_type = _get_filter_parameters()
-        output_format = _get_unescaped_parameter('format', 'svg')
-        ticket = request_manager.submit_ticketed(_create_dfg, approach,
-                                                 method_type, error_type, bank,
-                                                 output_format)
+        ticket = request_manager.submit_ticketed(
+            _create_dfg, _get_data_filter(), get_simplification_parameters(),
+            get_sampling_ratio_parameter(), _get_graph_output(),
+            miner.dataset_factory.get_data_version(), pool=POOL_MINING)
+        return get_state_response(ticket)
+
+    @blueprint.route('dfg/performance')
+    def get_performance_dfg():
+        """
+        Triggers the creation of a Directly Follows Graph whose edges are
+        annotated with the mean, median and 95th percentile of the time
+        passing between the connected activities.
+        ---
+        parameters:
+          - name: approach
+            in: query
+            type: string
+            default: ''
+            example: 'embedded'
+            description: the approach the data used for creating the graph
+                         should be limited to
+          - name: method_type
+            in: query
+            type: string
+            default: ''
+            example: 'get_transactions'
+            description: the method type the data used for creating the graph
+                         should be limited to
+          - name: error_type
+            in: query
+            type: string
+            default: ''
+            example: 'error_service_unavailable'
+            description: the error type the data used for creating the graph
+                         should be limited to
+          - name: bank
+            in: query
+            type: string
+            default: ''
+            example: 'ADORSYS'
+            description: the bank the data used for creating the graph
+                         should be limited to
+          - name: from
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-01T00:00:00.000Z'
+            description: timestamp of the earliest log entry the data used for
+                         creating the graph should contain
+          - name: to
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-02T00:00:00.000Z'
+            description: timestamp of the latest log entry the data used for
+                         creating the graph should contain
+          - name: format
+            in: query
+            type: string
+            default: 'svg'
+            example: 'json'
+            description: format the graph is rendered to by graphviz (eg.
+                         svg or png); json returns the nodes, edges and
+                         frequencies of the graph without rendering it
+          - name: output
+            in: query
+            type: string
+            default: 'datauri'
+            enum: ['datauri', 'raw']
+            description: whether the rendered graph is returned as base64
+                         encoded DataURI inside of a JSON object or as raw
+                         bytes with the matching content type (ignored for
+                         the json format)
+        responses:
+          200:
+            description: The result will contain the graph (as DataURI or in
+                         the json format including the transition times in
+                         seconds) and whether the graph had to be trimmed
+                         because rendering it timed out. Raw graphs contain
+                         this information as JSON in the header
+                         X-Result-Details.
+            schema:
+              $ref: '#/definitions/RequestResponse'
+        """
+        ticket = request_manager.submit_ticketed(
+            _create_performance_dfg, _get_data_filter(), _get_graph_output(),
+            miner.dataset_factory.get_data_version(), pool=POOL_MINING)
         return get_state_response(ticket)
 
     @blueprint.route('hn/get')
@@ -175,23 +560,128 @@ def create_blueprint(request_manager: RequestManager, cache: Cache,
             example: 'ADORSYS'
             description: the bank the data used for creating the net
                          should be limited to
+          - name: from
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-01T00:00:00.000Z'
+            description: timestamp of the earliest log entry the data used for
+                         creating the net should contain
+          - name: to
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-02T00:00:00.000Z'
+            description: timestamp of the latest log entry the data used for
+                         creating the net should contain
+          - name: sample
+            in: query
+            type: number
+            default: 1
+            example: 0.1
+            description: fraction of sessions (stratified by approach and bank)
+                         that is used for mining; frequencies are scaled back
+                         up accordingly
+          - name: min_activity_frequency
+            in: query
+            type: integer
+            default: 0
+            example: 10
+            description: activities occurring less often are removed from
+                         the graph
+          - name: min_edge_frequency
+            in: query
+            type: integer
+            default: 0
+            example: 10
+            description: directly-follows relations occurring less often are
+                         removed from the graph
+          - name: max_edges
+            in: query
+            type: integer
+            example: 50
+            description: number of the most frequent directly-follows
+                         relations that are kept
+          - name: exclude
+            in: query
+            type: array
+            items:
+              type: string
+            collectionFormat: multi
+            default: []
+            example: ['_else_']
+            description: activities that are removed from the graph
+          - name: dependency_threshold
+            in: query
+            type: number
+            default: 0.5
+            example: 0.6
+            description: minimum dependency measure (in the range [-1, 1])
+                         of relations included in the net
+          - name: and_threshold
+            in: query
+            type: number
+            default: 0.65
+            example: 0.65
+            description: minimum AND measure (in the range [0, 1]) of
+                         parallel branches of the net
+          - name: observation_threshold
+            in: query
+            type: integer
+            default: 1
+            example: 5
+            description: number of times a relation has to be observed to
+                         be included in the net
           - name: format
             in: query
             type: string
             default: 'svg'
+            example: 'json'
+            description: format the net is rendered to by graphviz (eg.
+                         svg or png); json returns the nodes, edges and
+                         frequencies of the net without rendering it
+          - name: output
+            in: query
+            type: string
+            default: 'datauri'
+            enum: ['datauri', 'raw']
+            description: whether the rendered net is returned as base64
+                         encoded DataURI inside of a JSON object or as raw
+                         bytes with the matching content type (ignored for
+                         the json format)
         responses:
           200:
-            description: The result will contain a base64 encoded DataURI
-                         representing the generated net.
+            description: The result will contain the net (as DataURI or in
+                         the json format), the ratio of sessions that was
+                         sampled, the pruned activities and number of
+                         pruned relations and whether the net had to be
+                         trimmed because rendering it timed out. Raw nets
+                         contain this information as JSON in the header
+                         X-Result-Details.
             schema:
               $ref: '#/definitions/RequestResponse'
         """
-        approach, bank, error_type, method_type = _get_filter_parameters()
-        output_format = _get_unescaped_parameter('format', 'svg')
-        ticket = request_manager.submit_ticketed(_create_heuristic_net,
-                                                 approach, method_type,
-                                                 error_type, bank,
-                                                 output_format)
+        ticket = request_manager.submit_ticketed(
+            _create_heuristic_net, _get_data_filter(),
+            get_simplification_parameters(),
+            get_heuristics_thresholds_parameters(),
+            get_sampling_ratio_parameter(), _get_graph_output(),
+            data_version=miner.dataset_factory.get_data_version(),
+            pool=POOL_MINING)
         return get_state_response(ticket)
 
+    @blueprint.route('render/metrics')
+    def get_render_metrics():
+        """
+        Retrieves metrics of the pool rendering the graphs.
+        ---
+        responses:
+          200:
+            description: Object containing the number of workers, the timeout
+                         per render job (in seconds), the number of queued
+                         and running jobs, the number of timed out jobs and
+                         statistics of the recent render times (in seconds).
+        """
+        return jsonify(miner.render_pool.get_metrics())
+
     return blueprint
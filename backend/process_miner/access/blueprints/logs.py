@@ -7,6 +7,7 @@ from distutils.util import strtobool
 from flask import Blueprint, request
 
 from process_miner.access.blueprints.request_result import get_state_response
+from process_miner.access.work.request_processing import POOL_RETRIEVAL
 
 log = logging.getLogger(__name__)
 
@@ -46,7 +47,8 @@ def create_blueprint(executor, cache, log_retriever):
                 $ref: '#/definitions/RequestResponse'
         """
         force = request.args.get('force', False, strtobool)
-        ticket = executor.submit_ticketed(_refresh_logs, force)
+        ticket = executor.submit_ticketed(_refresh_logs, force,
+                                          pool=POOL_RETRIEVAL)
         return get_state_response(ticket)
 
     return blueprint
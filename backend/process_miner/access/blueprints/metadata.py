@@ -4,10 +4,45 @@ Blueprint module responsible for retrieving different graph types
 from flask import Blueprint
 from flask_caching import Cache
 
+from process_miner.access.blueprints.request_parameters import \
+    get_approximation_parameter, get_time_range_parameters, \
+    get_choice_parameter, get_unescaped_parameter
 from process_miner.access.blueprints.request_result import get_state_response
-from process_miner.access.work.request_processing import RequestManager
+from process_miner.access.work.request_processing import POOL_INTERACTIVE, \
+    POOL_MINING, RequestManager
 from process_miner.mining import metadata
-from process_miner.mining.dataset_factory import DatasetFactory
+from process_miner.mining.dataset_factory import DatasetFactory, DataFilter
+from process_miner.mining.distinct import DISTINCT_FIELDS, get_error_bound
+from process_miner.mining.rollups import GRANULARITIES, ROLLUP_FIELDS
+
+ARG_APPROACH = 'approach'
+ARG_BANK = 'bank'
+ARG_FIELD = 'field'
+ARG_GRANULARITY = 'granularity'
+
+
+def _get_data_filter():
+    start, end = get_time_range_parameters()
+    return DataFilter(start=start, end=end)
+
+
+def _get_pool(dataset_factory: DatasetFactory, summarized: bool) -> str:
+    # requests that can't be answered from the summaries maintained during
+    # ingestion read all stored logs, so they are processed with the graph
+    # requests instead of holding up the cheap ones
+    if summarized and dataset_factory.has_current_summaries():
+        return POOL_INTERACTIVE
+    return POOL_MINING
+
+
+def _approximate(dataset_factory: DatasetFactory, estimate, exact):
+    # the sketches maintained during ingestion can only be used while they
+    # are current, exact results are returned otherwise
+    distinct = dataset_factory.get_distinct_counts()
+    if distinct is None:
+        return {**exact(), 'approximate': False, 'relativeErrorBound': 0.0}
+    return {**estimate(distinct), 'approximate': True,
+            'relativeErrorBound': get_error_bound()}
 
 
 def create_blueprint(request_manager: RequestManager, cache: Cache,
@@ -17,15 +52,77 @@ def create_blueprint(request_manager: RequestManager, cache: Cache,
     """
     blueprint = Blueprint('metadata', __name__, url_prefix='/metadata')
 
+    # the data version is part of the cache key so results computed before
+    # new logs were retrieved are not reused
+    # the counts maintained during ingestion are used if possible, otherwise
+    # the distinct values of each session cached with the variants are
+    # sufficient for counting sessions; approximated counts fall back to the
+    # cached exact counts while the sketches aren't current
+    @cache.memoize()
+    def _get_method_types_per_approach(data_filter, approximate,
+                                       data_version):
+        if approximate:
+            return _approximate(
+                dataset_factory,
+                lambda distinct: {
+                    'counts': distinct.count_methods_per_approach(
+                        data_filter.start, data_filter.end)},
+                lambda: {'counts': _get_method_types_per_approach(
+                    data_filter, False, data_version)})
+        counts = dataset_factory.get_metadata_counts(data_filter)
+        if counts is not None:
+            return counts.method_counts_per_approach
+        session_values = dataset_factory.get_variants(
+            data_filter).session_values
+        return metadata.get_method_type_count_per_approach(session_values)
+
+    @cache.memoize()
+    def _get_approach_type_counts(data_filter, approximate, data_version):
+        if approximate:
+            return _approximate(
+                dataset_factory,
+                lambda distinct: {'counts': distinct.count(
+                    'approach', data_filter.start, data_filter.end)},
+                lambda: {'counts': _get_approach_type_counts(
+                    data_filter, False, data_version)})
+        counts = dataset_factory.get_metadata_counts(data_filter)
+        if counts is not None:
+            return counts.approach_counts
+        session_values = dataset_factory.get_variants(
+            data_filter).session_values
+        return metadata.get_approach_type_count(session_values)
+
+    @cache.memoize()
+    def _get_sessions_per_value(field, data_filter, approximate,
+                                data_version):
+        if approximate:
+            return _approximate(
+                dataset_factory,
+                lambda distinct: {
+                    'counts': distinct.count(field, data_filter.start,
+                                             data_filter.end),
+                    'sessionCount': distinct.count_sessions(
+                        data_filter.start, data_filter.end)
+                },
+                lambda: _get_sessions_per_value(field, data_filter, False,
+                                                data_version))
+        variants = dataset_factory.get_variants(data_filter)
+        return {
+            'counts': metadata.get_session_count_per_value(
+                variants.session_values, field),
+            'sessionCount': variants.session_count,
+            'approximate': False,
+            'relativeErrorBound': 0.0
+        }
+
     @cache.memoize()
-    def _get_method_types_per_approach():
-        frame = dataset_factory.get_prepared_data_frame()
-        return metadata.get_method_type_count_per_approach(frame)
+    def _get_latencies(approach, bank, _data_version):
+        return dataset_factory.get_latencies().get_quantiles(approach, bank)
 
     @cache.memoize()
-    def _get_approach_type_counts():
-        frame = dataset_factory.get_prepared_data_frame()
-        return metadata.get_approach_type_count(frame)
+    def _get_time_series(field, granularity, start, end, _data_version):
+        return dataset_factory.get_rollups().get_series(field, granularity,
+                                                        start, end)
 
     # pylint: disable=unused-variable
     @blueprint.route('method/count')
@@ -33,17 +130,48 @@ def create_blueprint(request_manager: RequestManager, cache: Cache,
         """
         Triggers calculation of number of method types per approach.
         ---
+        parameters:
+          - name: from
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-01T00:00:00.000Z'
+            description: timestamp of the earliest log entry that should be
+                         considered
+          - name: to
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-02T00:00:00.000Z'
+            description: timestamp of the latest log entry that should be
+                         considered
+          - name: approximate
+            in: query
+            type: boolean
+            default: false
+            description: whether the counts may be estimated from sketches
+                         maintained during ingestion, which makes requests
+                         with a time range cheap (days containing the bounds
+                         of the range are included completely)
         response:
           200:
             description: The retrieved result will be a JSON object
                          representing the number of different method types per
-                         approach.
+                         approach. If approximate is true the counts are
+                         wrapped in an object stating whether they were
+                         estimated and the relative error bound of the
+                         estimates.
             application/json:
               schema:
                 $ref: '#/definitions/RequestResponse'
         """
+        approximate = get_approximation_parameter()
+        data_filter = _get_data_filter()
         ticket = request_manager.submit_ticketed(
-            _get_method_types_per_approach)
+            _get_method_types_per_approach, data_filter, approximate,
+            dataset_factory.get_data_version(),
+            pool=_get_pool(dataset_factory,
+                           approximate or not any(data_filter)))
         return get_state_response(ticket)
 
     @blueprint.route('approaches/count')
@@ -52,16 +180,193 @@ def create_blueprint(request_manager: RequestManager, cache: Cache,
         Computes which approach types are present in the available data and how
         many sessions each of them was used in.
         ---
+        parameters:
+          - name: from
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-01T00:00:00.000Z'
+            description: timestamp of the earliest log entry that should be
+                         considered
+          - name: to
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-02T00:00:00.000Z'
+            description: timestamp of the latest log entry that should be
+                         considered
+          - name: approximate
+            in: query
+            type: boolean
+            default: false
+            description: whether the counts may be estimated from sketches
+                         maintained during ingestion, which makes requests
+                         with a time range cheap (days containing the bounds
+                         of the range are included completely)
         response:
           200:
             description: The retrieved result will be a JSON object
                          representing the number of sessions each approach was
-                         used in.
+                         used in. If approximate is true the counts are
+                         wrapped in an object stating whether they were
+                         estimated and the relative error bound of the
+                         estimates.
+            application/json:
+              schema:
+                $ref: '#/definitions/RequestResponse'
+        """
+        approximate = get_approximation_parameter()
+        data_filter = _get_data_filter()
+        ticket = request_manager.submit_ticketed(
+            _get_approach_type_counts, data_filter, approximate,
+            dataset_factory.get_data_version(),
+            pool=_get_pool(dataset_factory,
+                           approximate or not any(data_filter)))
+        return get_state_response(ticket)
+
+    @blueprint.route('sessions/count')
+    def get_session_count():
+        """
+        Counts the distinct sessions each value of a field occurs in.
+        ---
+        parameters:
+          - name: field
+            in: query
+            type: string
+            default: 'approach'
+            enum: ['approach', 'bank', 'errortype']
+            description: the field whose values should be counted
+          - name: from
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-01T00:00:00.000Z'
+            description: timestamp of the earliest log entry that should be
+                         considered
+          - name: to
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-02T00:00:00.000Z'
+            description: timestamp of the latest log entry that should be
+                         considered
+          - name: approximate
+            in: query
+            type: boolean
+            default: false
+            description: whether the counts may be estimated from sketches
+                         maintained during ingestion, which makes requests
+                         with a time range cheap (days containing the bounds
+                         of the range are included completely)
+        response:
+          200:
+            description: The retrieved result will be a JSON object
+                         containing the number of sessions per value, the
+                         total number of sessions, whether they were
+                         estimated and the relative error bound of the
+                         estimates (exceeded by about 5% of them).
             application/json:
               schema:
                 $ref: '#/definitions/RequestResponse'
         """
-        ticket = request_manager.submit_ticketed(_get_approach_type_counts)
+        field = get_choice_parameter(ARG_FIELD, DISTINCT_FIELDS, 'approach')
+        approximate = get_approximation_parameter()
+        ticket = request_manager.submit_ticketed(
+            _get_sessions_per_value, field, _get_data_filter(), approximate,
+            dataset_factory.get_data_version(),
+            pool=_get_pool(dataset_factory, approximate))
+        return get_state_response(ticket)
+
+    @blueprint.route('timeseries')
+    def get_time_series():
+        """
+        Counts the sessions per time bucket, in total and for each value of a
+        field. Sessions are counted in the bucket of their first entry.
+        ---
+        parameters:
+          - name: field
+            in: query
+            type: string
+            default: 'approach'
+            enum: ['approach', 'method', 'bank', 'errortype', 'status']
+            description: the field whose values should be counted
+          - name: granularity
+            in: query
+            type: string
+            default: 'day'
+            enum: ['hour', 'day']
+            description: the duration of a bucket
+          - name: from
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-01T00:00:00.000Z'
+            description: timestamp within the first bucket that should be
+                         considered
+          - name: to
+            in: query
+            type: string
+            default: ''
+            example: '2020-06-02T00:00:00.000Z'
+            description: timestamp within the last bucket that should be
+                         considered
+        response:
+          200:
+            description: The retrieved result will be a JSON object
+                         containing the buckets, the number of sessions per
+                         bucket, the number of sessions per bucket for each
+                         value of the field and the sums of those over the
+                         whole time range.
+            application/json:
+              schema:
+                $ref: '#/definitions/RequestResponse'
+        """
+        field = get_choice_parameter(ARG_FIELD, ROLLUP_FIELDS, 'approach')
+        granularity = get_choice_parameter(ARG_GRANULARITY,
+                                           list(GRANULARITIES), 'day')
+        start, end = get_time_range_parameters()
+        ticket = request_manager.submit_ticketed(
+            _get_time_series, field, granularity, start, end,
+            dataset_factory.get_data_version(),
+            pool=_get_pool(dataset_factory, True))
+        return get_state_response(ticket)
+
+    @blueprint.route('latency')
+    def get_latency():
+        """
+        Estimates the median, 95th and 99th percentile of the session
+        durations and of the latency of each activity (the time until the
+        next entry of its session) in seconds.
+        ---
+        parameters:
+          - name: approach
+            in: query
+            type: string
+            default: ''
+            example: 'embedded'
+            description: the approach the sessions should be limited to
+          - name: bank
+            in: query
+            type: string
+            default: ''
+            example: 'ADORSYS'
+            description: the bank the sessions should be limited to
+        response:
+          200:
+            description: The retrieved result will be a JSON object
+                         containing the number of values and the estimated
+                         percentiles of the session durations and of the
+                         latencies of each activity as well as the relative
+                         accuracy of the estimates.
+            application/json:
+              schema:
+                $ref: '#/definitions/RequestResponse'
+        """
+        ticket = request_manager.submit_ticketed(
+            _get_latencies, get_unescaped_parameter(ARG_APPROACH) or None,
+            get_unescaped_parameter(ARG_BANK) or None,
+            dataset_factory.get_data_version(),
+            pool=_get_pool(dataset_factory, True))
         return get_state_response(ticket)
 
     return blueprint
@@ -0,0 +1,177 @@
+"""
+Module for parsing request parameters that are shared by multiple blueprints
+"""
+import logging
+from typing import List, Optional, Tuple
+
+from flask import abort, request
+from werkzeug.utils import unescape
+
+import process_miner.log_handling.graylog_access as ga
+from process_miner.mining.graphs import HeuristicsThresholds
+from process_miner.mining.simplification import Simplification
+
+log = logging.getLogger(__name__)
+
+ARG_FROM = 'from'
+ARG_TO = 'to'
+ARG_SAMPLE = 'sample'
+ARG_APPROXIMATE = 'approximate'
+ARG_MIN_ACTIVITY_FREQUENCY = 'min_activity_frequency'
+ARG_MIN_EDGE_FREQUENCY = 'min_edge_frequency'
+ARG_MAX_EDGES = 'max_edges'
+ARG_EXCLUDE = 'exclude'
+ARG_DEPENDENCY_THRESHOLD = 'dependency_threshold'
+ARG_AND_THRESHOLD = 'and_threshold'
+ARG_OBSERVATION_THRESHOLD = 'observation_threshold'
+
+
+def get_unescaped_parameter(parameter: str, default='') -> str:
+    """
+    Retrieves the unescaped value of a query parameter of the current request.
+    :param parameter: name of the parameter
+    :param default: value used if the parameter is missing
+    :return: the value of the parameter
+    """
+    return unescape(request.args.get(parameter, default, str))
+
+
+def get_time_range_parameters() -> Tuple[Optional[str], Optional[str]]:
+    """
+    Retrieves the time range of the current request. Both bounds are optional
+    and have to be supplied in the timestamp format used by Graylog. Invalid
+    values result in a response with status code 400.
+    :return: tuple containing the normalized lower and upper bound (None if
+    not supplied)
+    """
+    start = _get_timestamp_parameter(ARG_FROM)
+    end = _get_timestamp_parameter(ARG_TO)
+    if start and end and start > end:
+        log.info('invalid time range from "%s" to "%s"', start, end)
+        abort(400, f'"{ARG_FROM}" has to be before "{ARG_TO}"')
+    return start, end
+
+
+def get_sampling_ratio_parameter() -> float:
+    """
+    Retrieves the fraction of sessions that should be sampled for the current
+    request. Values outside of the range (0, 1] result in a response with
+    status code 400.
+    :return: the fraction (1.0 if no sampling was requested)
+    """
+    value = get_unescaped_parameter(ARG_SAMPLE)
+    if not value:
+        return 1.0
+    try:
+        ratio = float(value)
+    except ValueError:
+        ratio = None
+    if ratio is None or not 0 < ratio <= 1:
+        log.info('invalid sampling ratio "%s"', value)
+        abort(400, f'"{ARG_SAMPLE}" has to be a number in the range (0, 1]')
+    return ratio
+
+
+def get_approximation_parameter() -> bool:
+    """
+    Retrieves whether the current request may be answered by estimates
+    instead of exact results. Values other than true and false result in a
+    response with status code 400.
+    :return: whether estimates are allowed
+    """
+    return get_choice_parameter(ARG_APPROXIMATE, ['true', 'false'],
+                                'false') == 'true'
+
+
+def get_choice_parameter(parameter: str, choices: List[str],
+                         default: str) -> str:
+    """
+    Retrieves the value of a query parameter that is limited to a fixed set
+    of values. Other values result in a response with status code 400.
+    :param parameter: name of the parameter
+    :param choices: the allowed values
+    :param default: value used if the parameter is missing
+    :return: the value of the parameter
+    """
+    value = get_unescaped_parameter(parameter, default)
+    if value not in choices:
+        log.info('invalid value "%s" for parameter "%s"', value, parameter)
+        abort(400, f'"{parameter}" has to be one of {", ".join(choices)}')
+    return value
+
+
+def get_simplification_parameters() -> Simplification:
+    """
+    Retrieves how the graph of the current request should be simplified. The
+    frequencies and the number of edges have to be non-negative integers,
+    other values result in a response with status code 400. Excluded
+    activities are supplied by repeating the exclude parameter.
+    :return: the simplification (keeping the graph unchanged if no
+    parameters were supplied)
+    """
+    max_edges = _get_count_parameter(ARG_MAX_EDGES)
+    excluded = {unescape(value) for value in request.args.getlist(ARG_EXCLUDE)
+                if value}
+    return Simplification(
+        _get_count_parameter(ARG_MIN_ACTIVITY_FREQUENCY) or 0,
+        _get_count_parameter(ARG_MIN_EDGE_FREQUENCY) or 0,
+        max_edges, tuple(sorted(excluded)))
+
+
+def get_heuristics_thresholds_parameters() -> HeuristicsThresholds:
+    """
+    Retrieves the thresholds of the heuristics miner for the current request.
+    The dependency threshold has to be in the range [-1, 1], the AND
+    threshold in the range [0, 1] and the observation threshold a
+    non-negative integer, other values result in a response with status code
+    400. Missing thresholds are set to their default.
+    :return: the thresholds
+    """
+    defaults = HeuristicsThresholds()
+    dependency = _get_bounded_parameter(ARG_DEPENDENCY_THRESHOLD, -1, 1)
+    and_measure = _get_bounded_parameter(ARG_AND_THRESHOLD, 0, 1)
+    observations = _get_count_parameter(ARG_OBSERVATION_THRESHOLD)
+    return HeuristicsThresholds(
+        defaults.dependency if dependency is None else dependency,
+        defaults.and_measure if and_measure is None else and_measure,
+        defaults.observations if observations is None else observations)
+
+
+def _get_bounded_parameter(parameter: str, lower: float,
+                           upper: float) -> Optional[float]:
+    value = get_unescaped_parameter(parameter)
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is None or not lower <= number <= upper:
+        log.info('invalid value "%s" for parameter "%s"', value, parameter)
+        abort(400, f'"{parameter}" has to be a number in the range '
+                   f'[{lower}, {upper}]')
+    return number
+
+
+def _get_count_parameter(parameter: str) -> Optional[int]:
+    value = get_unescaped_parameter(parameter)
+    if not value:
+        return None
+    if not value.isdecimal():
+        log.info('invalid value "%s" for parameter "%s"', value, parameter)
+        abort(400, f'"{parameter}" has to be a non-negative integer')
+    return int(value)
+
+
+def _get_timestamp_parameter(parameter: str) -> Optional[str]:
+    value = get_unescaped_parameter(parameter)
+    if not value:
+        return None
+    if not ga.timestamp_format_is_valid(value):
+        log.info('invalid timestamp "%s" for parameter "%s"', value,
+                 parameter)
+        abort(400, f'"{parameter}" has to be a timestamp in the format '
+                   f'{ga.GRAYLOG_TIMESTAMP_FORMAT}')
+    # normalize the precision to the one used in the stored logs
+    return ga.get_timestamp_from_datetime(
+        ga.get_datetime_from_timestamp(value))
@@ -1,13 +1,52 @@
 """
 Blueprint module for accessing request states and results
 """
+import json
 import logging
+from typing import Dict
 
-from flask import abort, Blueprint, jsonify, url_for
+from flask import abort, Blueprint, jsonify, Response, url_for
+
+from process_miner.access.work.request_processing import \
+    RequestNotFoundError
+from process_miner.mining.render_pool import RenderTimeoutError
 
 log = logging.getLogger(__name__)
 
 USE_EXTERNAL_URLS = True
+DETAILS_HEADER = 'X-Result-Details'
+
+
+class BinaryResult:
+    """
+    Class for request results that are delivered as raw bytes instead of
+    JSON. The scalar fields of the additional information about the result
+    are supplied as JSON in the header X-Result-Details. Nested fields like
+    metadata counts can grow beyond the header size limits of proxies, so
+    they are left out.
+    """
+    def __init__(self, data: bytes, mimetype: str, details: Dict = None):
+        self.data = data
+        self.mimetype = mimetype
+        self.details = details or {}
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'data <{len(self.data)} bytes>, ' \
+               f'mimetype <{self.mimetype}>, ' \
+               f'details <{self.details}>]'
+
+    def to_response(self) -> Response:
+        """
+        Creates the response delivering the result.
+        :return: the response
+        """
+        scalar_details = {key: value for key, value in self.details.items()
+                          if value is None
+                          or isinstance(value, (str, int, float, bool))}
+        return Response(self.data, mimetype=self.mimetype, headers={
+            DETAILS_HEADER: json.dumps(scalar_details)
+        })
 
 
 def get_state_response(ticket_id: str):
@@ -65,10 +104,19 @@ def create_blueprint(request_manager):
             application/json:
               schema:
                 $ref: '#/definitions/StateResponse'
+          404:
+            description: The request is unknown or its result was already
+                         retrieved, expired or evicted. The reason is stated
+                         in the response.
         """
-        # TODO 404 on invalid request_id or no futures
+        try:
+            done = request_manager.request_processed(request_id)
+        except RequestNotFoundError as error:
+            log.info('state of request "%s" unavailable: %s', request_id,
+                     error)
+            abort(404, str(error))
         return jsonify({
-            'done': request_manager.request_processed(request_id),
+            'done': done,
             'resultUrl':
                 url_for('requests.get_result',
                         request_id=request_id,
@@ -92,15 +140,58 @@ def create_blueprint(request_manager):
               schema:
                 description: object defined by the type of request
                 type: object
+            image/*:
+              schema:
+                description: raw bytes of a graph requested with
+                             output=raw; the number of sessions, the
+                             sampling ratio and whether the graph was
+                             trimmed are contained as JSON in the header
+                             X-Result-Details
+                type: string
+                format: binary
+          404:
+            description: The request isn't finished yet, is unknown or its
+                         result was already retrieved, expired or evicted.
+                         The reason is stated in the response.
+          503:
+            description: The requested graph couldn't be rendered within the
+                         render timeout, even after trimming it.
         """
-        if not request_manager.request_processed(request_id):
-            log.info('request "%s" not done or result already retrieved',
-                     request_id)
-            abort(404)
-        result = request_manager.get_result(request_id)
+        try:
+            result = request_manager.get_result(request_id)
+        except RequestNotFoundError as error:
+            log.info('result of request "%s" unavailable: %s', request_id,
+                     error)
+            abort(404, str(error))
+        except RenderTimeoutError as error:
+            log.warning('request "%s" failed: %s', request_id, error)
+            abort(503, str(error))
         log.debug(result)
+        if isinstance(result, BinaryResult):
+            return result.to_response()
         if not result:
             return jsonify({})
         return jsonify(result)
 
+    @blueprint.route('metrics')
+    def get_metrics():
+        """
+        Retrieves metrics of the stored results of the requests and of the
+        pools processing them.
+        ---
+        responses:
+          200:
+            description: Object containing the time results are kept after
+                         their request finished (in seconds), the maximum
+                         size of all stored results (in bytes), the number of
+                         stored and running requests, the size of the stored
+                         results and the number of results that were
+                         retrieved, expired or evicted. For each executor
+                         pool it contains the number of workers, the queue
+                         depth, the number of running requests and
+                         statistics of the time recent requests waited for a
+                         worker (in seconds).
+        """
+        return jsonify(request_manager.get_metrics())
+
     return blueprint
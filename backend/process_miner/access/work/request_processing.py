@@ -1,10 +1,47 @@
 """
 Module for handling asynchronous request processing
 """
+import json
+import logging
+import sys
 import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, List, Optional
 
 from flask_executor import Executor
 
+log = logging.getLogger(__name__)
+
+POOL_INTERACTIVE = 'interactive'
+POOL_MINING = 'mining'
+POOL_RETRIEVAL = 'retrieval'
+# maximum number of jobs executed at the same time per pool
+DEFAULT_POOLS = {POOL_INTERACTIVE: 4, POOL_MINING: 2, POOL_RETRIEVAL: 1}
+# number of recent queue wait times the metrics are calculated from
+RECORDED_WAIT_TIMES = 100
+DEFAULT_RESULT_TTL = 600
+DEFAULT_MAX_RESULT_SIZE = 200 * 1024 * 1024
+# number of removed requests whose reason of removal is remembered
+REMEMBERED_REQUESTS = 10000
+
+REASON_UNKNOWN = 'no request with this id was submitted'
+REASON_RETRIEVED = 'the result was already retrieved'
+REASON_EXPIRED = 'the result expired as it wasn\'t retrieved within {} ' \
+                 'seconds'
+REASON_EVICTED = 'the result was evicted to limit the memory used by ' \
+                 'stored results'
+REASON_PROCESSING = 'the request is still being processed'
+
+
+class RequestNotFoundError(LookupError):
+    """
+    Raised if the result of a request isn't available. The message states
+    the reason.
+    """
+
 
 class _TicketDispenser:
     """
@@ -31,24 +68,282 @@ class _TicketDispenser:
         return str(ticket)
 
 
+class _ExecutorPool:
+    """
+    Class wrapping an Executor with its own concurrency limit. It keeps track
+    of the queued and running jobs and of how long jobs waited for a worker.
+    """
+    def __init__(self, app, name: str, workers: int):
+        self.name = name
+        self.workers = max(1, workers)
+        executor = Executor(None, name)
+        if app is not None:
+            app.config.setdefault(executor.EXECUTOR_MAX_WORKERS, self.workers)
+            executor.init_app(app)
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._wait_times = deque(maxlen=RECORDED_WAIT_TIMES)
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'name <{self.name}>, ' \
+               f'workers <{self.workers}>, ' \
+               f'_queued <{self._queued}>, ' \
+               f'_running <{self._running}>]'
+
+    def submit(self, function: Callable, *args, **kwargs) -> Future:
+        """
+        Submits a function for execution by one of the workers of the pool.
+        :param function: the function
+        :param args: the functions arguments
+        :return: the future of the execution
+        """
+        with self._lock:
+            self._queued += 1
+        return self._executor.submit(self._run, time.monotonic(), function,
+                                     args, kwargs)
+
+    def get_metrics(self) -> Dict:
+        """
+        Collects the current state of the pool and statistics about the time
+        recent jobs waited for a worker.
+        :return: dict containing the metrics
+        """
+        with self._lock:
+            wait_times = list(self._wait_times)
+            metrics = {
+                'workers': self.workers,
+                'queueDepth': self._queued,
+                'running': self._running
+            }
+        metrics['queueWait'] = {
+            'count': len(wait_times),
+            'mean': sum(wait_times) / len(wait_times)
+                    if wait_times else None,
+            'max': max(wait_times, default=None)
+        }
+        return metrics
+
+    def _run(self, submitted: float, function: Callable, args, kwargs):
+        wait_time = time.monotonic() - submitted
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_times.append(wait_time)
+        log.debug('job of pool "%s" waited %.3fs for a worker', self.name,
+                  wait_time)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+
+@dataclass
+class _StoredRequest:
+    """
+    Class containing the future of a request, when it was seen finished and
+    the size of its result.
+    """
+    future: Future
+    finished: Optional[float] = None
+    size: int = 0
+
+
+class _ResultStore:
+    """
+    Class for keeping the futures of submitted requests until their results
+    are retrieved. Results that aren't retrieved within the TTL after their
+    request finished are removed, as are the oldest results once all stored
+    results exceed the maximum size. Results shared by multiple requests are
+    counted once and evicted together. Results exceeding the maximum size on
+    their own aren't counted and are only removed once they expire. The
+    store is cleaned up whenever it is accessed.
+    """
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._requests: Dict[str, _StoredRequest] = OrderedDict()
+        self._removed: Dict[str, str] = OrderedDict()
+        self._size = 0
+        self._removals = {REASON_RETRIEVED: 0, REASON_EXPIRED: 0,
+                          REASON_EVICTED: 0}
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'ttl <{self.ttl}>, ' \
+               f'max_size <{self.max_size}>, ' \
+               f'_requests <{len(self._requests)}>, ' \
+               f'_size <{self._size}>]'
+
+    def add(self, request_id: str, future: Future) -> None:
+        """
+        Stores the future of a request.
+        :param request_id: id of the request
+        :param future: the future
+        """
+        with self._lock:
+            self._requests[request_id] = _StoredRequest(future)
+            self._clean_up()
+
+    def get(self, request_id: str) -> Future:
+        """
+        Returns the future of a request.
+        :param request_id: id of the request
+        :return: the future
+        :raises RequestNotFoundError: if the request isn't stored (anymore)
+        """
+        with self._lock:
+            self._clean_up()
+            return self._get(request_id).future
+
+    def pop(self, request_id: str) -> Future:
+        """
+        Returns the future of a request and removes it from the store.
+        :param request_id: id of the request
+        :return: the future
+        :raises RequestNotFoundError: if the request isn't stored (anymore)
+        """
+        with self._lock:
+            self._clean_up()
+            future = self._get(request_id).future
+            self._remove(request_id, REASON_RETRIEVED)
+            self._clean_up()
+            return future
+
+    def get_metrics(self) -> Dict:
+        """
+        Collects the current state of the store and the number of removed
+        results per reason.
+        :return: dict containing the metrics
+        """
+        with self._lock:
+            self._clean_up()
+            return {
+                'ttl': self.ttl,
+                'maxResultSize': self.max_size,
+                'stored': len(self._requests),
+                'running': sum(1 for stored in self._requests.values()
+                               if stored.finished is None),
+                'resultSize': self._size,
+                'retrieved': self._removals[REASON_RETRIEVED],
+                'expired': self._removals[REASON_EXPIRED],
+                'evicted': self._removals[REASON_EVICTED]
+            }
+
+    def _get(self, request_id: str) -> _StoredRequest:
+        if request_id not in self._requests:
+            reason = self._removed.get(request_id, REASON_UNKNOWN)
+            if reason == REASON_EXPIRED:
+                reason = reason.format(self.ttl)
+            raise RequestNotFoundError(reason)
+        return self._requests[request_id]
+
+    def _remove(self, request_id: str, reason: str) -> None:
+        del self._requests[request_id]
+        self._removals[reason] += 1
+        self._removed[request_id] = reason
+        while len(self._removed) > REMEMBERED_REQUESTS:
+            self._removed.popitem(last=False)
+
+    def _clean_up(self) -> None:
+        now = time.monotonic()
+        # ids of the requests sharing each finished result, oldest first
+        results: Dict[Future, List[str]] = OrderedDict()
+        sizes: Dict[Future, int] = {}
+        for request_id, stored in list(self._requests.items()):
+            if stored.finished is None:
+                if not stored.future.done():
+                    continue
+                stored.finished = now
+                stored.size = sizes[stored.future] \
+                    if stored.future in sizes \
+                    else self._measure(request_id, stored.future)
+            elif now - stored.finished > self.ttl:
+                log.info('result of request "%s" expired', request_id)
+                self._remove(request_id, REASON_EXPIRED)
+                continue
+            sizes[stored.future] = stored.size
+            results.setdefault(stored.future, []).append(request_id)
+        counted = {future: size for future, size in sizes.items()
+                   if size <= self.max_size}
+        self._size = sum(counted.values())
+        for future, request_ids in results.items():
+            if self._size <= self.max_size:
+                break
+            if future not in counted:
+                continue
+            log.info('evicting result of requests %s (%s bytes)',
+                     request_ids, counted[future])
+            for request_id in request_ids:
+                self._remove(request_id, REASON_EVICTED)
+            self._size -= counted[future]
+
+    def _measure(self, request_id: str, future: Future) -> int:
+        size = _get_result_size(future)
+        if size > self.max_size:
+            log.warning('result of request "%s" (%s bytes) exceeds the '
+                        'maximum size of stored results and is kept until '
+                        'it expires', request_id, size)
+        return size
+
+
+def _get_result_size(future: Future) -> int:
+    if future.cancelled() or future.exception() is not None:
+        return 0
+    result = future.result()
+    data = getattr(result, 'data', None)
+    if isinstance(data, bytes):
+        # results delivered as raw bytes like rendered graphs
+        return len(data)
+    try:
+        return len(json.dumps(result, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(result)
+
+
 class RequestManager:
     """
-    Wrapper class around Executor for accessing request states and results
+    Wrapper class around Executor for accessing request states and results.
+    Requests are executed by named pools with separate concurrency limits, so
+    cheap requests don't have to wait for expensive ones.
     """
-    def __init__(self, app=None, name=''):
-        self._executor = Executor(app, name)
+    # pylint: disable=too-many-arguments
+    def __init__(self, app=None, name='', result_ttl=DEFAULT_RESULT_TTL,
+                 max_result_size=DEFAULT_MAX_RESULT_SIZE,
+                 pools: Optional[Dict[str, int]] = None):
+        self._pools = {
+            pool: _ExecutorPool(app, f'{name}_{pool}' if name else pool,
+                                workers)
+            for pool, workers in {**DEFAULT_POOLS, **(pools or {})}.items()}
         self._ticket_dispenser = _TicketDispenser()
+        self._results = _ResultStore(result_ttl, max_result_size)
+        # executions that haven't finished yet by function and arguments
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._in_flight_lock = threading.Lock()
 
-    def submit_ticketed(self, function, *args, **kwargs) -> str:
+    def submit_ticketed(self, function, *args, pool=POOL_MINING,
+                        **kwargs) -> str:
         """
         Submits a function for execution and returns an id for later access to
-        the requests state and result.
+        the requests state and result. If the same function was already
+        submitted with the same arguments and its execution hasn't finished
+        yet, the request shares that execution instead of starting another
+        one. Every request still receives its own id.
         :param function: the function
         :param args: the functions arguments
+        :param pool: name of the pool that should execute the function
         :return: the id of the submitted execution request
         """
+        if pool not in self._pools:
+            raise ValueError(f'unknown executor pool "{pool}"')
         key = self._ticket_dispenser.get_ticket()
-        self._executor.submit_stored(key, function, *args, **kwargs)
+        future = self._submit_coalesced(self._pools[pool], function, args,
+                                        kwargs)
+        self._results.add(key, future)
         return key
 
     def request_processed(self, request_id: str) -> bool:
@@ -56,13 +351,54 @@ class RequestManager:
         Checks if a request has already been processed.
         :param request_id: id of the request
         :return: True if the request was processed else False
+        :raises RequestNotFoundError: if the request is unknown or its result
+        was already retrieved, expired or evicted
         """
-        return self._executor.futures.done(request_id)
+        return self._results.get(request_id).done()
 
     def get_result(self, request_id: str):
         """
-        Returns the result of a finished request.
+        Returns the result of a finished request. The result can only be
+        retrieved once.
         :param request_id: id of the request
         :return: the result of the request
+        :raises RequestNotFoundError: if the request isn't finished yet, is
+        unknown or its result was already retrieved, expired or evicted
         """
-        return self._executor.futures.pop(request_id).result()
+        if not self.request_processed(request_id):
+            raise RequestNotFoundError(REASON_PROCESSING)
+        return self._results.pop(request_id).result()
+
+    def get_metrics(self) -> Dict:
+        """
+        Collects metrics of the stored results of the requests and of the
+        pools executing them.
+        :return: dict containing the metrics
+        """
+        return {
+            **self._results.get_metrics(),
+            'pools': {name: pool.get_metrics()
+                      for name, pool in self._pools.items()}
+        }
+
+    def _submit_coalesced(self, pool: _ExecutorPool, function, args,
+                          kwargs) -> Future:
+        submission = (pool.name, function, args,
+                      tuple(sorted(kwargs.items())))
+        try:
+            hash(submission)
+        except TypeError:
+            # submissions with unhashable arguments are never shared
+            return pool.submit(function, *args, **kwargs)
+        with self._in_flight_lock:
+            for finished in [other for other, future
+                             in self._in_flight.items() if future.done()]:
+                del self._in_flight[finished]
+            future = self._in_flight.get(submission)
+            if future is None:
+                future = pool.submit(function, *args, **kwargs)
+                self._in_flight[submission] = future
+            else:
+                log.debug('sharing execution of identical request to %s',
+                          getattr(function, '__name__', function))
+            return future
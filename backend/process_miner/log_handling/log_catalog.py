@@ -0,0 +1,269 @@
+"""
+Module used for keeping track of stored log files and the values they contain.
+The catalog allows selecting only the files that may be relevant for a data
+set without having to read every stored file.
+"""
+import csv
+import json
+import logging
+import os
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+log = logging.getLogger(__name__)
+
+CATALOG_FILENAME = 'catalog.json'
+CATALOG_FIELDS = ['approach', 'method', 'bank', 'errortype']
+
+
+def _create_empty_catalog():
+    return {'version': None, 'fields': [], 'files': {}}
+
+
+def _time_range_matches(entry: Dict, start: Optional[str],
+                        end: Optional[str]) -> bool:
+    if start and entry['max_timestamp'] < start:
+        return False
+    if end and entry['min_timestamp'] > end:
+        return False
+    return True
+
+
+def _values_match(entry: Dict, filters: Dict[str, str]) -> bool:
+    for field, value in filters.items():
+        known_values = entry['values'].get(field)
+        # files without information about a field can't be excluded
+        if known_values is not None and value not in known_values:
+            return False
+    return True
+
+
+class LogCatalog:
+    """
+    Class used for recording statistics (row count, timestamp range and
+    distinct values of selected fields) for each stored log file.
+    """
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._catalog = _create_empty_catalog()
+        self._loaded_mtime = None
+        self._session_value_counts = None
+        # directory state and catalog version the untracked check belongs to
+        self._untracked_check = (None, False)
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'directory <{self.directory}>, ' \
+               f'files <{len(self._catalog["files"])}>]'
+
+    @property
+    def path(self) -> Path:
+        """
+        Path of the file the catalog is persisted to.
+        """
+        return self.directory / CATALOG_FILENAME
+
+    def add_file(self, filename: str, entries: List[Dict[str, str]],
+                 fields: List[str]) -> None:
+        """
+        Adds or replaces the catalog entry of a stored log file.
+        :param filename: name of the file relative to the catalogs directory
+        :param entries: the log entries contained in the file
+        :param fields: names of the fields written to the file
+        """
+        self._reload_if_changed()
+        timestamps = [entry['timestamp'] for entry in entries]
+        values = {}
+        for field in CATALOG_FIELDS:
+            if field in fields:
+                values[field] = sorted({entry[field] for entry in entries})
+        self._session_value_counts = None
+        self._catalog['files'][filename] = {
+            'correlationId': entries[0]['correlationId'],
+            'rows': len(entries),
+            'min_timestamp': min(timestamps),
+            'max_timestamp': max(timestamps),
+            'values': values
+        }
+        self._catalog['fields'] = list(fields)
+
+    def get_entries(self) -> Dict[str, Dict]:
+        """
+        Returns the catalog entries of all known files.
+        :return: dict mapping file names to their catalog entries
+        """
+        self._reload_if_changed()
+        return self._catalog['files']
+
+    def get_version(self) -> Optional[str]:
+        """
+        Returns an identifier of the catalogs current state that changes every
+        time the catalog is saved.
+        :return: the identifier (None if the catalog was never saved)
+        """
+        self._reload_if_changed()
+        return self._catalog.get('version')
+
+    def get_fields(self) -> List[str]:
+        """
+        Returns the names of the fields contained in the cataloged files.
+        :return: list of field names
+        """
+        self._reload_if_changed()
+        return self._catalog['fields']
+
+    def get_session_value_counts(self) -> Tuple[int, Dict[str, Counter]]:
+        """
+        Counts in how many sessions each value of the cataloged fields occurs.
+        The result is cached until the catalog changes.
+        :return: tuple containing the total number of sessions and a dict
+        mapping each field to the session counts of its values
+        """
+        self._reload_if_changed()
+        if self._session_value_counts is None:
+            session_values = self._get_session_values()
+            counts = defaultdict(Counter)
+            for values in session_values.values():
+                for field, field_values in values.items():
+                    counts[field].update(field_values)
+            self._session_value_counts = (len(session_values), dict(counts))
+        return self._session_value_counts
+
+    # pylint: disable=too-many-arguments
+    def select_files(self, pattern: str,
+                     row_filters: Optional[Dict[str, str]] = None,
+                     session_filters: Optional[Dict[str, str]] = None,
+                     start: Optional[str] = None,
+                     end: Optional[str] = None) -> List[Path]:
+        """
+        Selects all files that may contain entries matching the supplied
+        filters. Files that are not part of the catalog are always selected.
+        :param pattern: glob pattern the selected files have to match
+        :param row_filters: values the entries themselves have to contain
+        :param session_filters: values any entry of the same session has to
+        contain
+        :param start: earliest timestamp of the requested time range
+        :param end: latest timestamp of the requested time range
+        :return: list of paths of the selected files
+        """
+        row_filters = {k: v for k, v in (row_filters or {}).items() if v}
+        session_filters = {k: v for k, v in (session_filters or {}).items()
+                           if v}
+        entries = self.get_entries()
+        session_values = self._get_session_values()
+
+        selected = []
+        for file in self.directory.glob(pattern):
+            entry = entries.get(file.name)
+            if entry is None:
+                log.debug('file "%s" not in catalog', file)
+                selected.append(file)
+                continue
+            if not _time_range_matches(entry, start, end):
+                continue
+            if not _values_match(entry, row_filters):
+                continue
+            if not _values_match(
+                    {'values': session_values[entry['correlationId']]},
+                    session_filters):
+                continue
+            selected.append(file)
+        log.info('selected %s of %s cataloged files', len(selected),
+                 len(entries))
+        return selected
+
+    def has_untracked_files(self, pattern: str) -> bool:
+        """
+        Checks if any file matching the pattern is not part of the catalog.
+        Data derived from the catalog doesn't cover such files. The result is
+        cached until the directory or the catalog changes.
+        :param pattern: glob pattern of the checked files
+        :return: whether there are uncataloged files
+        """
+        if not self.directory.is_dir():
+            return False
+        state = (pattern, self.directory.stat().st_mtime_ns,
+                 self.get_version())
+        if self._untracked_check[0] != state:
+            self._untracked_check = (
+                state, bool(self.get_untracked_files(pattern)))
+        return self._untracked_check[1]
+
+    def get_untracked_files(self, pattern: str) -> List[Path]:
+        """
+        Returns all files matching the pattern that are not part of the
+        catalog (like logs stored before the catalog was introduced).
+        :param pattern: glob pattern of the returned files
+        :return: list of paths of the uncataloged files
+        """
+        entries = self.get_entries()
+        return [file for file in self.directory.glob(pattern)
+                if file.name not in entries]
+
+    def add_untracked_files(self, pattern: str) -> int:
+        """
+        Reads all uncataloged CSV files matching the pattern, adds them to the
+        catalog and persists it if any file was added.
+        :param pattern: glob pattern of the files that should be cataloged
+        :return: the number of added files
+        """
+        added = 0
+        for file in self.get_untracked_files(pattern):
+            with file.open('r', newline='') as csv_file:
+                reader = csv.DictReader(csv_file)
+                entries = list(reader)
+            if not entries:
+                log.warning('file "%s" contains no log entries and can\'t '
+                            'be cataloged', file)
+                continue
+            self.add_file(file.name, entries, reader.fieldnames)
+            added += 1
+        if added:
+            log.info('added %s previously uncataloged files to the catalog',
+                     added)
+            self.save()
+        return added
+
+    def clear(self) -> None:
+        """
+        Removes all entries from the catalog.
+        """
+        self._catalog = _create_empty_catalog()
+        self._loaded_mtime = None
+        self._session_value_counts = None
+
+    def save(self) -> None:
+        """
+        Persists the catalog to its directory.
+        """
+        self._catalog['version'] = uuid.uuid4().hex
+        temp_path = self.path.with_suffix('.tmp')
+        with temp_path.open('w') as catalog_file:
+            json.dump(self._catalog, catalog_file)
+        # replace atomically so readers never see a partially written file
+        os.replace(temp_path, self.path)
+        self._loaded_mtime = self.path.stat().st_mtime_ns
+
+    def _get_session_values(self) -> Dict[str, Dict[str, Set[str]]]:
+        session_values = defaultdict(lambda: defaultdict(set))
+        for entry in self._catalog['files'].values():
+            values = session_values[entry['correlationId']]
+            for field, field_values in entry['values'].items():
+                values[field].update(field_values)
+        return session_values
+
+    def _reload_if_changed(self) -> None:
+        if not self.path.is_file():
+            if self._loaded_mtime is not None:
+                self.clear()
+            return
+        mtime = self.path.stat().st_mtime_ns
+        if mtime == self._loaded_mtime:
+            return
+        log.info('loading log catalog from "%s"', self.path)
+        with self.path.open('r') as catalog_file:
+            self._catalog = json.load(catalog_file)
+        self._loaded_mtime = mtime
+        self._session_value_counts = None
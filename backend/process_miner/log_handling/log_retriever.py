@@ -12,6 +12,7 @@ from typing import List, Dict, Tuple
 
 import process_miner.log_handling.graylog_access as ga
 from process_miner.log_handling.graylog_access import GraylogAccess
+from process_miner.log_handling.log_catalog import LogCatalog
 from process_miner.log_handling.log_filter import LogFilter
 from process_miner.log_handling.log_tagger import LogTagger
 
@@ -42,6 +43,24 @@ def _sanitize_filename(filename: str) -> str:
     return filename.replace(':', '_')
 
 
+class IngestionListener:
+    """
+    Base class for components that have to be notified whenever the stored
+    logs change (eg. to keep pre-aggregated data up to date).
+    """
+    def logs_stored(self, sessions: Dict[str, List[Dict[str, str]]]) -> None:
+        """
+        Called after new log entries were stored.
+        :param sessions: the newly stored entries grouped by their
+        correlationId
+        """
+
+    def logs_cleared(self) -> None:
+        """
+        Called after all stored logs were removed.
+        """
+
+
 class LogRetriever:
     """
     Class used for retrieving and storing log entries.
@@ -53,6 +72,8 @@ class LogRetriever:
                                     filter_expressions)
         self.target_dir = Path(target_dir)
         self.log_taggers = log_taggers
+        self.catalog = LogCatalog(self.target_dir)
+        self.ingestion_listeners: List[IngestionListener] = []
         self._folder_lock = Lock()
 
     def __str__(self) -> str:
@@ -61,8 +82,17 @@ class LogRetriever:
                f'log_filter <{self.log_filter}>, ' \
                f'target_dir <{self.target_dir}>, ' \
                f'log_taggers <{self.log_taggers}>, ' \
+               f'catalog <{self.catalog}>, ' \
+               f'ingestion_listeners <{self.ingestion_listeners}>, ' \
                f'_folder_lock <{self._folder_lock}>]'
 
+    def add_ingestion_listener(self, listener: IngestionListener) -> None:
+        """
+        Registers a listener that is notified whenever the stored logs change.
+        :param listener: the listener
+        """
+        self.ingestion_listeners.append(listener)
+
     def retrieve_logs(self, force: bool = False) -> None:
         """
         Retrieves logs from the configured Graylog instance. Logs are stored
@@ -105,7 +135,10 @@ class LogRetriever:
                 fields.append(tagger.target_field)
 
             self._store_logs_as_csv(grouped_lines, fields)
+            self.catalog.save()
             self._store_last_included_timestamp(last_timestamp)
+            self._notify_listeners(lambda listener: listener.logs_stored(
+                grouped_lines))
 
     def _prepare_target_dir(self) -> None:
         log.info('preparing target directory "%s"', self.target_dir)
@@ -117,6 +150,18 @@ class LogRetriever:
         log.info('clearing log directory')
         for file in os.listdir(self.target_dir):
             os.remove(self.target_dir / file)
+        self.catalog.clear()
+        self._notify_listeners(lambda listener: listener.logs_cleared())
+
+    def _notify_listeners(self, notification) -> None:
+        for listener in self.ingestion_listeners:
+            try:
+                notification(listener)
+            # pylint: disable=broad-except
+            except Exception:
+                # stored logs stay usable even if derived data is outdated
+                log.exception('failed to notify ingestion listener %s',
+                              listener)
 
     def _load_last_included_timestamp(self) -> datetime:
         timestamp_path = self.target_dir.joinpath(TIMESTAMP_FILENAME)
@@ -186,3 +231,4 @@ class LogRetriever:
                 writer = csv.DictWriter(csv_file, fieldnames)
                 writer.writeheader()
                 writer.writerows(log_entries)
+            self.catalog.add_file(file_path.name, log_entries, fieldnames)
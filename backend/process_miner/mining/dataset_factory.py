@@ -1,11 +1,47 @@
 """
 Module for preparing stored logs for data extraction
 """
+import logging
+from collections import OrderedDict
 from pathlib import Path
+from threading import Lock
+from typing import Dict, NamedTuple, Optional, Tuple
 
-from pandas import DataFrame
+import numpy
+from pandas import DataFrame, Series
 
 import process_miner.mining.util.data as data_util
+from process_miner.log_handling.log_catalog import LogCatalog
+from process_miner.mining.dfg_cube import CubeAggregate, DfgCube
+from process_miner.mining.distinct import DistinctCounts
+from process_miner.mining.latency import LatencySketches
+from process_miner.mining.query_plan import QueryPlan
+from process_miner.mining.rollups import TimeRollups
+from process_miner.mining.session_summaries import MetadataCounts, \
+    SessionSummaries, summarize_frame, summarize_latencies
+from process_miner.mining.variants import VariantTable, compute_variants
+
+log = logging.getLogger(__name__)
+
+SAMPLING_STRATA = ['approach', 'bank']
+SAMPLING_SEED = 0
+# stratum value of sessions without a value in a stratum column
+MISSING_STRATUM = ''
+# number of variant tables (one per filter) kept for the current data version
+VARIANT_CACHE_SIZE = 16
+
+
+class DataFilter(NamedTuple):
+    """
+    Describes which entries should be part of a data set. The string
+    representation is stable and can therefore be used as part of cache keys.
+    """
+    approach: Optional[str] = None
+    method_type: Optional[str] = None
+    error_type: Optional[str] = None
+    bank: Optional[str] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
 
 
 class DatasetFactory:
@@ -14,13 +50,33 @@ class DatasetFactory:
     """
     def __init__(self, source_directory: Path):
         self._source_directory = source_directory
+        self._catalog = LogCatalog(source_directory)
+        self._cube = DfgCube(source_directory)
+        self._summaries = SessionSummaries(source_directory)
+        self._variants: Dict[Tuple[str, DataFilter], VariantTable] = \
+            OrderedDict()
+        self._variants_lock = Lock()
 
     def __str__(self) -> str:
         return f'{self.__class__.__name__} [' \
-               f'_source_directory <{self._source_directory}>]'
+               f'_source_directory <{self._source_directory}>, ' \
+               f'_catalog <{self._catalog}>, ' \
+               f'_cube <{self._cube}>, ' \
+               f'_summaries <{self._summaries}>, ' \
+               f'_variants <{len(self._variants)}>]'
 
+    def get_data_version(self) -> Optional[str]:
+        """
+        Returns an identifier of the currently stored data that changes every
+        time new logs were stored. It may be used to invalidate cached results.
+        :return: the identifier
+        """
+        return self._catalog.get_version()
+
+    # pylint: disable=too-many-arguments
     def get_prepared_data_frame(self, approach=None, method_type=None,
-                                error_type=None, bank=None) -> DataFrame:
+                                error_type=None, bank=None, *, start=None,
+                                end=None) -> DataFrame:
         """
         Creates a DataFrame for graph creation or metadata extraction.
         :param approach: approach that should be used (all if none specified)
@@ -30,25 +86,211 @@ class DatasetFactory:
         be in the resulting data set
         :param bank: bank that a session has to belong to to be considered in
         the resulting data set
+        :param start: earliest timestamp (Graylog format) of entries that
+        should be included
+        :param end: latest timestamp (Graylog format) of entries that should be
+        included
         :return: DataFrame representing the data set
         """
-        frame = data_util.get_merged_csv_files(self._source_directory,
-                                               'timestamp')
-        # filter by method
+        data_filter = DataFilter(approach, method_type, error_type, bank,
+                                 start, end)
+        frame = self._load_data_frame(data_filter)
+        frame = data_util.slice_by_sorted_column(frame, 'timestamp', start,
+                                                 end)
+        plan = QueryPlan('correlationId')
+        # the method is checked on all entries of a session while error type
+        # and bank are only checked on entries matching the approach
         if method_type:
-            frame = data_util.filter_related_entries(frame, 'correlationId',
-                                                     'method', [method_type])
-        # filter by approach
+            plan.add_session_predicate('method', method_type, scoped=False)
         if approach:
-            frame = data_util.filter_by_field(frame, 'approach', approach)
-
-        # filter by error type
+            plan.add_row_predicate('approach', approach)
         if error_type:
-            frame = data_util.filter_related_entries(frame, 'correlationId',
-                                                     'errortype', [error_type])
-
-        # filter by bank
+            plan.add_session_predicate('errortype', error_type)
         if bank:
-            frame = data_util.filter_related_entries(frame, 'correlationId',
-                                                     'bank', [bank])
-        return frame
+            plan.add_session_predicate('bank', bank)
+        return plan.execute(frame, self._get_selectivities())
+
+    def get_filtered_data_frame(self, data_filter: DataFilter) -> DataFrame:
+        """
+        Creates a DataFrame for graph creation or metadata extraction.
+        :param data_filter: describes the entries that should be included
+        :return: DataFrame representing the data set
+        """
+        return self.get_prepared_data_frame(**data_filter._asdict())
+
+    def get_aggregate(self, data_filter: DataFilter) \
+            -> Optional[CubeAggregate]:
+        """
+        Answers a request from the pre-aggregated cube instead of the stored
+        log entries if possible.
+        :param data_filter: describes the entries that should be included
+        :return: the aggregated frequencies and session counts (None if the
+        cube is outdated or the filter can't be answered by the cube)
+        """
+        if data_filter.start or data_filter.end:
+            return None
+        if not self._cube.is_current():
+            log.info('DFG cube is not up to date')
+            return None
+        return self._cube.aggregate(data_filter.approach,
+                                    data_filter.method_type,
+                                    data_filter.error_type, data_filter.bank)
+
+    def get_metadata_counts(self, data_filter: DataFilter) \
+            -> Optional[MetadataCounts]:
+        """
+        Answers a metadata request from the session summaries maintained
+        during ingestion instead of the stored log entries if possible.
+        :param data_filter: describes the entries that should be included
+        :return: the metadata counts (None if the summaries are outdated or
+        the filter can't be answered by them)
+        """
+        if any(data_filter):
+            # the summaries can't be limited to entries of a time range
+            return None
+        if not self._summaries.is_current():
+            log.info('session summaries are not up to date')
+            return None
+        return self._summaries.get_counts()
+
+    def has_current_summaries(self) -> bool:
+        """
+        Checks if the session summaries maintained during ingestion are up to
+        date, so metadata requests don't have to read the stored logs.
+        :return: whether the summaries are up to date
+        """
+        return self._summaries.is_current()
+
+    def get_rollups(self) -> TimeRollups:
+        """
+        Returns the number of sessions per time bucket maintained during
+        ingestion. If those are outdated the rollups are calculated from the
+        stored logs instead.
+        :return: the rollups
+        """
+        if self._summaries.is_current():
+            return self._summaries.get_rollups()
+        log.info('session summaries are not up to date')
+        rollups = TimeRollups()
+        frame = self.get_filtered_data_frame(DataFilter())
+        for summary in summarize_frame(frame).values():
+            rollups.add(summary)
+        return rollups
+
+    def get_latencies(self) -> LatencySketches:
+        """
+        Returns the latency sketches maintained during ingestion. If those are
+        outdated the sketches are calculated from the stored logs instead.
+        :return: the sketches
+        """
+        if self._summaries.is_current():
+            return self._summaries.get_latencies()
+        log.info('session summaries are not up to date')
+        return summarize_latencies(self.get_filtered_data_frame(DataFilter()))
+
+    def get_distinct_counts(self) -> Optional[DistinctCounts]:
+        """
+        Returns the sketches of the sessions per value and day maintained
+        during ingestion.
+        :return: the sketches (None if they are outdated)
+        """
+        if not self._summaries.is_current():
+            log.info('session summaries are not up to date')
+            return None
+        return self._summaries.get_distinct_counts()
+
+    def get_variants(self, data_filter: DataFilter) -> VariantTable:
+        """
+        Compresses the sessions of a data set to variants. The variants are
+        cached for the current data version, so repeated requests with the
+        same filter don't read the stored logs again.
+        :param data_filter: describes the entries that should be included
+        :return: the variants
+        """
+        version = self.get_data_version()
+        key = (version, data_filter)
+        with self._variants_lock:
+            if key in self._variants:
+                self._variants.move_to_end(key)
+                return self._variants[key]
+        table = compute_variants(self.get_filtered_data_frame(data_filter))
+        with self._variants_lock:
+            # variants of previous data versions are never requested again
+            for outdated in [cached for cached in self._variants
+                             if cached[0] != version]:
+                del self._variants[outdated]
+            self._variants[key] = table
+            while len(self._variants) > VARIANT_CACHE_SIZE:
+                self._variants.popitem(last=False)
+        return table
+
+    @staticmethod
+    def sample_sessions(frame: DataFrame, ratio: float) \
+            -> Tuple[DataFrame, float]:
+        """
+        Draws a sample of sessions that is stratified by approach and bank
+        (if the frame contains them). Each stratum keeps at least one session.
+        A fixed seed is used so the same data always results in the same
+        sample.
+        :param frame: the DataFrame the sessions should be sampled from
+        :param ratio: the desired fraction of sessions (0 < ratio <= 1)
+        :return: tuple containing the DataFrame with all entries of the
+        sampled sessions and the effective fraction of sampled sessions
+        """
+        if ratio >= 1 or frame.empty:
+            return frame, 1.0
+        strata = [column for column in SAMPLING_STRATA
+                  if column in frame.columns]
+        # a session belongs to the stratum of its first entry
+        sessions = frame.drop_duplicates('correlationId')
+        if strata:
+            # missing values form their own stratum instead of being dropped
+            stratum_ids = sessions[strata].fillna(MISSING_STRATUM) \
+                .groupby(strata, sort=False).ngroup()
+        else:
+            # without any stratum column all sessions form a single stratum
+            stratum_ids = Series(0, index=sessions.index)
+        generator = numpy.random.default_rng(SAMPLING_SEED)
+        ranks = DataFrame({
+            'stratum': stratum_ids.to_numpy(),
+            'random': generator.random(len(sessions))
+        }).groupby('stratum')['random'].rank(method='first')
+        sizes = stratum_ids.map(stratum_ids.value_counts()).to_numpy()
+        quotas = numpy.maximum(1, numpy.round(sizes * ratio))
+        sampled = sessions['correlationId'].to_numpy()[
+            ranks.to_numpy() <= quotas]
+        effective_ratio = len(sampled) / len(sessions)
+        log.info('sampled %s of %s sessions (ratio %.4f)', len(sampled),
+                 len(sessions), effective_ratio)
+        return frame.loc[frame['correlationId'].isin(sampled)], \
+            effective_ratio
+
+    def _get_selectivities(self) -> Dict[Tuple[str, str], float]:
+        session_count, value_counts = self._catalog.get_session_value_counts()
+        if not session_count:
+            return {}
+        return {(field, value): count / session_count
+                for field, counts in value_counts.items()
+                for value, count in counts.items()}
+
+    def _load_data_frame(self, data_filter: DataFilter) -> DataFrame:
+        # skip all files that can't contain matching entries; the method is
+        # checked on all entries of a session, so files without the approach
+        # may still be needed to decide whether a session matches
+        row_filters = {} if data_filter.method_type \
+            else {'approach': data_filter.approach}
+        files = self._catalog.select_files(
+            f'*.{data_util.FILE_EXTENSION}',
+            row_filters=row_filters,
+            session_filters={
+                'method': data_filter.method_type,
+                'errortype': data_filter.error_type,
+                'bank': data_filter.bank
+            },
+            start=data_filter.start,
+            end=data_filter.end)
+        if not files:
+            log.info('no files matching the requested filters')
+            return DataFrame(columns=self._catalog.get_fields())
+        csv_files = data_util.read_csv_files(files)
+        return data_util.merge_and_sort_dataframes(csv_files, 'timestamp')
@@ -0,0 +1,303 @@
+"""
+Module for pre-aggregating the frequencies of the stored sessions. Sessions
+sharing the same values of all filter dimensions are combined to a single cell
+of the cube. Any filter combination can then be answered by adding up the
+frequencies of the matching cells instead of reading the stored log entries.
+"""
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas
+from pandas import DataFrame
+
+import process_miner.mining.util.data as data_util
+from process_miner.mining import metadata
+from process_miner.mining.frequencies import Frequencies, count_frequencies, \
+    CASE_COLUMN
+from process_miner.mining.persisted import PersistedListener
+
+log = logging.getLogger(__name__)
+
+CUBE_FILENAME = 'dfg_cube.json'
+DIMENSIONS = ['approach', 'method', 'errortype', 'bank']
+
+
+class CubeCell:
+    """
+    Class containing the combined frequencies of all sessions with the same
+    distinct values in each dimension.
+    """
+    def __init__(self, values: Dict[str, List[str]]):
+        self.values = values
+        self.sessions = 0
+        self.frequencies = Frequencies()
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'values <{self.values}>, ' \
+               f'sessions <{self.sessions}>, ' \
+               f'frequencies <{self.frequencies}>]'
+
+    def is_mixed(self) -> bool:
+        """
+        Determines if the sessions of the cell use more than one approach. The
+        entries of those sessions can't be filtered by approach using only the
+        aggregated frequencies.
+        :return: whether the cell contains more than one approach
+        """
+        return len(self.values['approach']) > 1
+
+    def matches(self, filters: Dict[str, str]) -> bool:
+        """
+        Checks if the sessions of the cell contain all filter values.
+        :param filters: dict mapping dimensions to the required values (empty
+        values are ignored)
+        :return: whether the cell matches
+        """
+        return all(value in self.values[dimension]
+                   for dimension, value in filters.items() if value)
+
+    def to_json(self) -> Dict:
+        """
+        Converts the cell to a JSON serializable representation.
+        :return: the representation
+        """
+        return {
+            'values': self.values,
+            'sessions': self.sessions,
+            'frequencies': self.frequencies.to_json()
+        }
+
+    @staticmethod
+    def from_json(data: Dict) -> 'CubeCell':
+        """
+        Restores a cell from the representation created by to_json.
+        :param data: the JSON representation
+        :return: the cell
+        """
+        cell = CubeCell(data['values'])
+        cell.sessions = data['sessions']
+        cell.frequencies = Frequencies.from_json(data['frequencies'])
+        return cell
+
+
+class CubeAggregate:
+    """
+    Class containing the sum of all cells matching a filter.
+    """
+    def __init__(self):
+        self.frequencies = Frequencies()
+        self.session_count = 0
+        self.session_value_counts = {dimension: {}
+                                     for dimension in DIMENSIONS}
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'frequencies <{self.frequencies}>, ' \
+               f'session_count <{self.session_count}>]'
+
+    def add(self, cell: CubeCell) -> None:
+        """
+        Adds the frequencies and sessions of a cell to the aggregate.
+        :param cell: the cell
+        """
+        self.frequencies.add(cell.frequencies)
+        self.session_count += cell.sessions
+        for dimension, counts in self.session_value_counts.items():
+            for value in metadata.get_relevant_values(cell.values[dimension]):
+                counts[value] = counts.get(value, 0) + cell.sessions
+
+
+def _get_session_values(frame: DataFrame) -> DataFrame:
+    sessions = frame.groupby(CASE_COLUMN, sort=False)
+    return DataFrame({
+        dimension: sessions[dimension].unique().map(
+            lambda values: sorted(value for value in values
+                                  if not pandas.isna(value)))
+        for dimension in DIMENSIONS
+    })
+
+
+def _get_cell_key(values: Dict[str, List[str]]) -> tuple:
+    return tuple(tuple(values[dimension]) for dimension in DIMENSIONS)
+
+
+def build_cells(frame: DataFrame) -> List[CubeCell]:
+    """
+    Builds the cells of the cube from a DataFrame containing complete
+    sessions.
+    :param frame: the DataFrame (sorted by timestamp)
+    :return: list of the cells
+    """
+    if frame.empty:
+        return []
+    cells: List[CubeCell] = []
+    cell_indices: Dict[tuple, int] = {}
+    session_cells: Dict[str, int] = {}
+    for session, values in _get_session_values(frame).iterrows():
+        key = _get_cell_key(values)
+        if key not in cell_indices:
+            cell_indices[key] = len(cells)
+            cells.append(CubeCell(values.to_dict()))
+        cells[cell_indices[key]].sessions += 1
+        session_cells[session] = cell_indices[key]
+    row_cells = frame[CASE_COLUMN].map(session_cells).to_numpy()
+    for index, cell_frame in frame.groupby(row_cells, sort=False):
+        cells[index].frequencies = count_frequencies(cell_frame)
+    return cells
+
+
+class DfgCube(PersistedListener):
+    """
+    Class used for maintaining the cube in the log directory and answering
+    queries using its cells. The cube is updated incrementally: only the
+    sessions contained in newly stored logs are read again. Sessions that
+    already were part of the cube are retracted before their extended
+    version is added.
+    """
+    FILENAME = CUBE_FILENAME
+
+    def __init__(self, directory: Path):
+        super().__init__(directory)
+        self._cells: Dict[tuple, CubeCell] = {}
+        # files each session was added to the cube from
+        self._session_files: Dict[str, List[str]] = {}
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'directory <{self.directory}>, ' \
+               f'_version <{self._version}>, ' \
+               f'_cells <{len(self._cells)}>, ' \
+               f'_session_files <{len(self._session_files)}>]'
+
+    def aggregate(self, approach: Optional[str] = None,
+                  method_type: Optional[str] = None,
+                  error_type: Optional[str] = None,
+                  bank: Optional[str] = None) -> Optional[CubeAggregate]:
+        """
+        Adds up all cells matching the filter values.
+        :param approach: approach that should be used
+        :param method_type: method that has to be used during the sessions
+        :param error_type: error type the sessions have to contain
+        :param bank: bank the sessions have to belong to
+        :return: the aggregate (None if it can't be calculated from the
+        cells because matching sessions use more than one approach)
+        """
+        self._reload_if_changed()
+        filters = {'approach': approach, 'method': method_type,
+                   'errortype': error_type, 'bank': bank}
+        aggregate = CubeAggregate()
+        for cell in self._cells.values():
+            if not cell.matches(filters):
+                continue
+            if approach and cell.is_mixed():
+                log.info('cube can\'t be used for sessions with mixed '
+                         'approaches')
+                return None
+            aggregate.add(cell)
+        log.info('aggregated %s', aggregate)
+        return aggregate
+
+    def rebuild(self) -> None:
+        """
+        Builds the cube from all cataloged logs and persists it.
+        """
+        version = self._catalog.get_version()
+        if version is None:
+            log.info('no cataloged logs to build the DFG cube from')
+            return
+        entries = self._catalog.get_entries()
+        self._session_files = defaultdict(list)
+        for filename, entry in entries.items():
+            self._session_files[entry['correlationId']].append(filename)
+        self._session_files = dict(self._session_files)
+        frame = self._read_files(list(entries))
+        self._cells = {_get_cell_key(cell.values): cell
+                       for cell in build_cells(frame)}
+        self._version = version
+        log.info('built %s', self)
+        self._save()
+
+    def update(self, sessions: Iterable[str]) -> None:
+        """
+        Updates the cube with the current state of the supplied sessions and
+        persists it. Falls back to a complete rebuild if the cube doesn't
+        match the stored logs of all other sessions.
+        :param sessions: correlationIds of the new or extended sessions
+        """
+        self._reload_if_changed()
+        sessions = set(sessions)
+        if self._version is None or not self._is_consistent(sessions):
+            log.info('DFG cube is inconsistent with the stored logs')
+            self.rebuild()
+            return
+        current_files = defaultdict(list)
+        for filename, entry in self._catalog.get_entries().items():
+            if entry['correlationId'] in sessions:
+                current_files[entry['correlationId']].append(filename)
+
+        previous_files = [filename for session in sessions
+                          for filename in self._session_files.get(session, [])]
+        for cell in build_cells(self._read_files(previous_files)):
+            self._retract(cell)
+        for cell in build_cells(self._read_files(
+                [filename for files in current_files.values()
+                 for filename in files])):
+            self._add(cell)
+        self._session_files.update(current_files)
+        self._version = self._catalog.get_version()
+        log.info('updated %s sessions of %s', len(sessions), self)
+        self._save()
+
+    def logs_stored(self, sessions) -> None:
+        self.update(sessions.keys())
+
+    def _is_consistent(self, sessions: Set[str]) -> bool:
+        known_files = {filename for files in self._session_files.values()
+                       for filename in files}
+        entries = self._catalog.get_entries()
+        if not known_files.issubset(entries):
+            return False
+        # only files of the updated sessions may be missing from the cube
+        return all(filename in known_files
+                   or entry['correlationId'] in sessions
+                   for filename, entry in entries.items())
+
+    def _add(self, cell: CubeCell) -> None:
+        key = _get_cell_key(cell.values)
+        if key not in self._cells:
+            self._cells[key] = cell
+            return
+        self._cells[key].sessions += cell.sessions
+        self._cells[key].frequencies.add(cell.frequencies)
+
+    def _retract(self, cell: CubeCell) -> None:
+        existing = self._cells[_get_cell_key(cell.values)]
+        existing.sessions -= cell.sessions
+        existing.frequencies.subtract(cell.frequencies)
+        if existing.sessions <= 0:
+            del self._cells[_get_cell_key(cell.values)]
+
+    def _read_files(self, filenames: List[str]) -> DataFrame:
+        if not filenames:
+            return DataFrame()
+        frames = data_util.read_csv_files(
+            [self.directory / filename for filename in filenames])
+        return data_util.merge_and_sort_dataframes(frames, 'timestamp')
+
+    def _reset_data(self) -> None:
+        self._cells = {}
+        self._session_files = {}
+
+    def _to_json(self) -> Dict:
+        return {
+            'cells': [cell.to_json() for cell in self._cells.values()],
+            'session_files': self._session_files
+        }
+
+    def _from_json(self, data: Dict) -> None:
+        cells = [CubeCell.from_json(cell) for cell in data['cells']]
+        self._cells = {_get_cell_key(cell.values): cell for cell in cells}
+        self._session_files = data['session_files']
@@ -0,0 +1,278 @@
+"""
+Module for estimating the number of distinct sessions per metadata value
+within any time range. For each value a HyperLogLog sketch of the sessions
+is kept per day, so a range is answered by merging the sketches of its days
+instead of grouping all stored log entries by session. The sketches of each
+day are persisted to their own file and only loaded when a range containing
+the day is requested.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from process_miner.mining import metadata
+from process_miner.mining.rollups import get_bucket
+from process_miner.mining.sketches import HyperLogLog
+
+log = logging.getLogger(__name__)
+
+DISTINCT_FIELDS = ['approach', 'bank', 'errortype']
+DISTINCT_GRANULARITY = 'day'
+DISTINCT_FILE_PREFIX = 'distinct_counts_'
+# bound of the relative error holding with a probability of about 95%
+_ERROR_BOUND_FACTOR = 2
+
+Sketches = Dict[str, HyperLogLog]
+
+
+class _DaySketches:
+    """
+    Class containing the sketches of the sessions with an entry of each
+    value on a single day.
+    """
+    def __init__(self):
+        self.sessions = HyperLogLog()
+        # field -> value -> sketch
+        self.values: Dict[str, Sketches] = {
+            field: {} for field in DISTINCT_FIELDS}
+        # approach -> method -> sketch
+        self.methods_per_approach: Dict[str, Sketches] = {}
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'values <{sum(map(len, self.values.values()))}>]'
+
+    def to_json(self) -> Dict:
+        """
+        Converts the sketches to a JSON serializable representation.
+        :return: the representation
+        """
+        return {
+            'sessions': self.sessions.to_json(),
+            'values': {field: _sketches_to_json(values)
+                       for field, values in self.values.items()},
+            'methods_per_approach': {
+                approach: _sketches_to_json(methods)
+                for approach, methods in self.methods_per_approach.items()}
+        }
+
+    @staticmethod
+    def from_json(data: Dict) -> '_DaySketches':
+        """
+        Restores sketches from the representation created by to_json.
+        :param data: the JSON representation
+        :return: the sketches
+        """
+        day = _DaySketches()
+        day.sessions = HyperLogLog.from_json(data['sessions'])
+        day.values.update({field: _sketches_from_json(values)
+                           for field, values in data['values'].items()})
+        day.methods_per_approach = {
+            approach: _sketches_from_json(methods)
+            for approach, methods in data['methods_per_approach'].items()}
+        return day
+
+
+class DistinctCounts:
+    """
+    Class containing the sketches of the sessions with an entry of each
+    value per day. Adding an entry of a session again doesn't change the
+    sketches, so they are maintained by adding the newly stored entries only.
+    If a directory is supplied, the sketches of each day are loaded from it
+    on first use and only the days changed since the last save are written.
+    """
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory) if directory else None
+        # day -> sketches of all days loaded or changed so far
+        self._days: Dict[str, _DaySketches] = {}
+        self._changed: Set[str] = set()
+        # whether the stored days are replaced by the next save
+        self._cleared = False
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'directory <{self.directory}>, ' \
+               f'_days <{len(self._days)}>, ' \
+               f'_changed <{len(self._changed)}>]'
+
+    def add_entries(self, session: str, entries: Iterable[Dict],
+                    approach: Optional[str]) -> None:
+        """
+        Adds the session to the sketches of the values of its entries in the
+        bucket of each entry.
+        :param session: the correlationId of the session
+        :param entries: the entries
+        :param approach: the first approach of the session which the methods
+        of its entries are counted for (see metadata module)
+        """
+        # adding a session to a sketch again has no effect, so every sketch
+        # is only updated once
+        buckets = set()
+        values = set()
+        methods = set()
+        for entry in entries:
+            bucket = get_bucket(entry['timestamp'], DISTINCT_GRANULARITY)
+            buckets.add(bucket)
+            for field in DISTINCT_FIELDS:
+                value = entry.get(field)
+                if metadata.is_present(value):
+                    values.add((field, str(value), bucket))
+            # the metadata module only counts the missing method for
+            # sessions without any other method, which can't be expressed
+            # by sketches of single days
+            method = entry.get('method')
+            if approach is not None and metadata.is_present(method) \
+                    and method != metadata.DEFAULT_MISSING_VALUE:
+                methods.add((str(method), bucket))
+        for bucket in buckets:
+            self._get_day(bucket).sessions.add(session)
+        for field, value, bucket in values:
+            _get_sketch(self._get_day(bucket).values[field],
+                        value).add(session)
+        for method, bucket in methods:
+            _get_sketch(self._get_day(bucket).methods_per_approach
+                        .setdefault(approach, {}), method).add(session)
+        self._changed.update(buckets)
+
+    def count(self, field: str, start: Optional[str] = None,
+              end: Optional[str] = None) -> Dict[str, int]:
+        """
+        Estimates the number of sessions with an entry of each value of a
+        field within a time range. Days containing the bounds of the range
+        are included completely.
+        :param field: the field
+        :param start: timestamp of the start of the range (Graylog format)
+        :param end: timestamp of the end of the range (Graylog format)
+        :return: dict containing the estimated number of sessions per value
+        """
+        return _count_values(day.values[field]
+                             for day in self._get_days(start, end))
+
+    def count_methods_per_approach(self, start: Optional[str] = None,
+                                   end: Optional[str] = None) \
+            -> Dict[str, Dict[str, int]]:
+        """
+        Estimates the number of sessions with an entry of each method within
+        a time range for each approach.
+        :param start: timestamp of the start of the range (Graylog format)
+        :param end: timestamp of the end of the range (Graylog format)
+        :return: dict containing the estimated number of sessions per method
+        for each approach
+        """
+        days = self._get_days(start, end)
+        approaches = {approach for day in days
+                      for approach in day.methods_per_approach}
+        counts = {approach: _count_values(
+            day.methods_per_approach.get(approach, {}) for day in days)
+                  for approach in approaches}
+        return {approach: methods for approach, methods in counts.items()
+                if methods}
+
+    def count_sessions(self, start: Optional[str] = None,
+                       end: Optional[str] = None) -> int:
+        """
+        Estimates the number of sessions with an entry within a time range.
+        :param start: timestamp of the start of the range (Graylog format)
+        :param end: timestamp of the end of the range (Graylog format)
+        :return: the estimated number of sessions
+        """
+        merged = HyperLogLog()
+        for day in self._get_days(start, end):
+            merged.merge(day.sessions)
+        return merged.count()
+
+    def clear(self) -> None:
+        """
+        Removes all sketches. The stored days are removed by the next save.
+        """
+        self._days = {}
+        self._changed = set()
+        self._cleared = True
+
+    def save(self) -> None:
+        """
+        Persists the sketches of all days changed since the last save.
+        """
+        if self.directory is None:
+            return
+        for day in sorted(self._changed):
+            path = self._get_path(day)
+            temp_path = path.with_suffix('.tmp')
+            with temp_path.open('w') as day_file:
+                json.dump(self._days[day].to_json(), day_file)
+            # replace atomically so readers never see a partially written
+            # file
+            os.replace(temp_path, path)
+        if self._cleared:
+            for day in set(self._get_stored_days()) - set(self._days):
+                os.remove(self._get_path(day))
+            self._cleared = False
+        log.info('saved the sketches of %s days', len(self._changed))
+        self._changed = set()
+
+    def _get_day(self, day: str) -> _DaySketches:
+        if day not in self._days:
+            path = self._get_path(day) if self.directory else None
+            if path is not None and not self._cleared and path.is_file():
+                log.debug('loading distinct counts of %s', day)
+                with path.open('r') as day_file:
+                    self._days[day] = _DaySketches.from_json(
+                        json.load(day_file))
+            else:
+                self._days[day] = _DaySketches()
+        return self._days[day]
+
+    def _get_days(self, start: Optional[str],
+                  end: Optional[str]) -> List[_DaySketches]:
+        first = get_bucket(start, DISTINCT_GRANULARITY) if start else None
+        last = get_bucket(end, DISTINCT_GRANULARITY) if end else None
+        days = set(self._days)
+        if not self._cleared:
+            days.update(self._get_stored_days())
+        return [self._get_day(day) for day in sorted(days)
+                if (first is None or day >= first)
+                and (last is None or day <= last)]
+
+    def _get_stored_days(self) -> List[str]:
+        if self.directory is None:
+            return []
+        return [path.stem[len(DISTINCT_FILE_PREFIX):] for path
+                in self.directory.glob(f'{DISTINCT_FILE_PREFIX}*.json')]
+
+    def _get_path(self, day: str) -> Path:
+        return self.directory / f'{DISTINCT_FILE_PREFIX}{day}.json'
+
+
+def get_error_bound() -> float:
+    """
+    Returns the relative error of the estimated numbers of sessions which is
+    exceeded in about 5% of all estimates.
+    :return: the relative error
+    """
+    return _ERROR_BOUND_FACTOR * HyperLogLog().standard_error
+
+
+def _get_sketch(sketches: Sketches, key: str) -> HyperLogLog:
+    if key not in sketches:
+        sketches[key] = HyperLogLog()
+    return sketches[key]
+
+
+def _count_values(days: Iterable[Sketches]) -> Dict[str, int]:
+    merged: Sketches = {}
+    for sketches in days:
+        for value, sketch in sketches.items():
+            _get_sketch(merged, value).merge(sketch)
+    counts = {value: sketch.count() for value, sketch in merged.items()}
+    return {value: count for value, count in counts.items() if count}
+
+
+def _sketches_to_json(sketches: Sketches) -> Dict:
+    return {key: sketch.to_json() for key, sketch in sketches.items()}
+
+
+def _sketches_from_json(data: Dict) -> Sketches:
+    return {key: HyperLogLog.from_json(sketch)
+            for key, sketch in data.items()}
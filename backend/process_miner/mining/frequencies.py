@@ -0,0 +1,235 @@
+"""
+Module for counting the frequencies process mining algorithms are based on.
+The counts are calculated directly on a DataFrame with NumPy instead of
+converting the DataFrame to an EventLog first.
+"""
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy
+import pandas
+from pandas import DataFrame
+
+log = logging.getLogger(__name__)
+
+CASE_COLUMN = 'correlationId'
+ACTIVITY_COLUMN = 'label'
+# frequencies that are keyed by sequences of activities
+SEQUENCE_FREQUENCIES = ['dfg', 'dfg_window_2', 'freq_triples']
+
+
+def _scale_counts(counts: Dict, scale: float) -> Dict:
+    if scale == 1:
+        return dict(counts)
+    return {key: int(round(value * scale)) for key, value in counts.items()}
+
+
+class Frequencies:
+    """
+    Class containing the frequencies of a set of cases. Besides activities,
+    directly-follows relations and start and end activities this includes the
+    frequencies of activities following each other with a single activity in
+    between and of sequences of three activities used by the heuristics miner.
+    """
+    def __init__(self):
+        self.activities: Dict[str, int] = {}
+        self.dfg: Dict[Tuple[str, str], int] = {}
+        self.start_activities: Dict[str, int] = {}
+        self.end_activities: Dict[str, int] = {}
+        self.dfg_window_2: Dict[Tuple[str, str], int] = {}
+        self.freq_triples: Dict[Tuple[str, str, str], int] = {}
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'activities <{len(self.activities)}>, ' \
+               f'dfg <{len(self.dfg)}>, ' \
+               f'start_activities <{len(self.start_activities)}>, ' \
+               f'end_activities <{len(self.end_activities)}>, ' \
+               f'dfg_window_2 <{len(self.dfg_window_2)}>, ' \
+               f'freq_triples <{len(self.freq_triples)}>]'
+
+    def scaled(self, scale: float) -> 'Frequencies':
+        """
+        Creates a copy with all frequencies multiplied by a factor (eg. to
+        extrapolate the frequencies of a sample).
+        :param scale: the factor
+        :return: the scaled frequencies
+        """
+        scaled = Frequencies()
+        for name, counts in vars(self).items():
+            setattr(scaled, name, _scale_counts(counts, scale))
+        return scaled
+
+    def add(self, other: 'Frequencies') -> None:
+        """
+        Adds the frequencies of another instance to this one (eg. to combine
+        the frequencies of distinct sets of cases).
+        :param other: the frequencies that should be added
+        """
+        for name, counts in vars(other).items():
+            own_counts = getattr(self, name)
+            for key, value in counts.items():
+                own_counts[key] = own_counts.get(key, 0) + value
+
+    def subtract(self, other: 'Frequencies') -> None:
+        """
+        Removes the frequencies of another instance that were previously
+        added to this one. Frequencies dropping to zero are removed.
+        :param other: the frequencies that should be removed
+        """
+        for name, counts in vars(other).items():
+            own_counts = getattr(self, name)
+            for key, value in counts.items():
+                remaining = own_counts.get(key, 0) - value
+                if remaining > 0:
+                    own_counts[key] = remaining
+                else:
+                    own_counts.pop(key, None)
+
+    def to_json(self) -> Dict[str, List[list]]:
+        """
+        Converts the frequencies to a JSON serializable representation.
+        :return: dict mapping the name of each frequency to a list of entries
+        consisting of the activities followed by the count
+        """
+        return {name: [[*(key if name in SEQUENCE_FREQUENCIES else [key]),
+                        value] for key, value in counts.items()]
+                for name, counts in vars(self).items()}
+
+    @staticmethod
+    def from_json(data: Dict[str, List[list]]) -> 'Frequencies':
+        """
+        Restores frequencies from the representation created by to_json.
+        :param data: the JSON representation
+        :return: the frequencies
+        """
+        frequencies = Frequencies()
+        for name, entries in data.items():
+            if name in SEQUENCE_FREQUENCIES:
+                counts = {tuple(entry[:-1]): entry[-1] for entry in entries}
+            else:
+                counts = {entry[0]: entry[1] for entry in entries}
+            setattr(frequencies, name, counts)
+        return frequencies
+
+
+def _to_dict(keys, counts: numpy.ndarray) -> Dict:
+    present = numpy.flatnonzero(counts)
+    return {keys[index]: int(counts[index]) for index in present}
+
+
+def _bincount(codes: numpy.ndarray,
+              weights: Optional[numpy.ndarray]) -> numpy.ndarray:
+    if weights is None:
+        return numpy.bincount(codes)
+    return numpy.bincount(codes, weights=weights).round().astype(numpy.int64)
+
+
+def _encode_sequences(activity_codes: numpy.ndarray,
+                      case_codes: numpy.ndarray, offsets: List[int],
+                      activity_count: int) \
+        -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Encodes the sequence of activities found at the supplied offsets relative
+    to each entry as a single integer. Only entries whose sequence lies
+    within a single case are encoded.
+    :return: tuple containing the codes of the sequences and a mask marking
+    the entries they start at
+    """
+    last = offsets[-1]
+    valid = case_codes[last:] == case_codes[:len(case_codes) - last]
+    sequence_codes = numpy.zeros(numpy.count_nonzero(valid), dtype=numpy.int64)
+    for offset in offsets:
+        sequence_codes = sequence_codes * activity_count \
+            + activity_codes[offset:len(activity_codes) - last + offset][valid]
+    return sequence_codes, valid
+
+
+def _count_sequences(activities: List[str], activity_codes: numpy.ndarray,
+                     case_codes: numpy.ndarray, offsets: List[int],
+                     weights: Optional[numpy.ndarray] = None) -> Dict:
+    """
+    Counts the sequences of activities found at the supplied offsets relative
+    to each entry (eg. [0, 1] for directly-follows relations). Each sequence
+    is counted with the weight of its first entry if weights are supplied.
+    """
+    activity_count = len(activities)
+    sequence_codes, valid = _encode_sequences(activity_codes, case_codes,
+                                              offsets, activity_count)
+    # only the sequences that actually occur are counted to avoid allocating
+    # memory for every possible combination of activities
+    codes, inverse = numpy.unique(sequence_codes, return_inverse=True)
+    counts = _bincount(inverse, None if weights is None
+                       else weights[:len(weights) - offsets[-1]][valid])
+    return {_decode_sequence(code, activities, len(offsets)): count
+            for code, count in zip(codes.tolist(), counts.tolist())}
+
+
+def _decode_sequence(code: int, activities: List[str],
+                     length: int) -> Tuple[str, ...]:
+    sequence = []
+    for _ in range(length):
+        code, activity_code = divmod(code, len(activities))
+        sequence.insert(0, activities[activity_code])
+    return tuple(sequence)
+
+
+def count_frequencies(frame: DataFrame, case_column: str = CASE_COLUMN,
+                      activity_column: str = ACTIVITY_COLUMN) -> Frequencies:
+    """
+    Counts the frequencies of the cases contained in a DataFrame. The order of
+    the entries within a case is defined by their order in the DataFrame.
+    :param frame: the DataFrame
+    :param case_column: column identifying the case of an entry
+    :param activity_column: column containing the activity of an entry
+    :return: the frequencies
+    """
+    if frame.empty:
+        return Frequencies()
+    activity_codes, activities = pandas.factorize(frame[activity_column])
+    case_codes, _ = pandas.factorize(frame[case_column])
+    return count_coded_frequencies(case_codes, activity_codes,
+                                   activities.tolist())
+
+
+def count_coded_frequencies(
+        case_codes: numpy.ndarray, activity_codes: numpy.ndarray,
+        activities: List[str],
+        case_weights: Optional[numpy.ndarray] = None) -> Frequencies:
+    """
+    Counts the frequencies of cases whose entries are represented by integer
+    codes of their case and activity.
+    :param case_codes: code of the case of each entry
+    :param activity_codes: code of the activity of each entry (index into the
+    list of activities)
+    :param activities: the activities
+    :param case_weights: number of times each case (indexed by its code)
+    should be counted (eg. the number of sessions following a variant)
+    :return: the frequencies
+    """
+    frequencies = Frequencies()
+    if len(case_codes) == 0:
+        return frequencies
+    # group the entries by case while keeping their order within each case
+    order = numpy.argsort(case_codes, kind='stable')
+    case_codes = case_codes[order]
+    activity_codes = activity_codes[order]
+    weights = None if case_weights is None else case_weights[case_codes]
+
+    same_case = case_codes[1:] == case_codes[:-1]
+    case_starts = numpy.concatenate(([True], ~same_case))
+    case_ends = numpy.concatenate((~same_case, [True]))
+    frequencies.activities = _to_dict(activities,
+                                      _bincount(activity_codes, weights))
+    frequencies.start_activities = _to_dict(activities, _bincount(
+        activity_codes[case_starts],
+        None if weights is None else weights[case_starts]))
+    frequencies.end_activities = _to_dict(activities, _bincount(
+        activity_codes[case_ends],
+        None if weights is None else weights[case_ends]))
+    for name, offsets in zip(SEQUENCE_FREQUENCIES,
+                             [[0, 1], [0, 2], [0, 1, 2]]):
+        setattr(frequencies, name, _count_sequences(
+            activities, activity_codes, case_codes, offsets, weights))
+    log.info('counted %s', frequencies)
+    return frequencies
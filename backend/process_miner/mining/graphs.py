@@ -2,90 +2,362 @@
 Module for creating different graph types
 """
 import logging
-import tempfile
+import math
+from pathlib import Path
+from typing import Dict, NamedTuple, Tuple
 
-import pm4py.algo.discovery.dfg.algorithm as dfg_alg
-import pm4py.algo.discovery.heuristics.algorithm as hn_alg
+import pm4py.algo.discovery.heuristics.versions.classic as hn_classic
+import pm4py.objects.heuristics_net.defaults as hn_defaults
 import pm4py.visualization.dfg.visualizer as dfg_vis
-import pm4py.visualization.heuristics_net.visualizer as hn_vis
-from pandas import DataFrame
-from pm4py.algo.discovery.dfg.algorithm import Variants as DfgAlgVariants
+from graphviz import Digraph
+from pm4py.objects.heuristics_net.net import HeuristicsNet
+from pm4py.visualization.common.utils import human_readable_stat
+from pm4py.visualization.dfg.parameters import Parameters as DfgVisParams
+from pm4py.visualization.dfg.versions.simple_visualize import \
+    assign_penwidth_edges
 from pm4py.visualization.dfg.visualizer import Variants as DfgVisVariants
-from pm4py.visualization.parameters import Parameters as VisualisationParams
+from pm4py.visualization.heuristics_net.versions.pydotplus import \
+    transform_to_hex_2
 
-import process_miner.mining.util.data as data_util
+from process_miner.mining.frequencies import Frequencies
+from process_miner.mining.simplification import Simplification, \
+    simplify_frequencies
 
 log = logging.getLogger(__name__)
 
-COLUMN_MAPPINGS = {
-    'timestamp': 'time:timestamp',
-    'correlationId': 'case:concept:name',
-    'label': 'concept:name',
-    'approach': 'case:approach'
-}
+# number of edges kept when a graph is too complex to be rendered in time
+TRIMMED_MAX_EDGES = 30
+# same limit pm4py applies to Directly Follows Graphs
+PERFORMANCE_MAX_EDGES = 75
 
 
-def _convert_data_frame_to_event_log(frame):
-    data_util.rename_columns(frame, COLUMN_MAPPINGS)
-    return data_util.convert_to_log(frame)
+class HeuristicsThresholds(NamedTuple):
+    """
+    Thresholds of the heuristics miner. The defaults are the ones of pm4py.
+    """
+    dependency: float = hn_defaults.DEFAULT_DEPENDENCY_THRESH
+    and_measure: float = hn_defaults.DEFAULT_AND_MEASURE_THRESH
+    # minimum number of times a directly-follows relation has to be observed
+    observations: int = hn_defaults.DEFAULT_MIN_DFG_OCCURRENCES
+
+
+def render_directly_follows_graph(frequencies: Frequencies,
+                                  output_format='svg') -> bytes:
+    """
+    Renders a Directly Follows Graph from already counted frequencies.
+    :param frequencies: the frequencies
+    :param output_format: desired output format
+    :return: the rendered graph
+    """
+    return render_graph(build_directly_follows_graph(frequencies),
+                        output_format)
 
 
-def create_directly_follows_graph(frame: DataFrame, output_format='svg'):
+def build_directly_follows_graph(frequencies: Frequencies) -> Digraph:
     """
-    Creates a Directly Follows Graph from the supplied DataFrame.
-    :param frame: the DataFrame
+    Creates the graphviz description of a Directly Follows Graph without
+    laying it out.
+    :param frequencies: the frequencies
+    :return: the description
+    """
+    return dfg_vis.apply(frequencies.dfg,
+                         activities_count=frequencies.activities,
+                         variant=DfgVisVariants.FREQUENCY,
+                         parameters={
+                             DfgVisParams.START_ACTIVITIES:
+                                 frequencies.start_activities,
+                             DfgVisParams.END_ACTIVITIES:
+                                 frequencies.end_activities
+                         })
+
+
+def render_graph(graph: Digraph, output_format: str = 'svg') -> bytes:
+    """
+    Lays out a graph by piping its description through graphviz. The result
+    is kept in memory, so no temporary files are involved.
+    :param graph: the graphviz description of the graph
     :param output_format: desired output format
-    :return: object representing the created graph
-    """
-    event_log = _convert_data_frame_to_event_log(frame)
-    dfg = dfg_alg.apply(log=event_log,
-                        variant=DfgAlgVariants.FREQUENCY)
-    apply = dfg_vis.apply(dfg,
-                          log=event_log,
-                          variant=DfgVisVariants.FREQUENCY,
-                          parameters={
-                              VisualisationParams.FORMAT: output_format
-                          })
-    saved_dfg = tempfile.NamedTemporaryFile(prefix='pm_',
-                                            suffix=f'.{output_format}',
-                                            delete=False)
-    dfg_vis.save(apply, saved_dfg.name)
-    # close here and delete after final use to work around access issues on
-    # in case anybody tries to run this on windows
-    saved_dfg.close()
-    return saved_dfg
-
-
-def save_directly_follows_graph(graph, path):
-    """
-    Saves a directly-follows graph to the specified path.
-    :param graph: the directly-follows graph
+    :return: the rendered graph
+    """
+    return graph.pipe(format=output_format)
+
+
+def get_directly_follows_graph_structure(frequencies: Frequencies) -> Dict:
+    """
+    Creates a canonical representation of everything a rendered Directly
+    Follows Graph depends on. Equal frequencies always result in an equal
+    representation.
+    :param frequencies: the frequencies of the graph
+    :return: JSON serializable representation of the graph
+    """
+    return {
+        'type': 'dfg',
+        'nodes': [{'name': name, 'frequency': count}
+                  for name, count in sorted(frequencies.activities.items())],
+        'edges': [{'source': source, 'target': target, 'frequency': count}
+                  for (source, target), count
+                  in sorted(frequencies.dfg.items())],
+        'startActivities': dict(sorted(
+            frequencies.start_activities.items())),
+        'endActivities': dict(sorted(frequencies.end_activities.items()))
+    }
+
+
+def render_performance_graph(
+        frequencies: Frequencies,
+        transition_times: Dict[Tuple[str, str], Dict[str, float]],
+        output_format: str = 'svg') -> bytes:
+    """
+    Renders a Directly Follows Graph annotated with transition times.
+    :param frequencies: the frequencies
+    :param transition_times: the statistics of the transition times of each
+    directly-follows relation
+    :param output_format: desired output format
+    :return: the rendered graph
+    """
+    return render_graph(
+        build_performance_graph(frequencies, transition_times), output_format)
+
+
+def _format_duration(seconds: float) -> str:
+    # pm4py truncates to whole seconds, which hides most of our transitions
+    if seconds < 1:
+        return f'{seconds * 1000:.0f}ms'
+    return human_readable_stat(seconds)
+
+
+def _get_performance_label(times: Dict[str, float]) -> str:
+    # graphviz interprets the escaped newlines as centered line breaks
+    return f'mean {_format_duration(times["mean"])}\\n' \
+           f'median {_format_duration(times["median"])}\\n' \
+           f'p95 {_format_duration(times["p95"])}'
+
+
+def build_performance_graph(
+        frequencies: Frequencies,
+        transition_times: Dict[Tuple[str, str], Dict[str, float]]) \
+        -> Digraph:
+    """
+    Creates the graphviz description of a Directly Follows Graph whose edges
+    are labeled with the mean, median and 95th percentile of their transition
+    times. The styling matches the performance variant of pm4py's DFG
+    visualizer; edges get thicker with increasing mean transition time. Only
+    the most frequent relations are included.
+    :param frequencies: the frequencies
+    :param transition_times: the statistics of the transition times of each
+    directly-follows relation
+    :return: the description
+    """
+    edges = sorted(frequencies.dfg, key=lambda edge: (-frequencies.dfg[edge],
+                                                      edge))
+    edges = sorted(edge for edge in edges[:PERFORMANCE_MAX_EDGES]
+                   if edge in transition_times)
+    activities = sorted({activity for edge in edges for activity in edge}
+                        or frequencies.activities)
+    node_ids = {activity: str(index)
+                for index, activity in enumerate(activities)}
+    graph = Digraph(graph_attr={'bgcolor': 'transparent'})
+    graph.attr('node', shape='box')
+    for activity in activities:
+        graph.node(node_ids[activity], activity)
+    penwidths = assign_penwidth_edges(
+        {edge: transition_times[edge]['mean'] for edge in edges})
+    for edge in edges:
+        graph.edge(node_ids[edge[0]], node_ids[edge[1]],
+                   label=_get_performance_label(transition_times[edge]),
+                   penwidth=penwidths[edge])
+    start_activities = [activity for activity in frequencies.start_activities
+                        if activity in node_ids]
+    if start_activities:
+        graph.node('@@startnode', '@@S', style='filled', shape='circle',
+                   fillcolor='#32CD32', fontcolor='#32CD32')
+    for activity in sorted(start_activities):
+        graph.edge('@@startnode', node_ids[activity])
+    end_activities = [activity for activity in frequencies.end_activities
+                      if activity in node_ids]
+    if end_activities:
+        graph.node('@@endnode', '@@E', style='filled', shape='circle',
+                   fillcolor='#FFA500', fontcolor='#FFA500')
+    for activity in sorted(end_activities):
+        graph.edge(node_ids[activity], '@@endnode')
+    graph.attr(overlap='false')
+    graph.attr(fontsize='11')
+    return graph
+
+
+def get_performance_graph_structure(
+        frequencies: Frequencies,
+        transition_times: Dict[Tuple[str, str], Dict[str, float]]) -> Dict:
+    """
+    Creates a canonical representation of a Directly Follows Graph annotated
+    with transition times.
+    :param frequencies: the frequencies
+    :param transition_times: the statistics of the transition times of each
+    directly-follows relation
+    :return: JSON serializable representation of the graph
+    """
+    structure = get_directly_follows_graph_structure(frequencies)
+    structure['type'] = 'performance'
+    for edge in structure['edges']:
+        edge.update(transition_times.get((edge['source'], edge['target']),
+                                         {}))
+    return structure
+
+
+def trim_frequencies(frequencies: Frequencies,
+                     max_edges: int = TRIMMED_MAX_EDGES) -> Frequencies:
+    """
+    Reduces the frequencies to the most frequent directly-follows relations
+    and the activities connected by them, resulting in a graph that is much
+    cheaper to lay out.
+    :param frequencies: the frequencies
+    :param max_edges: number of relations that are kept
+    :return: the trimmed frequencies
+    """
+    trimmed, _ = simplify_frequencies(frequencies,
+                                      Simplification(max_edges=max_edges))
+    return trimmed
+
+
+def save_directly_follows_graph(graph: bytes, path):
+    """
+    Saves a rendered directly-follows graph to the specified path.
+    :param graph: the rendered directly-follows graph
     :param path: the path
     """
-    log.info('saving directly follows graph %s to path %s', graph, path)
-    dfg_vis.save(graph, path)
+    log.info('saving directly follows graph to path %s', path)
+    Path(path).write_bytes(graph)
 
 
-def create_heuristic_net(frame: DataFrame, output_format: str = 'svg'):
+def mine_heuristic_net(
+        frequencies: Frequencies,
+        thresholds: HeuristicsThresholds = HeuristicsThresholds()) \
+        -> HeuristicsNet:
+    """
+    Mines a Heuristic Net from the supplied frequencies. Only the aggregated
+    counts are required so the effort depends on the number of distinct
+    activities instead of the number of log entries. The frequencies don't
+    depend on the thresholds, so they can be reused when only the thresholds
+    change.
+    :param frequencies: the frequencies
+    :param thresholds: thresholds used for pruning the net
+    :return: the mined net
     """
-    Creates a Heuristic Net from the supplied DataFrame.
-    :param frame: the DataFrame
+    parameters = hn_classic.Parameters
+    return hn_classic.apply_heu_dfg(
+        frequencies.dfg,
+        activities=list(frequencies.activities),
+        activities_occurrences=frequencies.activities,
+        start_activities=frequencies.start_activities,
+        end_activities=frequencies.end_activities,
+        dfg_window_2=frequencies.dfg_window_2,
+        freq_triples=frequencies.freq_triples,
+        parameters={
+            parameters.DEPENDENCY_THRESH: thresholds.dependency,
+            parameters.AND_MEASURE_THRESH: thresholds.and_measure,
+            parameters.MIN_DFG_OCCURRENCES: thresholds.observations
+        })
+
+
+def draw_heuristic_net(net: HeuristicsNet, output_format: str = 'svg') \
+        -> bytes:
+    """
+    Renders an already mined Heuristic Net.
+    :param net: the net
     :param output_format: desired output format
-    :return: object representing the created graph
+    :return: the rendered net
+    """
+    return render_graph(build_heuristic_net_graph(net), output_format)
+
+
+def _get_pen_width(frequency: int) -> str:
+    return str(1.0 + math.log(1 + frequency) / 11.0)
+
+
+def build_heuristic_net_graph(net: HeuristicsNet) -> Digraph:
+    """
+    Creates the graphviz description of a Heuristic Net without laying it
+    out. The styling matches the frequency representation of pm4py's
+    visualizer, which is limited to writing the net to a temporary file.
+    :param net: the net
+    :return: the description
+    """
+    graph = Digraph(strict=True, graph_attr={'bgcolor': 'transparent'})
+    # activities are only used as labels since graphviz interprets colons in
+    # node names as ports
+    node_ids = {name: str(index) for index, name in enumerate(net.nodes)}
+    for name, node in net.nodes.items():
+        graph.node(node_ids[name], label=f'{name} ({node.node_occ})',
+                   shape='box', style='filled', fillcolor=transform_to_hex_2(
+                       max(255 - math.log(node.node_occ) * 9, 0)))
+    for name, node in net.nodes.items():
+        for target, edges in node.output_connections.items():
+            if target.node_name not in node_ids:
+                continue
+            for edge in edges:
+                graph.edge(node_ids[name], node_ids[target.node_name],
+                           label=str(edge.repr_value), color=edge.repr_color,
+                           fontcolor=edge.repr_color,
+                           penwidth=_get_pen_width(edge.repr_value))
+    color = net.default_edges_color[0]
+    start_activities = {name: count for name, count
+                        in net.start_activities[0].items()
+                        if name in node_ids} if net.start_activities else {}
+    if start_activities:
+        graph.node('start_0', label='@@S', color=color, fontsize='8',
+                   fontcolor='#32CD32', fillcolor='#32CD32', style='filled')
+    for name, count in start_activities.items():
+        graph.edge('start_0', node_ids[name], label=str(count), color=color,
+                   fontcolor=color, penwidth=_get_pen_width(count))
+    end_activities = {name: count for name, count
+                      in net.end_activities[0].items()
+                      if name in node_ids} if net.end_activities else {}
+    if end_activities:
+        graph.node('end_0', label='@@E', fontsize='8', fontcolor='#FFA500',
+                   fillcolor='#FFA500', style='filled')
+    for name, count in end_activities.items():
+        graph.edge(node_ids[name], 'end_0', label=str(count), color=color,
+                   fontcolor=color, penwidth=_get_pen_width(count))
+    return graph
+
+
+def get_heuristic_net_structure(net: HeuristicsNet) -> Dict:
+    """
+    Creates a canonical representation of everything a rendered Heuristic Net
+    depends on. Equal nets always result in an equal representation.
+    :param net: the net
+    :return: JSON serializable representation of the net
     """
-    event_log = _convert_data_frame_to_event_log(frame)
-    log.info('creating heuristic net')
-    heu_net = hn_alg.apply_heu(log=event_log)
-    return hn_vis.apply(heu_net=heu_net, parameters={
-        VisualisationParams.FORMAT: output_format
-    })
+    edges = []
+    for source, node in net.nodes.items():
+        for target, connections in node.output_connections.items():
+            for edge in connections:
+                edges.append({'source': source, 'target': target.node_name,
+                              'frequency': edge.repr_value,
+                              'dependency': edge.dependency_value})
+    start_activities = net.start_activities[0] if net.start_activities \
+        else {}
+    end_activities = net.end_activities[0] if net.end_activities else {}
+    return {
+        'type': 'hn',
+        'nodes': [{'name': name, 'frequency': node.node_occ}
+                  for name, node in sorted(net.nodes.items())],
+        'edges': sorted(edges, key=lambda edge: (edge['source'],
+                                                 edge['target'])),
+        'startActivities': {name: start_activities[name]
+                            for name in sorted(start_activities)
+                            if name in net.nodes},
+        'endActivities': {name: end_activities[name]
+                          for name in sorted(end_activities)
+                          if name in net.nodes}
+    }
 
 
-def save_heuristic_net(net, path):
+def save_heuristic_net(net: bytes, path):
     """
-    Saves a heuristic net to the specified path.
-    :param net: the heuristic net
+    Saves a rendered heuristic net to the specified path.
+    :param net: the rendered heuristic net
     :param path: the path
     """
-    log.info('saving heuristic net %s to path %s', net, path)
-    hn_vis.save(net, path)
+    log.info('saving heuristic net to path %s', path)
+    Path(path).write_bytes(net)
@@ -0,0 +1,183 @@
+"""
+Module for maintaining quantile sketches of session durations and of the
+latency of each activity (the time until the next entry of its session). The
+sketches are kept per approach and bank, so quantiles can be estimated for
+any combination of both by merging the matching sketches.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from process_miner.log_handling import graylog_access as ga
+from process_miner.mining import metadata
+from process_miner.mining.frequencies import ACTIVITY_COLUMN
+from process_miner.mining.sketches import QuantileSketch
+
+log = logging.getLogger(__name__)
+
+QUANTILES = {'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+# fields of an entry needed for the latency of its activity once the next
+# entry of the session is stored
+LAST_ENTRY_FIELDS = [ACTIVITY_COLUMN, 'approach', 'bank']
+
+
+def get_last_entry(entry: Dict) -> Dict[str, str]:
+    """
+    Extracts the fields of the last entry of a session which are kept in its
+    summary.
+    :param entry: the entry
+    :return: dict containing the relevant fields
+    """
+    return {field: _get_value(entry, field) for field in LAST_ENTRY_FIELDS}
+
+
+def _get_value(entry: Dict, field: str) -> str:
+    value = entry.get(field)
+    if not metadata.is_present(value):
+        return metadata.DEFAULT_MISSING_VALUE
+    return str(value)
+
+
+def _get_seconds(start: str, end: str) -> float:
+    return (ga.get_datetime_from_timestamp(end)
+            - ga.get_datetime_from_timestamp(start)).total_seconds()
+
+
+def _get_first(values: List[str]) -> str:
+    values = metadata.get_relevant_values(values)
+    return values[0] if values else metadata.DEFAULT_MISSING_VALUE
+
+
+class LatencySketches:
+    """
+    Class containing the sketches of session durations and activity
+    latencies in seconds. Sessions can be removed again, so the durations
+    can be maintained incrementally when further entries of a session are
+    stored. The latency of an activity never changes once the next entry is
+    known, so it is only ever added.
+    """
+    def __init__(self):
+        # approach -> bank -> sketch
+        self.durations: Dict[str, Dict[str, QuantileSketch]] = {}
+        # activity -> approach -> bank -> sketch
+        self.activities: Dict[str, Dict[str, Dict[str, QuantileSketch]]] = {}
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'durations <{len(self.durations)}>, ' \
+               f'activities <{len(self.activities)}>]'
+
+    def add_session(self, summary: Dict, sign: int = 1) -> None:
+        """
+        Adds the duration of a session. Like the metadata module the session
+        is attributed to its first approach and bank.
+        :param summary: the summary of the session (see session_summaries)
+        :param sign: -1 to remove a previously added session instead
+        """
+        cell = self.durations \
+            .setdefault(_get_first(summary['approach']), {}) \
+            .setdefault(_get_first(summary['bank']), QuantileSketch())
+        cell.add(_get_seconds(summary['start'], summary['end']), sign)
+
+    def add_steps(self, entries: Iterable[Dict],
+                  previous: Optional[Dict] = None) -> None:
+        """
+        Adds the latencies of the activities of further entries of a session.
+        The activity of each entry is attributed to the approach and bank of
+        the entry itself.
+        :param entries: the entries (sorted by timestamp)
+        :param previous: the summary of the previously stored entries of the
+        session, used for the latency of its last activity
+        """
+        last, end = (previous['last'], previous['end']) if previous \
+            else (None, None)
+        for entry in entries:
+            if last is not None:
+                self._get_activity_sketch(last).add(
+                    _get_seconds(end, entry['timestamp']))
+            last, end = get_last_entry(entry), entry['timestamp']
+
+    def get_quantiles(self, approach: Optional[str] = None,
+                      bank: Optional[str] = None) -> Dict:
+        """
+        Estimates the quantiles of the session durations and activity
+        latencies of all sessions matching the filters by merging their
+        sketches.
+        :param approach: the approach the sessions should be limited to
+        :param bank: the bank the sessions should be limited to
+        :return: dict containing the number of values and the estimated
+        quantiles of the durations and of the latencies of each activity
+        """
+        activities = {}
+        for activity, cells in sorted(self.activities.items()):
+            sketch = _merge_cells(cells, approach, bank)
+            if sketch.count > 0:
+                activities[activity] = _get_statistics(sketch)
+        return {
+            'relativeAccuracy': QuantileSketch().relative_accuracy,
+            'sessionDuration': _get_statistics(
+                _merge_cells(self.durations, approach, bank)),
+            'activities': activities
+        }
+
+    def to_json(self) -> Dict:
+        """
+        Converts the sketches to a JSON serializable representation.
+        :return: the representation
+        """
+        return {
+            'durations': _cells_to_json(self.durations),
+            'activities': {activity: _cells_to_json(cells)
+                           for activity, cells in self.activities.items()}
+        }
+
+    @staticmethod
+    def from_json(data: Dict) -> 'LatencySketches':
+        """
+        Restores sketches from the representation created by to_json.
+        :param data: the JSON representation
+        :return: the sketches
+        """
+        sketches = LatencySketches()
+        sketches.durations = _cells_from_json(data['durations'])
+        sketches.activities = {
+            activity: _cells_from_json(cells)
+            for activity, cells in data['activities'].items()}
+        return sketches
+
+    def _get_activity_sketch(self, entry: Dict[str, str]) -> QuantileSketch:
+        return self.activities \
+            .setdefault(entry[ACTIVITY_COLUMN], {}) \
+            .setdefault(entry['approach'], {}) \
+            .setdefault(entry['bank'], QuantileSketch())
+
+
+def _merge_cells(cells: Dict[str, Dict[str, QuantileSketch]],
+                 approach: Optional[str],
+                 bank: Optional[str]) -> QuantileSketch:
+    merged = QuantileSketch()
+    for cell_approach, banks in cells.items():
+        if approach is not None and cell_approach != approach:
+            continue
+        for cell_bank, sketch in banks.items():
+            if bank is None or cell_bank == bank:
+                merged.merge(sketch)
+    return merged
+
+
+def _get_statistics(sketch: QuantileSketch) -> Dict:
+    count = sketch.count
+    return {'count': count,
+            **{name: sketch.quantile(quantile) if count else None
+               for name, quantile in QUANTILES.items()}}
+
+
+def _cells_to_json(cells: Dict[str, Dict[str, QuantileSketch]]) -> Dict:
+    return {approach: {bank: sketch.to_json()
+                       for bank, sketch in banks.items()}
+            for approach, banks in cells.items()}
+
+
+def _cells_from_json(data: Dict) -> Dict[str, Dict[str, QuantileSketch]]:
+    return {approach: {bank: QuantileSketch.from_json(sketch)
+                       for bank, sketch in banks.items()}
+            for approach, banks in data.items()}
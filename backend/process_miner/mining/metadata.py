@@ -2,14 +2,20 @@
 Module for extracting metadata from log data
 """
 import logging
-from collections import defaultdict
-from typing import Dict
+from typing import Dict, List
 
+import numpy
+import pandas
 from pandas import DataFrame
 
 log = logging.getLogger(__name__)
 
 DEFAULT_MISSING_VALUE = 'not available'
+SESSION_COLUMN = 'correlationId'
+# stands in for missing values while grouping, since groupby only keeps
+# missing values as keys as of pandas 1.1 (numpy strips trailing null
+# characters, so the key doesn't end with one)
+_MISSING_KEY = '\0missing'
 
 
 def get_sessions_per_error_type(frame: DataFrame):
@@ -41,16 +47,83 @@ def get_sessions_per_bank(frame: DataFrame):
     return _count_values_per_session(frame, 'bank')
 
 
+def get_sessions_per_value(frame: DataFrame,
+                           columns: List[str]) -> Dict[str, Dict]:
+    """
+    Counts number of sessions each value of multiple columns occurs in in the
+    supplied DataFrame. The entries are reduced to the distinct combinations
+    of the columns per session once, so this is cheaper than counting each
+    column separately.
+    :param frame: the DataFrame
+    :param columns: the columns
+    :return: dict containing the number of occurrences per value of each
+    column
+    """
+    combinations = frame[[SESSION_COLUMN, *columns]].drop_duplicates()
+    return {column: _count_values_per_session(combinations, column)
+            for column in columns}
+
+
+def is_present(value) -> bool:
+    """
+    Checks if a field of a log entry has a value.
+    :param value: the value of the field
+    :return: whether the value is neither missing nor empty
+    """
+    return value is not None and value != '' and not pandas.isna(value)
+
+
+def get_relevant_values(values: List[str]) -> List[str]:
+    """
+    Determines which of the distinct values of a session should be counted.
+    The missing value is only counted if the session has no other values.
+    :param values: the distinct values of a session
+    :return: the values that should be counted
+    """
+    if len(values) > 1:
+        return [value for value in values if value != DEFAULT_MISSING_VALUE]
+    return values
+
+
+def _get_relevant_session_values(frame: DataFrame, column: str) -> DataFrame:
+    """
+    Determines the values of a column that should be counted for each session
+    (see get_relevant_values) for all sessions at once. The sessions are
+    sorted by their id and their values keep the order of their first
+    occurrence.
+    """
+    values = frame[[SESSION_COLUMN, column]] \
+        .dropna(subset=[SESSION_COLUMN]).drop_duplicates() \
+        .sort_values(SESSION_COLUMN, kind='stable')
+    value_counts = values.groupby(SESSION_COLUMN)[column].transform('size')
+    missing = values[column] == DEFAULT_MISSING_VALUE
+    return values[~missing | (value_counts == 1)]
+
+
+def _restore_missing(value):
+    return numpy.nan if value == _MISSING_KEY else value
+
+
 def _count_values_per_session(frame, column):
-    counts = defaultdict(int)
-    for _, session_frame in frame.groupby(['correlationId']):
-        values = _get_unique_column_values(column, session_frame)
-        # make sure we don't count a missing value if session has values
-        if len(values) > 1:
-            values.remove(DEFAULT_MISSING_VALUE)
-        for value in values:
-            counts[value] += 1
-    return counts
+    values = _get_relevant_session_values(frame, column)[column] \
+        .fillna(_MISSING_KEY)
+    counts = values.groupby(values, sort=False).size()
+    return {_restore_missing(value): count
+            for value, count in counts.to_dict().items()}
+
+
+def get_session_count_per_value(frame: DataFrame,
+                                column: str) -> Dict[str, int]:
+    """
+    Counts the sessions with an entry of each value of a column in the
+    supplied DataFrame. In contrast to get_sessions_per_value the missing
+    value is counted for every session containing it.
+    :param frame: the DataFrame
+    :param column: the column
+    :return: dict containing the number of sessions per value
+    """
+    combinations = frame[[SESSION_COLUMN, column]].drop_duplicates()
+    return combinations.groupby(column).size().to_dict()
 
 
 def get_method_type_count_per_approach(frame: DataFrame):
@@ -58,21 +131,27 @@ def get_method_type_count_per_approach(frame: DataFrame):
     Extracts the count of different approaches per method type.
     :return: dict containing method counts for each approach
     """
-    methods_counts_per_approach = defaultdict(lambda: defaultdict(int))
-    for session, session_frame in frame.groupby(['correlationId']):
-        approaches = _get_unique_column_values('approach', session_frame)
-        approach = approaches[0]
-        if len(approaches) > 1:
-            log.warning('more than one approach in session %s', session)
-            log.warning('using first occured approach %s', approach)
-        methods = _get_unique_column_values('method', session_frame)
-        # make sure we don't count a missing value if session has values
-        if len(methods) > 1:
-            methods.remove(DEFAULT_MISSING_VALUE)
-        for method in methods:
-            methods_counts_per_approach[approach][method] += 1
-
-    return dict(methods_counts_per_approach)
+    sessions = frame.dropna(subset=[SESSION_COLUMN])
+    # the first occurred approach of a session is used
+    approaches = sessions.drop_duplicates(SESSION_COLUMN) \
+        .set_index(SESSION_COLUMN)['approach']
+    approach_counts = sessions[[SESSION_COLUMN, 'approach']] \
+        .drop_duplicates()[SESSION_COLUMN].value_counts()
+    for session in approach_counts.index[approach_counts > 1]:
+        log.warning('more than one approach in session %s', session)
+        log.warning('using first occured approach %s', approaches[session])
+
+    methods = _get_relevant_session_values(sessions, 'method')
+    pairs = methods.assign(
+        approach=methods[SESSION_COLUMN].map(approaches).to_numpy()) \
+        .fillna({'approach': _MISSING_KEY, 'method': _MISSING_KEY})
+    methods_counts_per_approach = {}
+    for (approach, method), count in pairs.groupby(
+            ['approach', 'method'], sort=False).size().items():
+        methods_counts_per_approach.setdefault(
+            _restore_missing(approach), {})[_restore_missing(method)] = \
+            int(count)
+    return methods_counts_per_approach
 
 
 def get_method_types(frame: DataFrame):
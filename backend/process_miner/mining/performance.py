@@ -0,0 +1,115 @@
+"""
+Module for calculating the time passing between directly following
+activities. The durations are calculated for all entries at once with NumPy
+instead of iterating over the traces of an EventLog.
+"""
+import logging
+from typing import Dict, Tuple
+
+import numpy
+import pandas
+from pandas import DataFrame
+
+from process_miner.mining.frequencies import ACTIVITY_COLUMN, CASE_COLUMN
+
+log = logging.getLogger(__name__)
+
+TIMESTAMP_COLUMN = 'timestamp'
+# statistics calculated for the durations of each directly-follows relation
+STATISTICS = {'mean': None, 'median': 0.5, 'p95': 0.95}
+
+
+def _get_quantiles(durations: numpy.ndarray, starts: numpy.ndarray,
+                   counts: numpy.ndarray, quantile: float) -> numpy.ndarray:
+    """
+    Calculates a quantile of each group of sorted durations by linear
+    interpolation (like numpy.quantile).
+    """
+    positions = starts + quantile * (counts - 1)
+    lower = numpy.floor(positions).astype(numpy.int64)
+    upper = numpy.ceil(positions).astype(numpy.int64)
+    return durations[lower] \
+        + (durations[upper] - durations[lower]) * (positions - lower)
+
+
+def _get_relation_statistics(case_codes: numpy.ndarray,
+                             activity_codes: numpy.ndarray,
+                             activity_count: int, seconds: numpy.ndarray) \
+        -> Tuple[numpy.ndarray, Dict[str, numpy.ndarray]]:
+    """
+    Calculates the statistics of the durations of each directly-follows
+    relation. A relation is encoded as source code * activity count + target
+    code.
+    :return: tuple containing the sorted codes of the relations and an array
+    of each statistic containing its value per relation
+    """
+    # group the entries by case while keeping their order within each case
+    order = numpy.argsort(case_codes, kind='stable')
+    case_codes = case_codes[order]
+    activity_codes = activity_codes[order]
+    seconds = seconds[order]
+
+    same_case = case_codes[1:] == case_codes[:-1]
+    relations = activity_codes[:-1][same_case] * activity_count \
+        + activity_codes[1:][same_case]
+    durations = (seconds[1:] - seconds[:-1])[same_case]
+    # sort by relation and duration so each relation is a sorted slice
+    order = numpy.lexsort((durations, relations))
+    relations = relations[order]
+    durations = durations[order]
+    codes, starts, counts = numpy.unique(relations, return_index=True,
+                                         return_counts=True)
+    if len(codes) == 0:
+        return codes, {}
+    return codes, {
+        name: numpy.add.reduceat(durations, starts) / counts
+        if quantile is None
+        else _get_quantiles(durations, starts, counts, quantile)
+        for name, quantile in STATISTICS.items()
+    }
+
+
+def get_seconds(timestamps: pandas.Series) -> numpy.ndarray:
+    """
+    Converts timestamps in the format used by Graylog to seconds since epoch.
+    :param timestamps: the timestamps
+    :return: the seconds
+    """
+    nanoseconds = pandas.to_datetime(timestamps, utc=True) \
+        .to_numpy(dtype='datetime64[ns]').astype(numpy.int64)
+    return nanoseconds / 1e9
+
+
+def calculate_transition_times(
+        frame: DataFrame, case_column: str = CASE_COLUMN,
+        activity_column: str = ACTIVITY_COLUMN,
+        timestamp_column: str = TIMESTAMP_COLUMN) \
+        -> Dict[Tuple[str, str], Dict[str, float]]:
+    """
+    Calculates statistics of the time passing between directly following
+    activities. The order of the entries within a case is defined by their
+    order in the DataFrame.
+    :param frame: the DataFrame
+    :param case_column: column identifying the case of an entry
+    :param activity_column: column containing the activity of an entry
+    :param timestamp_column: column containing the timestamp of an entry
+    :return: dict mapping each directly-follows relation to the mean, median
+    and 95th percentile of its durations (in seconds)
+    """
+    if frame.empty:
+        return {}
+    activity_codes, activities = pandas.factorize(frame[activity_column])
+    case_codes, _ = pandas.factorize(frame[case_column])
+    codes, values = _get_relation_statistics(
+        case_codes, activity_codes, len(activities),
+        get_seconds(frame[timestamp_column]))
+    transition_times = {}
+    for index, code in enumerate(codes.tolist()):
+        source, target = divmod(code, len(activities))
+        transition_times[(activities[source], activities[target])] = {
+            name: float(statistic[index])
+            for name, statistic in values.items()
+        }
+    log.info('calculated transition times of %s relations',
+             len(transition_times))
+    return transition_times
@@ -0,0 +1,122 @@
+"""
+Module containing the base class of the components that maintain data
+derived from the stored logs in a file of the log directory. The file is
+shared by all processes serving the same log directory, so the data is
+reloaded whenever another process changed it.
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import process_miner.mining.util.data as data_util
+from process_miner.log_handling.log_catalog import LogCatalog
+from process_miner.log_handling.log_retriever import IngestionListener
+
+log = logging.getLogger(__name__)
+
+
+class PersistedListener(IngestionListener):
+    """
+    Base class for ingestion listeners persisting their data to a JSON file
+    in the log directory. The data belongs to the catalog version it was
+    built from. Subclasses define the name and format of the file and how
+    their data is converted from and to JSON.
+    """
+    # name of the file the data is persisted to
+    FILENAME: str = None
+    # changed whenever the persisted data can't be read by older versions
+    FORMAT: Optional[int] = None
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._catalog = LogCatalog(self.directory)
+        self._version = None
+        self._loaded_mtime = None
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'directory <{self.directory}>, ' \
+               f'_version <{self._version}>]'
+
+    @property
+    def path(self) -> Path:
+        """
+        Path of the file the data is persisted to.
+        """
+        return self.directory / self.FILENAME
+
+    def is_current(self) -> bool:
+        """
+        Checks if the data was built from the currently stored logs. Stored
+        logs missing from the catalog aren't part of the data, so it isn't
+        current as long as there are any.
+        :return: whether the data is up to date
+        """
+        self._reload_if_changed()
+        version = self._catalog.get_version()
+        return version is not None and self._version == version \
+            and not self._catalog.has_untracked_files(
+                f'*.{data_util.FILE_EXTENSION}')
+
+    def logs_cleared(self) -> None:
+        if self.path.is_file():
+            os.remove(self.path)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._version = None
+        self._loaded_mtime = None
+        self._reset_data()
+
+    def _reset_data(self) -> None:
+        """
+        Removes all data derived from the stored logs.
+        """
+        raise NotImplementedError
+
+    def _to_json(self) -> Dict:
+        """
+        Converts the data to a JSON serializable representation.
+        :return: the representation
+        """
+        raise NotImplementedError
+
+    def _from_json(self, data: Dict) -> None:
+        """
+        Restores the data from the representation created by _to_json.
+        :param data: the JSON representation
+        """
+        raise NotImplementedError
+
+    def _save(self) -> None:
+        temp_path = self.path.with_suffix('.tmp')
+        with temp_path.open('w') as data_file:
+            json.dump({
+                'format': self.FORMAT,
+                'version': self._version,
+                **self._to_json()
+            }, data_file)
+        # replace atomically so readers never see a partially written file
+        os.replace(temp_path, self.path)
+        self._loaded_mtime = self.path.stat().st_mtime_ns
+
+    def _reload_if_changed(self) -> None:
+        if not self.path.is_file():
+            self._reset()
+            return
+        mtime = self.path.stat().st_mtime_ns
+        if mtime == self._loaded_mtime:
+            return
+        log.info('loading %s from "%s"', self.__class__.__name__, self.path)
+        with self.path.open('r') as data_file:
+            data = json.load(data_file)
+        self._loaded_mtime = mtime
+        if data.get('format') != self.FORMAT:
+            # written by a previous version, has to be rebuilt
+            log.info('"%s" has an outdated format', self.path)
+            self._version = None
+            return
+        self._version = data['version']
+        self._from_json(data)
@@ -0,0 +1,129 @@
+"""
+Module for filtering data sets with a combination of predicates. Instead of
+materializing an intermediate DataFrame after each filter step all predicates
+are evaluated on a shrinking set of candidate rows (most selective predicate
+first) and the result is materialized only once. Scoped session predicates
+depend on the result of all row predicates, so they are evaluated last.
+"""
+import logging
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy
+import pandas
+from pandas import DataFrame
+
+log = logging.getLogger(__name__)
+
+# selectivity assumed for values without statistics
+DEFAULT_SELECTIVITY = 1.0
+
+
+def _matches(values: numpy.ndarray, value) -> numpy.ndarray:
+    # isin avoids numpy's elementwise comparison pitfalls on mixed dtypes
+    return pandas.Series(values, copy=False).isin([value]).to_numpy()
+
+
+class Predicate(NamedTuple):
+    """
+    Describes a condition on the value of a single field.
+
+    Row predicates only keep the rows containing the value. Session predicates
+    keep all rows of sessions that contain the value in at least one row. If a
+    session predicate is scoped only rows satisfying all row predicates are
+    checked for the value.
+    """
+    field: str
+    value: str
+    session_level: bool
+    scoped: bool = True
+
+
+class QueryPlan:
+    """
+    Class collecting predicates and evaluating them on a DataFrame.
+    """
+    def __init__(self, session_field: str):
+        self.session_field = session_field
+        self.predicates: List[Predicate] = []
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'session_field <{self.session_field}>, ' \
+               f'predicates <{[str(p) for p in self.predicates]}>]'
+
+    def add_row_predicate(self, field: str, value: str) -> None:
+        """
+        Adds a predicate that only keeps rows containing the value.
+        :param field: the field that has to contain the value
+        :param value: the value
+        """
+        self.predicates.append(Predicate(field, value, False))
+
+    def add_session_predicate(self, field: str, value: str,
+                              scoped: bool = True) -> None:
+        """
+        Adds a predicate that keeps all rows of sessions containing the value.
+        :param field: the field that has to contain the value
+        :param value: the value
+        :param scoped: whether only rows satisfying the row predicates should
+        be checked for the value
+        """
+        self.predicates.append(Predicate(field, value, True, scoped))
+
+    def get_ordered_predicates(
+            self, selectivities: Dict[Tuple[str, str], float]) \
+            -> List[Predicate]:
+        """
+        Orders the predicates by their estimated selectivity (lowest fraction
+        of remaining data first). Scoped session predicates only check rows
+        satisfying all row predicates, so they always follow the others.
+        :param selectivities: estimated fraction of sessions matching a
+        (field, value) combination
+        :return: the ordered predicates
+        """
+        return sorted(self.predicates, key=lambda p: (
+            p.session_level and p.scoped,
+            selectivities.get((p.field, p.value), DEFAULT_SELECTIVITY)))
+
+    def execute(self, frame: DataFrame,
+                selectivities: Dict[Tuple[str, str], float] = None) \
+            -> DataFrame:
+        """
+        Evaluates all predicates on the DataFrame.
+        :param frame: the DataFrame
+        :param selectivities: estimated fraction of sessions matching a
+        (field, value) combination used for ordering the predicates
+        :return: a DataFrame containing only the matching rows
+        """
+        if not self.predicates:
+            return frame
+        predicates = self.get_ordered_predicates(selectivities or {})
+        log.info('evaluating predicates in order %s',
+                 [(p.field, p.value) for p in predicates])
+        session_codes, sessions = pandas.factorize(frame[self.session_field])
+        # rows of sessions that may still be part of the result
+        candidates = numpy.arange(len(frame))
+        # result of the row predicates (only valid for candidate rows)
+        rows_valid = numpy.ones(len(frame), dtype=bool)
+
+        for predicate in predicates:
+            values = frame[predicate.field].to_numpy()
+            if predicate.session_level:
+                checked = candidates
+                if predicate.scoped:
+                    checked = candidates[rows_valid[candidates]]
+                hits = checked[_matches(values[checked], predicate.value)]
+            else:
+                rows_valid[candidates] &= _matches(values[candidates],
+                                                   predicate.value)
+                hits = candidates[rows_valid[candidates]]
+            # drop all sessions without a single matching row
+            session_alive = numpy.zeros(len(sessions), dtype=bool)
+            session_alive[session_codes[hits]] = True
+            candidates = candidates[session_alive[session_codes[candidates]]]
+            log.debug('%s candidate rows left after %s', len(candidates),
+                      predicate)
+
+        result = candidates[rows_valid[candidates]]
+        log.info('%s of %s rows match the query', len(result), len(frame))
+        return frame.iloc[result]
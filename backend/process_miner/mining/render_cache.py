@@ -0,0 +1,107 @@
+"""
+Module for caching rendered graphs on disk. Rendered graphs are addressed by a
+hash of the canonical structure of the graph and the output format, so
+identical graphs only have to be rendered once no matter which request
+produced them.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+
+
+def get_cache_key(structure: Dict, output_format: str) -> str:
+    """
+    Calculates the key identifying a rendered graph.
+    :param structure: canonical (JSON serializable) structure of the graph
+    :param output_format: the format the graph is rendered to
+    :return: the key
+    """
+    canonical = json.dumps([structure, output_format], sort_keys=True,
+                           separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """
+    Class used for storing rendered graphs in a directory. If the total size
+    of the stored graphs exceeds the size limit the least recently used graphs
+    are removed.
+    """
+    def __init__(self, directory: Path, max_size: int = DEFAULT_MAX_SIZE):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'directory <{self.directory}>, ' \
+               f'max_size <{self.max_size}>, ' \
+               f'hits <{self.hits}>, ' \
+               f'misses <{self.misses}>]'
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Retrieves a rendered graph and marks it as recently used.
+        :param key: key of the graph
+        :return: the rendered graph (None if it isn't cached)
+        """
+        path = self._get_path(key)
+        with self._lock:
+            try:
+                data = path.read_bytes()
+                # the modification time is used for determining the least
+                # recently used graphs
+                os.utime(path)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Stores a rendered graph and evicts the least recently used graphs if
+        the size limit is exceeded.
+        :param key: key of the graph
+        :param data: the rendered graph
+        """
+        if len(data) > self.max_size:
+            log.info('rendered graph of %s bytes exceeds cache size',
+                     len(data))
+            return
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._get_path(key)
+            temp_path = path.with_suffix('.tmp')
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+            self._evict()
+
+    def _get_path(self, key: str) -> Path:
+        return self.directory / f'{key}.bin'
+
+    def _evict(self) -> None:
+        files = []
+        for path in self.directory.glob('*.bin'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= self.max_size:
+                break
+            log.info('evicting rendered graph %s', path.name)
+            path.unlink()
+            total_size -= size
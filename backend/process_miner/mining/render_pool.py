@@ -0,0 +1,202 @@
+"""
+Module for rendering graphs separately from mining them. Rendering is done by
+a bounded pool of worker threads so only a limited number of graphviz
+processes run at the same time, no matter how many requests are processed.
+Identical jobs share a single execution, and jobs exceeding the timeout keep
+running so their result isn't lost.
+"""
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Event, Lock
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT = 60
+# number of recent render times the metrics are calculated from
+RECORDED_RENDER_TIMES = 100
+
+
+class RenderTimeoutError(Exception):
+    """
+    Raised if no worker picked up a render job or rendering a graph took
+    longer than the timeout of the pool.
+    """
+
+
+class _RenderMetrics:
+    """
+    Class containing the counters of a render pool. It isn't thread-safe, the
+    pool has to hold its lock while using it.
+    """
+    def __init__(self):
+        self.queued = 0
+        self.running = 0
+        self.timeouts = 0
+        self.render_times = deque(maxlen=RECORDED_RENDER_TIMES)
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'queued <{self.queued}>, ' \
+               f'running <{self.running}>, ' \
+               f'timeouts <{self.timeouts}>]'
+
+    def start_job(self) -> None:
+        """
+        Records that a queued job was picked up by a worker.
+        """
+        self.queued -= 1
+        self.running += 1
+
+    def finish_job(self, duration: float) -> None:
+        """
+        Records that a running job is finished.
+        :param duration: time it took to render the graph in seconds
+        """
+        self.running -= 1
+        self.render_times.append(duration)
+
+    def to_json(self) -> Dict:
+        """
+        Converts the counters to a JSON serializable representation.
+        :return: dict containing the counters and statistics about the
+        recorded render times
+        """
+        render_times = list(self.render_times)
+        return {
+            'queueDepth': self.queued,
+            'running': self.running,
+            'timeouts': self.timeouts,
+            'renderTime': {
+                'count': len(render_times),
+                'mean': sum(render_times) / len(render_times)
+                        if render_times else None,
+                'max': max(render_times, default=None)
+            }
+        }
+
+
+class RenderPool:
+    """
+    Class used for running render jobs with a concurrency limit and a timeout
+    per job. The timeout only starts once a worker picks up the job, so time
+    spent waiting in the queue doesn't count towards it. Waiting in the queue
+    is limited by the timeout as well. A job that exceeds the timeout can't
+    be interrupted, it keeps its worker until it is finished.
+    """
+    def __init__(self, workers: int = DEFAULT_WORKERS,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(self.workers,
+                                            thread_name_prefix='render')
+        self._lock = Lock()
+        self._metrics = _RenderMetrics()
+        # jobs that haven't finished yet by key
+        self._in_flight: Dict[Hashable, Tuple[Future, Event]] = {}
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'workers <{self.workers}>, ' \
+               f'timeout <{self.timeout}>, ' \
+               f'_metrics <{self._metrics}>]'
+
+    def render(self, render: Callable[[], bytes],
+               key: Optional[Hashable] = None,
+               on_result: Optional[Callable[[bytes], None]] = None) -> bytes:
+        """
+        Runs a render job on one of the workers and waits for its result. If
+        a job with the same key is still running, its result is awaited
+        instead of rendering the graph again.
+        :param render: function rendering the graph
+        :param key: key identifying the rendered graph (None if the job
+        shouldn't be shared)
+        :param on_result: function called with the rendered graph once the
+        job is finished, even if waiting for it exceeded the timeout
+        :return: the rendered graph
+        :raises RenderTimeoutError: if no worker picked up the job within the
+        timeout or the job exceeded the timeout
+        """
+        future, started = self._submit(render, key, on_result)
+        if not started.wait(self.timeout) and future.cancel():
+            with self._lock:
+                self._metrics.timeouts += 1
+            log.warning('no render worker available within %ss',
+                        self.timeout)
+            raise RenderTimeoutError(
+                f'no render worker became available within {self.timeout}s')
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._metrics.timeouts += 1
+            log.warning('rendering exceeded timeout of %ss', self.timeout)
+            raise RenderTimeoutError(
+                f'rendering took longer than {self.timeout}s') from None
+
+    def get_metrics(self) -> Dict:
+        """
+        Collects the current state of the pool and statistics about the
+        recently rendered graphs.
+        :return: dict containing the metrics
+        """
+        with self._lock:
+            metrics = self._metrics.to_json()
+        return {'workers': self.workers, 'timeout': self.timeout, **metrics}
+
+    def shutdown(self) -> None:
+        """
+        Stops the workers after all queued jobs are done.
+        """
+        self._executor.shutdown()
+
+    def _submit(self, render: Callable[[], bytes], key: Optional[Hashable],
+                on_result: Optional[Callable[[bytes], None]]) \
+            -> Tuple[Future, Event]:
+        with self._lock:
+            if key is not None and key in self._in_flight:
+                log.info('waiting for identical render job')
+                return self._in_flight[key]
+            self._metrics.queued += 1
+            started = Event()
+            future = self._executor.submit(self._run, render, started)
+            if key is not None:
+                self._in_flight[key] = (future, started)
+        future.add_done_callback(
+            lambda done: self._finish(done, key, on_result))
+        return future, started
+
+    def _finish(self, future: Future, key: Optional[Hashable],
+                on_result: Optional[Callable[[bytes], None]]) -> None:
+        with self._lock:
+            if future.cancelled():
+                # cancelled jobs never reach a worker
+                self._metrics.queued -= 1
+            if key is not None and self._in_flight.get(key, (None,))[0] \
+                    is future:
+                del self._in_flight[key]
+        if on_result is None or future.cancelled() \
+                or future.exception() is not None:
+            return
+        try:
+            on_result(future.result())
+        # pylint: disable=broad-except
+        except Exception:
+            log.exception('failed to handle rendered graph')
+
+    def _run(self, render: Callable[[], bytes], started: Event) -> bytes:
+        with self._lock:
+            self._metrics.start_job()
+        started.set()
+        start = time.perf_counter()
+        try:
+            return render()
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self._metrics.finish_job(duration)
+            log.info('rendering took %.3fs', duration)
@@ -0,0 +1,190 @@
+"""
+Module for counting sessions per time bucket. Each session is counted in the
+bucket of its first entry for each of its metadata values. The counts are
+kept for several granularities, so trends can be queried for any time range
+by adding up buckets instead of reading the stored log entries.
+"""
+import bisect
+import logging
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+from process_miner.mining import metadata
+
+log = logging.getLogger(__name__)
+
+ROLLUP_FIELDS = ['approach', 'method', 'bank', 'errortype', 'status']
+# length of the timestamp prefix identifying a bucket, the format of that
+# prefix and the duration of a bucket
+GRANULARITIES = {
+    'hour': (13, '%Y-%m-%dT%H', timedelta(hours=1)),
+    'day': (10, '%Y-%m-%d', timedelta(days=1))
+}
+
+
+def get_bucket(timestamp: str, granularity: str) -> str:
+    """
+    Determines the bucket a timestamp in the format used by Graylog belongs
+    to.
+    :param timestamp: the timestamp
+    :param granularity: the granularity of the bucket
+    :return: the bucket (eg. 2020-06-01T13 for the hour starting at 13:00)
+    """
+    length, _, _ = GRANULARITIES[granularity]
+    return timestamp[:length]
+
+
+def _get_buckets_between(first: str, last: str,
+                         granularity: str) -> List[str]:
+    _, bucket_format, duration = GRANULARITIES[granularity]
+    current = datetime.strptime(first, bucket_format)
+    end = datetime.strptime(last, bucket_format)
+    buckets = []
+    while current <= end:
+        buckets.append(current.strftime(bucket_format))
+        current += duration
+    return buckets
+
+
+class TimeRollups:
+    """
+    Class containing the number of sessions per time bucket, in total and
+    for each value of the rollup fields. Sessions can be added and removed
+    again, so the counts can be maintained incrementally.
+    """
+    def __init__(self):
+        # granularity -> bucket -> count
+        self.sessions: Dict[str, Dict[str, int]] = {
+            granularity: {} for granularity in GRANULARITIES}
+        # granularity -> field -> value -> bucket -> count
+        self.values: Dict[str, Dict[str, Dict[str, Dict[str, int]]]] = {
+            granularity: {field: {} for field in ROLLUP_FIELDS}
+            for granularity in GRANULARITIES}
+        self._prefix_sums: Dict[tuple, Tuple[List[str], List[int]]] = {}
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'sessions <{sum(self.sessions["day"].values())}>, ' \
+               f'buckets <{len(self.sessions["hour"])}>]'
+
+    def add(self, summary: Dict, sign: int = 1) -> None:
+        """
+        Adds a session to the bucket of its first entry.
+        :param summary: the summary of the session (see session_summaries)
+        :param sign: -1 to remove a previously added session instead
+        """
+        self._prefix_sums.clear()
+        for granularity in GRANULARITIES:
+            bucket = get_bucket(summary['start'], granularity)
+            update_count(self.sessions[granularity], bucket, sign)
+            for field in ROLLUP_FIELDS:
+                field_values = self.values[granularity][field]
+                # values are counted like the sessions per value of the
+                # metadata module
+                for value in metadata.get_relevant_values(summary[field]):
+                    buckets = field_values.setdefault(value, {})
+                    update_count(buckets, bucket, sign)
+                    if not buckets:
+                        del field_values[value]
+
+    def get_series(self, field: str, granularity: str,
+                   start: Optional[str] = None,
+                   end: Optional[str] = None) -> Dict:
+        """
+        Collects the number of sessions per bucket within a time range, in
+        total and for each value of a field. Buckets containing the bounds of
+        the range are included completely.
+        :param field: the field
+        :param granularity: the granularity of the buckets
+        :param start: timestamp of the start of the range (Graylog format)
+        :param end: timestamp of the end of the range (Graylog format)
+        :return: dict containing the buckets and the counts per bucket and
+        their sums over the whole range
+        """
+        sessions = self.sessions[granularity]
+        first = get_bucket(start, granularity) if start else None
+        last = get_bucket(end, granularity) if end else None
+        present, _ = self._get_prefix_sums(granularity, None, None)
+        lower, upper = _get_bounds(present, first, last)
+        buckets = _get_buckets_between(present[lower], present[upper - 1],
+                                       granularity) if upper > lower else []
+        values = self.values[granularity][field]
+        totals = {value: self._sum_range(granularity, field, value, first,
+                                         last)
+                  for value in values}
+        return {
+            'granularity': granularity,
+            'field': field,
+            'buckets': buckets,
+            'sessions': [sessions.get(bucket, 0) for bucket in buckets],
+            'values': {value: [values[value].get(bucket, 0)
+                               for bucket in buckets]
+                       for value, total in totals.items() if total},
+            'totals': {value: total for value, total in totals.items()
+                       if total},
+            'sessionCount': self._sum_range(granularity, None, None, first,
+                                            last)
+        }
+
+    def to_json(self) -> Dict:
+        """
+        Converts the rollups to a JSON serializable representation.
+        :return: the representation
+        """
+        return {'sessions': self.sessions, 'values': self.values}
+
+    @staticmethod
+    def from_json(data: Dict) -> 'TimeRollups':
+        """
+        Restores rollups from the representation created by to_json.
+        :param data: the JSON representation
+        :return: the rollups
+        """
+        rollups = TimeRollups()
+        rollups.sessions = data['sessions']
+        rollups.values = data['values']
+        return rollups
+
+    def _sum_range(self, granularity: str, field: Optional[str],
+                   value: Optional[str], first: Optional[str],
+                   last: Optional[str]) -> int:
+        # the prefix sums allow summing any range with two binary searches
+        # instead of iterating over all of its buckets
+        buckets, sums = self._get_prefix_sums(granularity, field, value)
+        lower, upper = _get_bounds(buckets, first, last)
+        return sums[upper] - sums[lower] if upper > lower else 0
+
+    def _get_prefix_sums(self, granularity: str, field: Optional[str],
+                         value: Optional[str]) \
+            -> Tuple[List[str], List[int]]:
+        key = (granularity, field, value)
+        if key not in self._prefix_sums:
+            counts = self.sessions[granularity] if field is None \
+                else self.values[granularity][field][value]
+            buckets = sorted(counts)
+            self._prefix_sums[key] = (buckets, [0, *accumulate(
+                counts[bucket] for bucket in buckets)])
+        return self._prefix_sums[key]
+
+
+def _get_bounds(buckets: List[str], first: Optional[str],
+                last: Optional[str]) -> Tuple[int, int]:
+    lower = 0 if first is None else bisect.bisect_left(buckets, first)
+    upper = len(buckets) if last is None \
+        else bisect.bisect_right(buckets, last)
+    return lower, upper
+
+
+def update_count(counts: Dict[str, int], key: str, change: int) -> None:
+    """
+    Changes a count and removes it once it drops to zero.
+    :param counts: dict containing the counts
+    :param key: key of the count
+    :param change: the change
+    """
+    count = counts.get(key, 0) + change
+    if count > 0:
+        counts[key] = count
+    else:
+        counts.pop(key, None)
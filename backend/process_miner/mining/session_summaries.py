@@ -0,0 +1,323 @@
+"""
+Module for maintaining a summary of every stored session (its distinct
+metadata values, first and last timestamp and number of entries) and the
+metadata counts, time rollups, latency sketches and distinct session counts
+derived from them. All of them are updated whenever new logs are stored, so
+metadata requests don't have to read the stored log entries at all.
+"""
+import copy
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pandas import DataFrame
+
+import process_miner.mining.util.data as data_util
+from process_miner.mining import metadata
+from process_miner.mining.distinct import DistinctCounts
+from process_miner.mining.frequencies import CASE_COLUMN
+from process_miner.mining.latency import LatencySketches, get_last_entry
+from process_miner.mining.persisted import PersistedListener
+from process_miner.mining.rollups import TimeRollups, update_count
+
+log = logging.getLogger(__name__)
+
+SUMMARIES_FILENAME = 'session_summaries.json'
+# changed whenever the persisted summaries can't be read by older versions
+SUMMARIES_FORMAT = 2
+SUMMARY_FIELDS = ['approach', 'method', 'bank', 'errortype', 'status']
+
+
+def summarize_entries(entries: Iterable[Dict[str, str]],
+                      summary: Optional[Dict] = None) -> Dict:
+    """
+    Creates the summary of a session or extends an existing one by further
+    entries of the session. The distinct values of each field keep the order
+    of their first occurrence. The fields of the last entry are kept for the
+    latency of its activity.
+    :param entries: the entries of the session (sorted by timestamp)
+    :param summary: the summary of the previously stored entries
+    :return: the new summary
+    """
+    summary = copy.deepcopy(summary) if summary else {
+        **{field: [] for field in SUMMARY_FIELDS},
+        'start': None, 'end': None, 'rows': 0, 'last': None
+    }
+    for entry in entries:
+        for field in SUMMARY_FIELDS:
+            value = entry.get(field)
+            if not metadata.is_present(value):
+                continue
+            # values read from the stored files may have been parsed
+            if str(value) not in summary[field]:
+                summary[field].append(str(value))
+        timestamp = entry['timestamp']
+        if summary['start'] is None or timestamp < summary['start']:
+            summary['start'] = timestamp
+        if summary['end'] is None or timestamp >= summary['end']:
+            summary['end'] = timestamp
+            summary['last'] = get_last_entry(entry)
+        summary['rows'] += 1
+    return summary
+
+
+def summarize_frame(frame: DataFrame) -> Dict[str, Dict]:
+    """
+    Creates the summaries of all sessions contained in a DataFrame.
+    :param frame: the DataFrame (sorted by timestamp)
+    :return: dict mapping the correlationId of each session to its summary
+    """
+    return {session: summarize_entries(entries)
+            for session, entries in _group_sessions(frame)}
+
+
+def summarize_latencies(frame: DataFrame) -> LatencySketches:
+    """
+    Creates the latency sketches of all sessions contained in a DataFrame.
+    :param frame: the DataFrame (sorted by timestamp)
+    :return: the sketches
+    """
+    latencies = LatencySketches()
+    for _, entries in _group_sessions(frame):
+        latencies.add_steps(entries)
+        latencies.add_session(summarize_entries(entries))
+    return latencies
+
+
+def _group_sessions(frame: DataFrame) -> Iterable[Tuple[str, List[Dict]]]:
+    if frame.empty:
+        return
+    for session, entries in frame.groupby(CASE_COLUMN, sort=False):
+        yield str(session), entries.to_dict('records')
+
+
+class MetadataCounts:
+    """
+    Class containing the metadata counts of a set of session summaries. The
+    counts match the ones calculated by the metadata module from the log
+    entries of the sessions.
+    """
+    def __init__(self):
+        self.approach_counts: Dict[str, int] = {}
+        self.method_counts_per_approach: Dict[str, Dict[str, int]] = {}
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'approach_counts <{self.approach_counts}>, ' \
+               f'method_counts_per_approach ' \
+               f'<{self.method_counts_per_approach}>]'
+
+    def add(self, summary: Dict, sign: int = 1) -> None:
+        """
+        Adds the counts of a session to the totals.
+        :param summary: the summary of the session
+        :param sign: -1 to remove a previously added session instead
+        """
+        for approach in summary['approach']:
+            update_count(self.approach_counts, approach, sign)
+        if not summary['approach']:
+            return
+        # like the metadata module the first approach of a session is used
+        approach = summary['approach'][0]
+        methods = self.method_counts_per_approach.setdefault(approach, {})
+        for method in metadata.get_relevant_values(summary['method']):
+            update_count(methods, method, sign)
+        if not methods:
+            del self.method_counts_per_approach[approach]
+
+    def to_json(self) -> Dict:
+        """
+        Converts the counts to a JSON serializable representation.
+        :return: the representation
+        """
+        return {
+            'approach_counts': self.approach_counts,
+            'method_counts_per_approach': self.method_counts_per_approach
+        }
+
+    @staticmethod
+    def from_json(data: Dict) -> 'MetadataCounts':
+        """
+        Restores counts from the representation created by to_json.
+        :param data: the JSON representation
+        :return: the counts
+        """
+        counts = MetadataCounts()
+        counts.approach_counts = data['approach_counts']
+        counts.method_counts_per_approach = data['method_counts_per_approach']
+        return counts
+
+
+class SessionSummaries(PersistedListener):
+    """
+    Class used for maintaining the session summaries in the log directory.
+    Newly stored entries are merged into the summaries of their sessions
+    directly, so updates don't require reading stored files. If the
+    summaries don't match the stored logs they are rebuilt from the files.
+    """
+    FILENAME = SUMMARIES_FILENAME
+    FORMAT = SUMMARIES_FORMAT
+
+    def __init__(self, directory: Path):
+        super().__init__(directory)
+        self._summaries: Dict[str, Dict] = {}
+        self._counts = MetadataCounts()
+        self._rollups = TimeRollups()
+        self._latencies = LatencySketches()
+        self._distinct = DistinctCounts(self.directory)
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'directory <{self.directory}>, ' \
+               f'_version <{self._version}>, ' \
+               f'_summaries <{len(self._summaries)}>]'
+
+    def get_summaries(self) -> Dict[str, Dict]:
+        """
+        Returns the summaries of all stored sessions.
+        :return: dict mapping the correlationId of each session to its
+        summary
+        """
+        self._reload_if_changed()
+        return self._summaries
+
+    def get_counts(self) -> MetadataCounts:
+        """
+        Returns the metadata counts of all stored sessions.
+        :return: the counts
+        """
+        self._reload_if_changed()
+        return self._counts
+
+    def get_rollups(self) -> TimeRollups:
+        """
+        Returns the time rollups of all stored sessions.
+        :return: the rollups
+        """
+        self._reload_if_changed()
+        return self._rollups
+
+    def get_latencies(self) -> LatencySketches:
+        """
+        Returns the latency sketches of all stored sessions.
+        :return: the sketches
+        """
+        self._reload_if_changed()
+        return self._latencies
+
+    def get_distinct_counts(self) -> DistinctCounts:
+        """
+        Returns the distinct session counts of all stored sessions.
+        :return: the distinct session counts
+        """
+        self._reload_if_changed()
+        return self._distinct
+
+    def rebuild(self) -> None:
+        """
+        Builds the summaries from all stored logs and persists them.
+        """
+        version = self._catalog.get_version()
+        if version is None:
+            log.info('no cataloged logs to build session summaries from')
+            return
+        files = [self.directory / filename
+                 for filename in self._catalog.get_entries()]
+        frame = data_util.merge_and_sort_dataframes(
+            data_util.read_csv_files(files), 'timestamp') \
+            if files else DataFrame()
+        self._reset()
+        self._distinct.clear()
+        for session, entries in _group_sessions(frame):
+            self._extend(session, entries)
+        self._version = version
+        log.info('built %s', self)
+        self._save()
+
+    def update(self, sessions: Dict[str, List[Dict[str, str]]]) -> None:
+        """
+        Merges newly stored entries into the summaries of their sessions and
+        persists them. Falls back to a complete rebuild if the summaries
+        don't match the stored logs.
+        :param sessions: the newly stored entries grouped by their
+        correlationId
+        """
+        self._reload_if_changed()
+        if self._version is None or not self._is_consistent(sessions):
+            log.info('session summaries are inconsistent with the stored '
+                     'logs')
+            self.rebuild()
+            return
+        for session, entries in sessions.items():
+            self._extend(session, entries)
+        self._version = self._catalog.get_version()
+        log.info('updated %s sessions of %s', len(sessions), self)
+        self._save()
+
+    def logs_stored(self, sessions) -> None:
+        self.update(sessions)
+
+    def logs_cleared(self) -> None:
+        super().logs_cleared()
+        self._distinct.clear()
+        self._distinct.save()
+
+    def _extend(self, session: str, entries: List[Dict]) -> None:
+        previous = self._summaries.get(session)
+        if previous is not None:
+            self._add(previous, -1)
+        self._latencies.add_steps(entries, previous)
+        summary = summarize_entries(entries, previous)
+        self._distinct.add_entries(
+            session, entries,
+            summary['approach'][0] if summary['approach'] else None)
+        self._summaries[session] = summary
+        self._add(summary)
+
+    def _add(self, summary: Dict, sign: int = 1) -> None:
+        self._counts.add(summary, sign)
+        self._rollups.add(summary, sign)
+        self._latencies.add_session(summary, sign)
+
+    def _is_consistent(self, sessions: Dict[str, List[Dict]]) -> bool:
+        # the number of stored entries of each session has to match the
+        # summaries extended by the new entries
+        stored_rows = defaultdict(int)
+        for entry in self._catalog.get_entries().values():
+            stored_rows[entry['correlationId']] += entry['rows']
+        summarized_rows = {session: summary['rows']
+                           for session, summary in self._summaries.items()}
+        for session, entries in sessions.items():
+            summarized_rows[session] = \
+                summarized_rows.get(session, 0) + len(entries)
+        return summarized_rows == stored_rows
+
+    def _reset_data(self) -> None:
+        self._summaries = {}
+        self._counts = MetadataCounts()
+        self._rollups = TimeRollups()
+        self._latencies = LatencySketches()
+        self._distinct = DistinctCounts(self.directory)
+
+    def _to_json(self) -> Dict:
+        return {
+            'summaries': self._summaries,
+            'counts': self._counts.to_json(),
+            'rollups': self._rollups.to_json(),
+            'latencies': self._latencies.to_json()
+        }
+
+    def _from_json(self, data: Dict) -> None:
+        self._summaries = data['summaries']
+        self._counts = MetadataCounts.from_json(data['counts'])
+        self._rollups = TimeRollups.from_json(data['rollups'])
+        self._latencies = LatencySketches.from_json(data['latencies'])
+        # sketches of the days are loaded on demand
+        self._distinct = DistinctCounts(self.directory)
+
+    def _save(self) -> None:
+        # the distinct counts are stored per day in separate files as they
+        # are much larger than everything else
+        self._distinct.save()
+        super()._save()
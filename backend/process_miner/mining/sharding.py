@@ -0,0 +1,106 @@
+"""
+Module for counting frequencies on multiple cores. The entries are sharded by
+their (factorized) correlationId, or their variant when counting variants, so
+every session is completely contained in a single shard. The partial
+frequencies of the shards are counted in separate processes and merged
+afterwards.
+"""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy
+import pandas
+from pandas import DataFrame
+
+from process_miner.mining.frequencies import ACTIVITY_COLUMN, CASE_COLUMN, \
+    Frequencies, count_coded_frequencies
+from process_miner.mining.variants import VariantTable
+
+log = logging.getLogger(__name__)
+
+# shards smaller than this are not worth the overhead of another process
+MIN_SHARD_ROWS = 50000
+
+
+class ShardedFrequencyCounter:
+    """
+    Class used for counting frequencies with a pool of worker processes.
+    Using a single worker counts the frequencies in the calling thread.
+    """
+    def __init__(self, workers: int = 1, min_shard_rows: int = MIN_SHARD_ROWS):
+        self.workers = max(1, workers)
+        self.min_shard_rows = min_shard_rows
+        self._executor = None
+        if self.workers > 1:
+            # spawned workers don't inherit the state of the server's threads
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'workers <{self.workers}>, ' \
+               f'min_shard_rows <{self.min_shard_rows}>]'
+
+    def count(self, frame: DataFrame) -> Frequencies:
+        """
+        Counts the frequencies of the cases contained in a DataFrame.
+        :param frame: the DataFrame
+        :return: the merged frequencies of all shards
+        """
+        if frame.empty:
+            return Frequencies()
+        # only integer codes are sent to the workers to keep the overhead of
+        # transferring the shards low
+        activity_codes, activities = pandas.factorize(frame[ACTIVITY_COLUMN])
+        case_codes, _ = pandas.factorize(frame[CASE_COLUMN])
+        return self.count_coded(case_codes, activity_codes,
+                                activities.tolist())
+
+    def count_variants(self, variants: VariantTable) -> Frequencies:
+        """
+        Counts the frequencies of all sessions of a variant table by counting
+        each variant once and weighting it with its number of sessions.
+        :param variants: the variants
+        :return: the merged frequencies of all shards
+        """
+        return self.count_coded(*variants.encode())
+
+    def count_coded(self, case_codes: numpy.ndarray,
+                    activity_codes: numpy.ndarray, activities: List[str],
+                    case_weights: Optional[numpy.ndarray] = None) \
+            -> Frequencies:
+        """
+        Counts the frequencies of cases whose entries are represented by
+        integer codes (see count_coded_frequencies).
+        :param case_codes: code of the case of each entry
+        :param activity_codes: code of the activity of each entry
+        :param activities: the activities
+        :param case_weights: number of times each case should be counted
+        :return: the merged frequencies of all shards
+        """
+        shard_count = min(self.workers, len(case_codes) // self.min_shard_rows)
+        if self._executor is None or shard_count < 2:
+            return count_coded_frequencies(case_codes, activity_codes,
+                                           activities, case_weights)
+        shard_ids = case_codes % shard_count
+        log.info('counting frequencies of %s entries in %s shards',
+                 len(case_codes), shard_count)
+        futures = []
+        for shard in range(shard_count):
+            in_shard = shard_ids == shard
+            futures.append(self._executor.submit(
+                count_coded_frequencies, case_codes[in_shard],
+                activity_codes[in_shard], activities, case_weights))
+        frequencies = Frequencies()
+        for future in futures:
+            frequencies.add(future.result())
+        return frequencies
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker processes.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
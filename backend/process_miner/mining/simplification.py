@@ -0,0 +1,77 @@
+"""
+Module for simplifying graphs before they are rendered. The simplification is
+applied to the aggregated frequencies, so the size of the rendered graph (and
+therefore the time graphviz needs for the layout) is bounded no matter how
+many distinct activities the mined data contains.
+"""
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from process_miner.mining.frequencies import Frequencies
+
+log = logging.getLogger(__name__)
+
+
+class Simplification(NamedTuple):
+    """
+    Describes which activities and directly-follows relations of a graph
+    should be pruned. The default values keep the graph unchanged.
+    """
+    min_activity_frequency: int = 0
+    min_edge_frequency: int = 0
+    max_edges: Optional[int] = None
+    excluded_activities: Tuple[str, ...] = ()
+
+
+def simplify_frequencies(frequencies: Frequencies,
+                         simplification: Simplification) \
+        -> Tuple[Frequencies, Dict]:
+    """
+    Prunes activities and directly-follows relations from the frequencies.
+    Excluded activities and activities occurring less often than the minimum
+    are removed first, then relations connecting removed activities or
+    occurring less often than the minimum. Of the remaining relations only
+    the most frequent ones are kept. Activities which lost all of their
+    relations are removed as well.
+    :param frequencies: the frequencies
+    :param simplification: describes what should be pruned
+    :return: tuple containing the simplified frequencies and a report of the
+    pruned activities and relations
+    """
+    excluded = set(simplification.excluded_activities)
+    kept = {activity for activity, count in frequencies.activities.items()
+            if count >= simplification.min_activity_frequency
+            and activity not in excluded}
+    edges = sorted(((edge, count) for edge, count in frequencies.dfg.items()
+                    if count >= simplification.min_edge_frequency
+                    and kept.issuperset(edge)),
+                   key=lambda item: (-item[1], item[0]))
+    if simplification.max_edges is not None:
+        edges = edges[:simplification.max_edges]
+    connected = {activity for edge in frequencies.dfg for activity in edge}
+    kept -= connected - {activity for edge, _ in edges for activity in edge}
+
+    simplified = Frequencies()
+    simplified.dfg = dict(edges)
+    simplified.activities = _restrict(frequencies.activities, kept)
+    simplified.start_activities = _restrict(frequencies.start_activities,
+                                            kept)
+    simplified.end_activities = _restrict(frequencies.end_activities, kept)
+    simplified.dfg_window_2 = {pair: count for pair, count
+                               in frequencies.dfg_window_2.items()
+                               if kept.issuperset(pair)}
+    simplified.freq_triples = {triple: count for triple, count
+                               in frequencies.freq_triples.items()
+                               if kept.issuperset(triple)}
+    report = {
+        'activities': sorted(set(frequencies.activities) - kept),
+        'edges': len(frequencies.dfg) - len(edges)
+    }
+    log.info('pruned %s activities and %s relations',
+             len(report['activities']), report['edges'])
+    return simplified, report
+
+
+def _restrict(counts: Dict[str, int], activities: set) -> Dict[str, int]:
+    return {activity: count for activity, count in counts.items()
+            if activity in activities}
@@ -0,0 +1,214 @@
+"""
+Module containing compact summaries of large sets of values that can be
+merged with each other. They allow answering statistical questions for any
+combination of filters by merging the sketches of the matching parts of the
+data instead of reading all values again.
+"""
+import base64
+import hashlib
+import logging
+import math
+import zlib
+from typing import Dict
+
+import numpy
+
+log = logging.getLogger(__name__)
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# 2^11 registers result in a standard error of 2.3%
+DEFAULT_PRECISION = 11
+_HASH_BITS = 64
+
+
+class QuantileSketch:
+    """
+    Sketch for estimating quantiles of non-negative values (like DDSketch).
+    Values are counted in buckets whose bounds grow exponentially, so every
+    estimated quantile is within the relative accuracy of the exact value.
+    In contrast to t-digest values can be removed again and merging is
+    exact, as the buckets of all sketches with the same accuracy match.
+    """
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'relative_accuracy <{self.relative_accuracy}>, ' \
+               f'count <{self.count}>, ' \
+               f'bins <{len(self.bins)}>]'
+
+    @property
+    def count(self) -> int:
+        """
+        Number of values contained in the sketch.
+        """
+        return self.zero_count + sum(self.bins.values())
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """
+        Adds a value to the sketch. Negative values are counted as zero.
+        :param value: the value
+        :param weight: number of times the value is added (-1 to remove a
+        previously added value)
+        """
+        if value <= 0:
+            self.zero_count += weight
+            return
+        index = math.ceil(math.log(value, self._gamma))
+        count = self.bins.get(index, 0) + weight
+        if count > 0:
+            self.bins[index] = count
+        else:
+            self.bins.pop(index, None)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """
+        Adds all values of another sketch with the same accuracy to this one.
+        :param other: the other sketch
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('sketches with different accuracies can\'t be '
+                             'merged')
+        self.zero_count += other.zero_count
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+
+    def quantile(self, quantile: float) -> float:
+        """
+        Estimates a quantile of the contained values.
+        :param quantile: the quantile (in the range [0, 1])
+        :return: the estimate (nan if the sketch is empty)
+        """
+        total = self.count
+        if total <= 0:
+            return math.nan
+        rank = quantile * (total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                # the middle of the bucket (gamma^(i-1), gamma^i] in terms
+                # of the relative error
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self.bins) / (self._gamma + 1)
+
+    def to_json(self) -> Dict:
+        """
+        Converts the sketch to a JSON serializable representation.
+        :return: the representation
+        """
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'zero_count': self.zero_count,
+            'bins': [[index, count] for index, count in self.bins.items()]
+        }
+
+    @staticmethod
+    def from_json(data: Dict) -> 'QuantileSketch':
+        """
+        Restores a sketch from the representation created by to_json.
+        :param data: the JSON representation
+        :return: the sketch
+        """
+        sketch = QuantileSketch(data['relative_accuracy'])
+        sketch.zero_count = data['zero_count']
+        sketch.bins = dict(data['bins'])
+        return sketch
+
+
+class HyperLogLog:
+    """
+    Sketch for estimating the number of distinct items. Each item is hashed
+    and the register selected by the first bits of the hash keeps the
+    maximum position of the first set bit of the remaining bits. Merging
+    keeps the maximum of each register, so the merged sketch estimates the
+    number of distinct items of the union. Items can't be removed, but adding
+    an item again doesn't change the sketch.
+    """
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        self.precision = precision
+        self.registers = numpy.zeros(1 << precision, dtype=numpy.uint8)
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'precision <{self.precision}>, ' \
+               f'registers <{numpy.count_nonzero(self.registers)}>]'
+
+    @property
+    def standard_error(self) -> float:
+        """
+        Relative standard error of the estimated number of distinct items.
+        """
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, item: str) -> None:
+        """
+        Adds an item to the sketch.
+        :param item: the item
+        """
+        # a stable hash is required as the sketches are persisted
+        hashed = int.from_bytes(hashlib.blake2b(
+            item.encode(), digest_size=_HASH_BITS // 8).digest(), 'big')
+        remaining_bits = _HASH_BITS - self.precision
+        index = hashed >> remaining_bits
+        rank = remaining_bits - \
+            (hashed & ((1 << remaining_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        """
+        Adds all items of another sketch with the same precision to this one.
+        :param other: the other sketch
+        """
+        if other.precision != self.precision:
+            raise ValueError('sketches with different precisions can\'t be '
+                             'merged')
+        numpy.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        """
+        Estimates the number of distinct items added to the sketch.
+        :return: the estimate
+        """
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / numpy.exp2(
+            -self.registers.astype(float)).sum()
+        zeros = size - numpy.count_nonzero(self.registers)
+        if estimate <= 2.5 * size and zeros:
+            # linear counting is more accurate for small numbers of items
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+    def to_json(self) -> Dict:
+        """
+        Converts the sketch to a JSON serializable representation containing
+        the compressed registers. Registers of sketches with few items are
+        mostly zero, so they compress well.
+        :return: the representation
+        """
+        return {
+            'precision': self.precision,
+            'registers': base64.b64encode(
+                zlib.compress(self.registers.tobytes())).decode('ascii')
+        }
+
+    @staticmethod
+    def from_json(data: Dict) -> 'HyperLogLog':
+        """
+        Restores a sketch from the representation created by to_json.
+        :param data: the JSON representation
+        :return: the sketch
+        """
+        sketch = HyperLogLog(data['precision'])
+        sketch.registers = numpy.frombuffer(
+            zlib.decompress(base64.b64decode(data['registers'])),
+            dtype=numpy.uint8).copy()
+        return sketch
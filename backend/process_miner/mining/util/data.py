@@ -3,7 +3,7 @@ Utility module for working with log data in various formats
 """
 import logging
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
 import pandas
 from pandas import DataFrame
@@ -38,6 +38,15 @@ def get_csv_files(source: Path) -> List[DataFrame]:
         log.error('%s is not a directory', source)
         raise Exception()
     files = source.glob(f"*.{FILE_EXTENSION}")
+    return read_csv_files(files)
+
+
+def read_csv_files(files: Iterable[Path]) -> List[DataFrame]:
+    """
+    Reads the specified CSV files to DataFrames.
+    :param files: paths of the files
+    :return: a list containing the DataFrames
+    """
     return [pandas.read_csv(file) for file in files]
 
 
@@ -55,7 +64,31 @@ def merge_and_sort_dataframes(csv_files: List[DataFrame],
     if not sort_column:
         return frame
     log.info('sorting by column "%s"', sort_column)
-    return frame.sort_values(sort_column)
+    # a stable sort keeps entries with equal values in the order they were
+    # stored which makes the order independent of the selected files
+    return frame.sort_values(sort_column, kind='mergesort')
+
+
+def slice_by_sorted_column(frame: DataFrame, column: str, first=None,
+                           last=None) -> DataFrame:
+    """
+    Limits a DataFrame sorted by the specified column to the rows whose values
+    lie within the supplied (inclusive) bounds. The bounds are located via
+    binary search so the column does not have to be scanned completely.
+    :param frame: the DataFrame (has to be sorted by the column)
+    :param column: the column the DataFrame is sorted by
+    :param first: lower bound (no lower bound if None)
+    :param last: upper bound (no upper bound if None)
+    :return: a DataFrame representing the requested slice
+    """
+    if not first and not last:
+        return frame
+    values = frame[column].values
+    start_index = values.searchsorted(first, 'left') if first else 0
+    end_index = values.searchsorted(last, 'right') if last else len(values)
+    log.info('limiting %s rows to range [%s, %s] of column "%s" -> %s rows',
+             len(values), first, last, column, max(end_index - start_index, 0))
+    return frame.iloc[start_index:end_index]
 
 
 def rename_columns(frame: DataFrame, mapping: Dict[str, str]):
@@ -0,0 +1,123 @@
+"""
+Module for compressing sessions to variants. Sessions sharing the same
+sequence of activities belong to the same variant, so the frequencies only
+have to be counted once per variant and weighted by the number of its
+sessions.
+"""
+import logging
+from typing import List, Tuple
+
+import numpy
+import pandas
+from pandas import DataFrame
+
+from process_miner.mining.frequencies import Frequencies, \
+    count_coded_frequencies, ACTIVITY_COLUMN, CASE_COLUMN
+
+log = logging.getLogger(__name__)
+
+# columns of the session values used for metadata extraction
+SESSION_COLUMNS = [CASE_COLUMN, 'approach', 'method', 'bank', 'errortype']
+
+
+class VariantTable:
+    """
+    Class containing the variants of a data set. Besides the variants it
+    keeps the distinct values of the metadata columns of each session, as
+    metadata is counted per session and can't be derived from the activities.
+    """
+    def __init__(self, variants: List[Tuple[str, ...]], sessions: List[list],
+                 session_values: DataFrame):
+        self.variants = variants
+        self.sessions = sessions
+        self.session_values = session_values
+
+    def __str__(self):
+        return f'{self.__class__.__name__} [' \
+               f'variants <{len(self.variants)}>, ' \
+               f'sessions <{self.session_count}>]'
+
+    @property
+    def counts(self) -> List[int]:
+        """
+        Number of sessions following each variant.
+        """
+        return [len(sessions) for sessions in self.sessions]
+
+    @property
+    def session_count(self) -> int:
+        """
+        Number of sessions contained in all variants.
+        """
+        return sum(self.counts)
+
+    def count_frequencies(self) -> Frequencies:
+        """
+        Counts the frequencies of all sessions by counting each variant once
+        and weighting it with its number of sessions.
+        :return: the frequencies
+        """
+        return count_coded_frequencies(*self.encode())
+
+    def encode(self) -> Tuple[numpy.ndarray, numpy.ndarray, List[str],
+                              numpy.ndarray]:
+        """
+        Represents the activities of the variants by integer codes as
+        expected by count_coded_frequencies. Each variant is a case weighted
+        with its number of sessions.
+        :return: tuple containing the case code and activity code of each
+        entry, the activities and the weight of each case
+        """
+        activity_codes, activities = pandas.factorize(numpy.array(
+            [activity for variant in self.variants for activity in variant],
+            dtype=object))
+        case_codes = numpy.repeat(numpy.arange(len(self.variants)),
+                                  [len(variant) for variant in self.variants])
+        return case_codes, activity_codes, activities.tolist(), \
+            numpy.array(self.counts, dtype=numpy.int64)
+
+
+def compute_variants(frame: DataFrame, case_column: str = CASE_COLUMN,
+                     activity_column: str = ACTIVITY_COLUMN) -> VariantTable:
+    """
+    Compresses the sessions contained in a DataFrame to variants. The order
+    of the entries within a session is defined by their order in the
+    DataFrame.
+    :param frame: the DataFrame
+    :param case_column: column identifying the session of an entry
+    :param activity_column: column containing the activity of an entry
+    :return: the variants
+    """
+    session_values = frame[[column for column in SESSION_COLUMNS
+                            if column in frame.columns]].drop_duplicates()
+    if frame.empty:
+        return VariantTable([], [], session_values)
+    activity_codes, activities = pandas.factorize(frame[activity_column])
+    case_codes, cases = pandas.factorize(frame[case_column])
+    # group the entries by session while keeping their order within each
+    # session
+    order = numpy.argsort(case_codes, kind='stable')
+    boundaries = numpy.flatnonzero(numpy.diff(case_codes[order])) + 1
+    # after sorting the sessions appear in the order of their codes
+    variants, sessions = _collect_variants(
+        cases.tolist(), numpy.split(activity_codes[order], boundaries),
+        activities)
+    table = VariantTable(variants, sessions, session_values)
+    log.info('computed %s', table)
+    return table
+
+
+def _collect_variants(cases: List[str], session_codes: List[numpy.ndarray],
+                      activities: pandas.Index) \
+        -> Tuple[List[Tuple[str, ...]], List[list]]:
+    variant_indices = {}
+    variants = []
+    sessions = []
+    for session, codes in zip(cases, session_codes):
+        key = codes.tobytes()
+        if key not in variant_indices:
+            variant_indices[key] = len(variants)
+            variants.append(tuple(activities[codes].tolist()))
+            sessions.append([])
+        sessions[variant_indices[key]].append(session)
+    return variants, sessions
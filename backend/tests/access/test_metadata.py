@@ -0,0 +1,64 @@
+"""
+Tests for the metadata module
+"""
+from flask import Flask
+from flask_caching import Cache
+
+from process_miner.access.blueprints import metadata, request_result
+from process_miner.access.work.request_processing import POOL_INTERACTIVE, \
+    POOL_MINING
+from process_miner.mining.session_summaries import SessionSummaries
+from tests.mining.test_dataset_factory import _create_log_directory
+
+
+class _RecordingManager:  # pylint: disable=too-few-public-methods
+    """
+    Request manager recording the pools requests are submitted to instead
+    of processing them.
+    """
+    def __init__(self):
+        self.pools = []
+
+    def submit_ticketed(self, _function, *_args, pool, **_kwargs):
+        """
+        Records the pool of a request.
+        """
+        self.pools.append(pool)
+        return str(len(self.pools))
+
+
+def _get_pools(dataset_factory, urls):
+    manager = _RecordingManager()
+    app = Flask(__name__)
+    cache = Cache(app, config={'CACHE_TYPE': 'simple'})
+    app.register_blueprint(request_result.create_blueprint(manager))
+    app.register_blueprint(metadata.create_blueprint(
+        manager, cache, dataset_factory))
+    client = app.test_client()
+    for url in urls:
+        assert client.get(url).status_code == 200
+    return manager.pools
+
+
+def test_requests_reading_logs_use_mining_pool(tmp_path):
+    """
+    Checks if only requests that can be answered from current session
+    summaries are processed by the interactive pool.
+    """
+    urls = [
+        '/metadata/method/count',
+        '/metadata/approaches/count',
+        '/metadata/approaches/count?from=2020-01-02T00:00:00.000Z',
+        '/metadata/approaches/count?from=2020-01-02T00:00:00.000Z'
+        '&approximate=true',
+        '/metadata/sessions/count',
+        '/metadata/sessions/count?approximate=true',
+        '/metadata/timeseries',
+        '/metadata/latency'
+    ]
+    dataset_factory = _create_log_directory(tmp_path)
+    assert _get_pools(dataset_factory, urls) == [POOL_MINING] * len(urls)
+    SessionSummaries(tmp_path).rebuild()
+    assert _get_pools(dataset_factory, urls) == [
+        POOL_INTERACTIVE, POOL_INTERACTIVE, POOL_MINING, POOL_INTERACTIVE,
+        POOL_MINING, POOL_INTERACTIVE, POOL_INTERACTIVE, POOL_INTERACTIVE]
@@ -0,0 +1,277 @@
+"""
+Tests for the request_processing module
+"""
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+import process_miner
+from process_miner.access.work.request_processing import POOL_INTERACTIVE, \
+    POOL_MINING, REASON_EVICTED, REASON_EXPIRED, REASON_PROCESSING, \
+    REASON_RETRIEVED, REASON_UNKNOWN, RequestManager, RequestNotFoundError
+from process_miner.configuration_loader import ConfigurationLoader
+
+
+class _Job:  # pylint: disable=too-few-public-methods
+    """
+    Function counting its calls and blocking until it is released.
+    """
+    def __init__(self, error: Exception = None):
+        self.calls = 0
+        self.error = error
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, value):
+        with self._lock:
+            self.calls += 1
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return {'value': value}
+
+
+def _create_manager(**kwargs):
+    app = Flask(__name__)
+    return app, RequestManager(app, **kwargs)
+
+
+def _wait_until_processed(manager, ticket):
+    for _ in range(500):
+        if manager.request_processed(ticket):
+            return
+        time.sleep(0.01)
+    raise AssertionError(f'request "{ticket}" wasn\'t processed')
+
+
+def _wait_until_finished(manager):
+    for _ in range(500):
+        if manager.get_metrics()['running'] == 0:
+            return
+        time.sleep(0.01)
+    raise AssertionError('requests weren\'t finished')
+
+
+def _assert_not_found(manager, ticket, reason):
+    with pytest.raises(RequestNotFoundError) as error:
+        manager.get_result(ticket)
+    assert str(error.value) == reason
+
+
+def test_identical_requests_share_execution():
+    """
+    Checks if identical requests receive their own tickets but the function
+    is only executed once.
+    """
+    app, manager = _create_manager()
+    job = _Job()
+    with app.test_request_context():
+        first = manager.submit_ticketed(job, 1)
+        second = manager.submit_ticketed(job, 1)
+    assert first != second
+    job.release.set()
+    _wait_until_processed(manager, first)
+    assert manager.get_result(first) == {'value': 1}
+    assert manager.get_result(second) == {'value': 1}
+    assert job.calls == 1
+
+
+def test_different_arguments_not_shared():
+    """
+    Checks if requests with different arguments are executed separately.
+    """
+    app, manager = _create_manager()
+    job = _Job()
+    with app.test_request_context():
+        first = manager.submit_ticketed(job, 1)
+        second = manager.submit_ticketed(job, 2)
+    job.release.set()
+    _wait_until_processed(manager, first)
+    _wait_until_processed(manager, second)
+    assert manager.get_result(first) == {'value': 1}
+    assert manager.get_result(second) == {'value': 2}
+    assert job.calls == 2
+
+
+def test_unhashable_arguments_not_shared():
+    """
+    Checks if requests with unhashable arguments bypass the sharing of
+    executions.
+    """
+    app, manager = _create_manager()
+    job = _Job()
+    job.release.set()
+    with app.test_request_context():
+        first = manager.submit_ticketed(job, [1])
+        second = manager.submit_ticketed(job, [1])
+    _wait_until_processed(manager, first)
+    _wait_until_processed(manager, second)
+    assert manager.get_result(first) == manager.get_result(second) == {
+        'value': [1]}
+    assert job.calls == 2
+
+
+def test_shared_exception_reaches_every_request():
+    """
+    Checks if an exception of a shared execution is raised for every
+    request sharing it.
+    """
+    app, manager = _create_manager()
+    job = _Job(ValueError('failed'))
+    with app.test_request_context():
+        first = manager.submit_ticketed(job, 1)
+        second = manager.submit_ticketed(job, 1)
+    job.release.set()
+    _wait_until_processed(manager, first)
+    for ticket in [first, second]:
+        with pytest.raises(ValueError, match='failed'):
+            manager.get_result(ticket)
+    assert job.calls == 1
+
+
+def test_finished_execution_not_shared():
+    """
+    Checks if a request identical to an already finished one is executed
+    again.
+    """
+    app, manager = _create_manager()
+    job = _Job()
+    job.release.set()
+    with app.test_request_context():
+        first = manager.submit_ticketed(job, 1)
+        _wait_until_processed(manager, first)
+        second = manager.submit_ticketed(job, 1)
+    _wait_until_processed(manager, second)
+    assert manager.get_result(second) == {'value': 1}
+    assert job.calls == 2
+
+
+def test_result_not_found_reasons():
+    """
+    Checks if results that aren't available state the reason.
+    """
+    app, manager = _create_manager()
+    job = _Job()
+    with app.test_request_context():
+        ticket = manager.submit_ticketed(job, 1)
+    _assert_not_found(manager, ticket, REASON_PROCESSING)
+    _assert_not_found(manager, 'unknown', REASON_UNKNOWN)
+    job.release.set()
+    _wait_until_processed(manager, ticket)
+    assert manager.get_result(ticket) == {'value': 1}
+    _assert_not_found(manager, ticket, REASON_RETRIEVED)
+    assert manager.get_metrics()['retrieved'] == 1
+
+
+def test_results_expire():
+    """
+    Checks if results that aren't retrieved within the TTL are removed.
+    """
+    app, manager = _create_manager(result_ttl=0.05)
+    job = _Job()
+    job.release.set()
+    with app.test_request_context():
+        ticket = manager.submit_ticketed(job, 1)
+    _wait_until_processed(manager, ticket)
+    time.sleep(0.1)
+    _assert_not_found(manager, ticket, REASON_EXPIRED.format(0.05))
+    metrics = manager.get_metrics()
+    assert metrics['expired'] == 1
+    assert metrics['stored'] == 0
+
+
+def test_shared_results_evicted_together():
+    """
+    Checks if the oldest results are evicted once the size limit is exceeded
+    and a shared result is evicted for all of its requests at once.
+    """
+    result_size = len('{"value": "aaaaaaaaaa"}')
+    app, manager = _create_manager(max_result_size=result_size)
+    job = _Job()
+    with app.test_request_context():
+        first = manager.submit_ticketed(job, 'a' * 10)
+        second = manager.submit_ticketed(job, 'b' * 10)
+        shared = manager.submit_ticketed(job, 'a' * 10)
+    job.release.set()
+    _wait_until_finished(manager)
+    metrics = manager.get_metrics()
+    assert metrics['stored'] == 1
+    assert metrics['resultSize'] == result_size
+    assert metrics['evicted'] == 2
+    _assert_not_found(manager, first, REASON_EVICTED)
+    _assert_not_found(manager, shared, REASON_EVICTED)
+    assert manager.get_result(second) == {'value': 'b' * 10}
+
+
+def test_oversized_result_kept():
+    """
+    Checks if a result exceeding the size limit on its own isn't evicted.
+    """
+    app, manager = _create_manager(max_result_size=10)
+    job = _Job()
+    job.release.set()
+    with app.test_request_context():
+        ticket = manager.submit_ticketed(job, 'a' * 100)
+    _wait_until_finished(manager)
+    metrics = manager.get_metrics()
+    assert metrics['evicted'] == 0
+    assert metrics['resultSize'] == 0
+    assert manager.get_result(ticket) == {'value': 'a' * 100}
+
+
+def test_pool_worker_limits(tmp_path):
+    """
+    Checks if the configured number of workers is used for each pool while
+    the other pools keep their defaults.
+    """
+    config = tmp_path / 'config.yaml'
+    config.write_text('global:\n  request_pools:\n    mining: 3\n')
+    app = Flask(__name__)
+    # pylint: disable=protected-access
+    manager = process_miner._create_request_manager(
+        ConfigurationLoader(config), app)
+    assert app.config['MINING_EXECUTOR_MAX_WORKERS'] == 3
+    assert app.config['INTERACTIVE_EXECUTOR_MAX_WORKERS'] == 4
+    pools = manager.get_metrics()['pools']
+    assert pools[POOL_MINING]['workers'] == 3
+    assert pools[POOL_INTERACTIVE]['workers'] == 4
+
+
+def test_unknown_pool():
+    """
+    Checks if submitting to an unknown pool is rejected.
+    """
+    app, manager = _create_manager()
+    with app.test_request_context(), pytest.raises(ValueError):
+        manager.submit_ticketed(_Job(), 1, pool='unknown')
+
+
+def test_queue_wait_metrics():
+    """
+    Checks if requests exceeding the workers of a pool are queued without
+    affecting other pools and their waiting times are recorded.
+    """
+    app, manager = _create_manager(pools={POOL_MINING: 1})
+    job = _Job()
+    with app.test_request_context():
+        first = manager.submit_ticketed(job, 1)
+        second = manager.submit_ticketed(job, 2)
+        light = manager.submit_ticketed(lambda: 'light',
+                                        pool=POOL_INTERACTIVE)
+    _wait_until_processed(manager, light)
+    assert manager.get_result(light) == 'light'
+    while job.calls == 0:
+        time.sleep(0.01)
+    pools = manager.get_metrics()['pools']
+    assert pools[POOL_MINING]['running'] == 1
+    assert pools[POOL_MINING]['queueDepth'] == 1
+    time.sleep(0.05)
+    job.release.set()
+    _wait_until_processed(manager, first)
+    _wait_until_processed(manager, second)
+    wait = manager.get_metrics()['pools'][POOL_MINING]['queueWait']
+    assert wait['count'] == 2
+    assert wait['max'] >= 0.05
+    assert 0 < wait['mean'] < wait['max']
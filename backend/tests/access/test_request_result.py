@@ -0,0 +1,27 @@
+"""
+Tests for the request_result module
+"""
+import json
+
+from process_miner.access.blueprints.request_result import BinaryResult, \
+    DETAILS_HEADER
+
+
+def test_binary_result_header_contains_scalar_details():
+    """
+    Checks if only the scalar details are supplied in the header while
+    nested ones like metadata counts are left out.
+    """
+    details = {
+        'numberOfSessions': 3,
+        'samplingRatio': 0.5,
+        'trimmed': False,
+        'metadata': {'banks': {f'BANK{i}': i for i in range(1000)}},
+        'pruned': {'activities': ['_else_'], 'edges': 2}
+    }
+    response = BinaryResult(b'<svg/>', 'image/svg+xml', details) \
+        .to_response()
+    assert response.get_data() == b'<svg/>'
+    assert response.mimetype == 'image/svg+xml'
+    assert json.loads(response.headers[DETAILS_HEADER]) == {
+        'numberOfSessions': 3, 'samplingRatio': 0.5, 'trimmed': False}
@@ -0,0 +1,142 @@
+"""
+Tests for the log_catalog module
+"""
+import csv
+
+from process_miner.log_handling.log_catalog import LogCatalog
+
+FIELDS = ['timestamp', 'correlationId', 'approach', 'method', 'message']
+
+
+def _create_entry(timestamp, correlation_id, approach, method):
+    return {
+        'timestamp': timestamp,
+        'correlationId': correlation_id,
+        'approach': approach,
+        'method': method,
+        'message': 'message'
+    }
+
+
+def _create_catalog(directory):
+    catalog = LogCatalog(directory)
+    files = {
+        'a.csv': [
+            _create_entry('2020-01-01T01:00:00.000Z', '1', 'embedded',
+                          'get_accounts'),
+            _create_entry('2020-01-01T01:00:01.000Z', '1', 'embedded',
+                          'not available')
+        ],
+        # continuation of session 1 retrieved later
+        'b.csv': [
+            _create_entry('2020-01-01T02:00:00.000Z', '1', 'embedded',
+                          'not available')
+        ],
+        'c.csv': [
+            _create_entry('2020-01-01T01:30:00.000Z', '2', 'redirect',
+                          'get_transactions')
+        ]
+    }
+    for filename, entries in files.items():
+        (directory / filename).touch()
+        catalog.add_file(filename, entries, FIELDS)
+    catalog.save()
+    return catalog
+
+
+def _selected_names(files):
+    return sorted(file.name for file in files)
+
+
+def test_select_files_no_filters(tmp_path):
+    """
+    Checks if all files get selected if no filters are supplied.
+    """
+    catalog = _create_catalog(tmp_path)
+    assert _selected_names(catalog.select_files('*.csv')) == \
+        ['a.csv', 'b.csv', 'c.csv']
+
+
+def test_select_files_row_filter(tmp_path):
+    """
+    Checks if files not containing a row filter value get skipped.
+    """
+    catalog = _create_catalog(tmp_path)
+    files = catalog.select_files('*.csv', row_filters={'approach': 'redirect'})
+    assert _selected_names(files) == ['c.csv']
+
+
+def test_select_files_session_filter_includes_related_files(tmp_path):
+    """
+    Checks if session filters select all files of matching sessions even if
+    the value is only present in one of them.
+    """
+    catalog = _create_catalog(tmp_path)
+    files = catalog.select_files('*.csv',
+                                 session_filters={'method': 'get_accounts'})
+    assert _selected_names(files) == ['a.csv', 'b.csv']
+
+
+def test_select_files_uncataloged_files_selected(tmp_path):
+    """
+    Checks if files missing from the catalog are never skipped.
+    """
+    catalog = _create_catalog(tmp_path)
+    (tmp_path / 'unknown.csv').touch()
+    files = catalog.select_files('*.csv', row_filters={'approach': 'OAuth'})
+    assert _selected_names(files) == ['unknown.csv']
+
+
+def test_catalog_reloaded_from_disk(tmp_path):
+    """
+    Checks if a catalog saved by one instance can be read by another one.
+    """
+    _create_catalog(tmp_path)
+    entries = LogCatalog(tmp_path).get_entries()
+    assert entries['a.csv']['rows'] == 2
+    assert entries['a.csv']['values']['method'] == ['get_accounts',
+                                                    'not available']
+    assert entries['c.csv']['min_timestamp'] == '2020-01-01T01:30:00.000Z'
+
+
+def test_select_files_time_range(tmp_path):
+    """
+    Checks if files outside of the requested time range get skipped.
+    """
+    catalog = _create_catalog(tmp_path)
+    files = catalog.select_files('*.csv', start='2020-01-01T01:00:30.000Z',
+                                 end='2020-01-01T01:59:59.999Z')
+    assert _selected_names(files) == ['c.csv']
+
+
+def test_save_changes_version(tmp_path):
+    """
+    Checks if every save results in a new catalog version.
+    """
+    catalog = _create_catalog(tmp_path)
+    version = catalog.get_version()
+    catalog.save()
+    assert version
+    assert catalog.get_version() != version
+
+
+def test_add_untracked_files(tmp_path):
+    """
+    Checks if files missing from the catalog are detected and cataloged.
+    """
+    catalog = _create_catalog(tmp_path)
+    assert not catalog.has_untracked_files('*.csv')
+    with (tmp_path / 'legacy.csv').open('w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, FIELDS)
+        writer.writeheader()
+        writer.writerow(_create_entry('2019-12-31T01:00:00.000Z', '3',
+                                      'OAuth', 'get_accounts'))
+    version = catalog.get_version()
+    assert catalog.has_untracked_files('*.csv')
+    assert catalog.add_untracked_files('*.csv') == 1
+    assert catalog.get_version() != version
+    assert not catalog.has_untracked_files('*.csv')
+    entries = LogCatalog(tmp_path).get_entries()
+    assert entries['legacy.csv']['correlationId'] == '3'
+    assert entries['legacy.csv']['values']['approach'] == ['OAuth']
+    assert catalog.add_untracked_files('*.csv') == 0
@@ -6,6 +6,7 @@ from csv import DictReader
 
 import process_miner.log_handling.log_retriever as lr
 from process_miner.log_handling.graylog_access import GraylogAccess
+from process_miner.log_handling.log_catalog import LogCatalog
 from process_miner.log_handling.log_retriever import LogRetriever
 
 
@@ -42,7 +43,8 @@ def test_retrieve_logs_consecutive_requests(tmp_path, requests_mock):
     retriever.retrieve_logs()
 
     #  number of files and last retrieved timestamp after first request
-    assert len(os.listdir(log_directory)) == 3
+    #  (two log files, timestamp file and catalog)
+    assert len(os.listdir(log_directory)) == 4
     timestamp_file_path = log_directory / lr.TIMESTAMP_FILENAME
     with timestamp_file_path.open('r') as timestamp_file:
         assert timestamp_file.readline() == '2020-01-01T01:00:03.000Z'
@@ -78,7 +80,7 @@ def test_retrieve_logs_consecutive_requests(tmp_path, requests_mock):
     ''')
     retriever.retrieve_logs()
     #  number of files and last retrieved timestamp after second request
-    assert len(os.listdir(log_directory)) == 4
+    assert len(os.listdir(log_directory)) == 5
     with timestamp_file_path.open('r') as timestamp_file:
         assert timestamp_file.readline() == '2020-01-01T01:01:05.000Z'
     #  file with correlationId 3
@@ -93,3 +95,64 @@ def test_retrieve_logs_consecutive_requests(tmp_path, requests_mock):
         assert rows[1]['timestamp'] == '2020-01-01T01:01:05.000Z'
         assert rows[1]['correlationId'] == '3'
         assert rows[1]['message'] == 'message5'
+
+
+def test_retrieve_logs_catalog_entries(tmp_path, requests_mock):
+    """
+    Check if stored log files get recorded in the catalog.
+    """
+    test_url = 'http://test.test'
+    requests_mock.get(f'{test_url}/api/search/universal/absolute/export',
+                      text='''timestamp,correlationId,message
+2020-01-01T01:00:02.000Z,1,message2
+2020-01-01T01:00:01.000Z,2,message1
+2020-01-01T01:00:00.000Z,1,message0
+''')
+    log_directory = tmp_path / 'retrieved_logs'
+    graylog = GraylogAccess(test_url, 'token')
+    retriever = LogRetriever(graylog, log_directory, ['filter_expression'], [])
+    retriever.retrieve_logs()
+
+    catalog = LogCatalog(log_directory)
+    entries = catalog.get_entries()
+    assert set(entries.keys()) == {'2020-01-01T01_00_00.000Z_1.csv',
+                                   '2020-01-01T01_00_01.000Z_2.csv'}
+    entry = entries['2020-01-01T01_00_00.000Z_1.csv']
+    assert entry['correlationId'] == '1'
+    assert entry['rows'] == 2
+    assert entry['min_timestamp'] == '2020-01-01T01:00:00.000Z'
+    assert entry['max_timestamp'] == '2020-01-01T01:00:02.000Z'
+
+
+class _RecordingListener(lr.IngestionListener):
+    def __init__(self):
+        self.stored = []
+        self.cleared = 0
+
+    def logs_stored(self, sessions):
+        self.stored.append(sorted(sessions))
+
+    def logs_cleared(self):
+        self.cleared += 1
+
+
+def test_retrieve_logs_notifies_listeners(tmp_path, requests_mock):
+    """
+    Check if ingestion listeners get notified about stored and cleared logs.
+    """
+    test_url = 'http://test.test'
+    requests_mock.get(f'{test_url}/api/search/universal/absolute/export',
+                      text='''timestamp,correlationId,message
+2020-01-01T01:00:01.000Z,2,message1
+2020-01-01T01:00:00.000Z,1,message0
+''')
+    log_directory = tmp_path / 'retrieved_logs'
+    graylog = GraylogAccess(test_url, 'token')
+    retriever = LogRetriever(graylog, log_directory, ['filter_expression'], [])
+    listener = _RecordingListener()
+    retriever.add_ingestion_listener(listener)
+    retriever.retrieve_logs()
+    assert listener.stored == [['1', '2']]
+    retriever.retrieve_logs(force=True)
+    assert listener.cleared == 1
+    assert len(listener.stored) == 2
@@ -0,0 +1,196 @@
+"""
+Tests for the dataset_factory module
+"""
+import csv
+
+from pandas import DataFrame
+
+from process_miner.log_handling.log_catalog import LogCatalog
+from process_miner.mining.dataset_factory import DatasetFactory, DataFilter
+from process_miner.mining.dfg_cube import DfgCube
+
+FIELDS = ['timestamp', 'correlationId', 'approach', 'method', 'label',
+          'errortype', 'bank', 'message']
+
+SESSIONS = {
+    '1': [
+        ('2020-01-01T01:00:00.000Z', 'embedded', 'get_accounts', 'A',
+         'No Error', 'ADORSYS'),
+        ('2020-01-01T01:00:01.000Z', 'embedded', 'not available', 'B',
+         'No Error', 'ADORSYS')
+    ],
+    '2': [
+        ('2020-01-02T01:00:00.000Z', 'redirect', 'get_transactions', 'A',
+         'Consent Invalid', 'BANKX'),
+        ('2020-01-02T01:00:05.000Z', 'redirect', 'not available', 'C',
+         'Consent Invalid', 'BANKX')
+    ],
+    '3': [
+        ('2020-01-03T01:00:00.000Z', 'embedded', 'get_transactions', 'A',
+         'No Error', 'BANKX')
+    ]
+}
+
+
+def _write_log_file(catalog, filename, correlation_id, rows):
+    entries = []
+    for (timestamp, approach, method, label, error, bank) in rows:
+        entries.append({
+            'timestamp': timestamp,
+            'correlationId': correlation_id,
+            'approach': approach,
+            'method': method,
+            'label': label,
+            'errortype': error,
+            'bank': bank,
+            'message': label
+        })
+    with (catalog.directory / filename).open('w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, FIELDS)
+        writer.writeheader()
+        writer.writerows(entries)
+    catalog.add_file(filename, entries, FIELDS)
+
+
+def _create_log_directory(directory):
+    catalog = LogCatalog(directory)
+    for correlation_id, rows in SESSIONS.items():
+        _write_log_file(catalog, f'{correlation_id}.csv', correlation_id,
+                        rows)
+    catalog.save()
+    return DatasetFactory(directory)
+
+
+def _sessions(frame):
+    return sorted(frame['correlationId'].astype(str).unique().tolist())
+
+
+def test_get_prepared_data_frame_no_filter(tmp_path):
+    """
+    Checks if all entries are returned sorted by timestamp without filters.
+    """
+    frame = _create_log_directory(tmp_path).get_prepared_data_frame()
+    assert len(frame) == 5
+    assert frame['timestamp'].is_monotonic_increasing
+
+
+def test_get_prepared_data_frame_session_filters(tmp_path):
+    """
+    Checks if session filters keep all entries of matching sessions.
+    """
+    factory = _create_log_directory(tmp_path)
+    frame = factory.get_prepared_data_frame(method_type='get_transactions',
+                                            bank='BANKX')
+    assert _sessions(frame) == ['2', '3']
+    assert len(frame) == 3
+    frame = factory.get_prepared_data_frame(approach='embedded',
+                                            error_type='No Error')
+    assert _sessions(frame) == ['1', '3']
+
+
+def test_get_prepared_data_frame_method_in_other_approach_file(tmp_path):
+    """
+    Checks if a session is kept when its only matching method is stored in a
+    file that doesn't contain the requested approach.
+    """
+    catalog = LogCatalog(tmp_path)
+    _write_log_file(catalog, '4a.csv', '4', [
+        ('2020-01-04T01:00:00.000Z', 'embedded', 'not available', 'A',
+         'No Error', 'ADORSYS')])
+    _write_log_file(catalog, '4b.csv', '4', [
+        ('2020-01-04T01:00:01.000Z', 'not available', 'get_balances', 'B',
+         'No Error', 'ADORSYS')])
+    catalog.save()
+    frame = DatasetFactory(tmp_path).get_prepared_data_frame(
+        approach='embedded', method_type='get_balances')
+    assert _sessions(frame) == ['4']
+    assert frame['approach'].tolist() == ['embedded']
+
+
+def test_get_prepared_data_frame_no_match(tmp_path):
+    """
+    Checks if an empty frame is returned if no file can match.
+    """
+    factory = _create_log_directory(tmp_path)
+    frame = factory.get_prepared_data_frame(bank='UNKNOWN')
+    assert frame.empty
+    assert 'correlationId' in frame.columns
+
+
+def test_get_filtered_data_frame_time_range(tmp_path):
+    """
+    Checks if only entries within the (inclusive) time range are returned.
+    """
+    factory = _create_log_directory(tmp_path)
+    data_filter = DataFilter(start='2020-01-01T01:00:01.000Z',
+                             end='2020-01-02T01:00:00.000Z')
+    frame = factory.get_filtered_data_frame(data_filter)
+    assert frame['timestamp'].tolist() == ['2020-01-01T01:00:01.000Z',
+                                           '2020-01-02T01:00:00.000Z']
+
+
+def test_sample_sessions(tmp_path):
+    """
+    Checks if sampling is deterministic and keeps a session per stratum.
+    """
+    frame = _create_log_directory(tmp_path).get_prepared_data_frame()
+    sample, ratio = DatasetFactory.sample_sessions(frame, 0.1)
+    # every (approach, bank) combination occurs in exactly one session
+    assert _sessions(sample) == ['1', '2', '3']
+    assert ratio == 1.0
+    assert DatasetFactory.sample_sessions(frame, 1)[0] is frame
+
+    sessions = frame.drop_duplicates('correlationId')
+    sessions = sessions.iloc[[i for i in range(3) for _ in range(10)]]
+    sessions = sessions.reset_index(drop=True)
+    sessions['correlationId'] = [str(i) for i in range(len(sessions))]
+    sample, ratio = DatasetFactory.sample_sessions(sessions, 0.2)
+    assert len(sample) == 6
+    assert ratio == 0.2
+    assert sample.equals(DatasetFactory.sample_sessions(sessions, 0.2)[0])
+
+
+def test_sample_sessions_without_strata():
+    """
+    Checks if sessions are sampled without stratification if the frame
+    contains neither approach nor bank.
+    """
+    frame = DataFrame({
+        'correlationId': [str(i // 2) for i in range(20)],
+        'label': ['A', 'B'] * 10,
+        'timestamp': [f'2020-01-01T00:00:{i:02d}.000Z' for i in range(20)]
+    })
+    sample, ratio = DatasetFactory.sample_sessions(frame, 0.3)
+    assert ratio == 0.3
+    assert len(sample) == 6
+    assert sample.equals(DatasetFactory.sample_sessions(frame, 0.3)[0])
+
+
+def test_get_aggregate(tmp_path):
+    """
+    Checks if the cube is only used if it is current and no time range is
+    requested.
+    """
+    factory = _create_log_directory(tmp_path)
+    assert factory.get_aggregate(DataFilter()) is None
+    DfgCube(tmp_path).rebuild()
+    assert factory.get_aggregate(DataFilter(bank='BANKX')).session_count == 2
+    assert factory.get_aggregate(
+        DataFilter(start='2020-01-02T00:00:00.000Z')) is None
+
+
+def test_get_variants(tmp_path):
+    """
+    Checks if variants are cached per filter until the data version changes.
+    """
+    factory = _create_log_directory(tmp_path)
+    variants = factory.get_variants(DataFilter())
+    assert sorted(variants.variants) == [('A',), ('A', 'B'), ('A', 'C')]
+    assert factory.get_variants(DataFilter()) is variants
+    assert factory.get_variants(DataFilter(bank='BANKX')).session_count == 2
+    catalog = LogCatalog(tmp_path)
+    catalog.add_file('3.csv', [{field: '' for field in FIELDS} | {
+        'timestamp': '2020-01-03T01:00:00.000Z', 'correlationId': '3'}],
+                     FIELDS)
+    catalog.save()
+    assert factory.get_variants(DataFilter()) is not variants
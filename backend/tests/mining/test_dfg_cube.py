@@ -0,0 +1,144 @@
+"""
+Tests for the dfg_cube module
+"""
+import csv
+
+from process_miner.log_handling.log_catalog import LogCatalog
+from process_miner.mining.dfg_cube import DfgCube
+from process_miner.mining.frequencies import count_frequencies
+from tests.mining.test_dataset_factory import FIELDS, _create_log_directory
+
+FILTERS = [
+    {},
+    {'approach': 'embedded'},
+    {'method_type': 'get_transactions'},
+    {'approach': 'embedded', 'error_type': 'No Error', 'bank': 'BANKX'},
+    {'bank': 'UNKNOWN'}
+]
+
+
+def _store_entries(directory, filename, entries):
+    with (directory / filename).open('w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, FIELDS)
+        writer.writeheader()
+        writer.writerows(entries)
+    catalog = LogCatalog(directory)
+    catalog.add_file(filename, entries, FIELDS)
+    catalog.save()
+
+
+def _add_mixed_session(directory):
+    _store_entries(directory, '4.csv', [
+        {'timestamp': '2020-01-04T01:00:00.000Z', 'correlationId': '4',
+         'approach': 'embedded', 'method': 'get_accounts', 'label': 'A',
+         'errortype': 'No Error', 'bank': 'ADORSYS', 'message': 'A'},
+        {'timestamp': '2020-01-04T01:00:01.000Z', 'correlationId': '4',
+         'approach': 'redirect', 'method': 'get_accounts', 'label': 'D',
+         'errortype': 'No Error', 'bank': 'ADORSYS', 'message': 'D'}
+    ])
+
+
+def test_aggregate_matches_raw_data(tmp_path):
+    """
+    Checks if the aggregated cells equal the frequencies of the raw data.
+    """
+    factory = _create_log_directory(tmp_path)
+    cube = DfgCube(tmp_path)
+    cube.rebuild()
+    assert cube.is_current()
+    for filters in FILTERS:
+        frame = factory.get_prepared_data_frame(**filters)
+        expected = count_frequencies(frame)
+        aggregate = DfgCube(tmp_path).aggregate(**filters)
+        assert vars(aggregate.frequencies) == vars(expected)
+        assert aggregate.session_count == frame['correlationId'].nunique()
+
+
+def test_aggregate_session_value_counts(tmp_path):
+    """
+    Checks if the sessions per dimension value are counted.
+    """
+    _create_log_directory(tmp_path)
+    cube = DfgCube(tmp_path)
+    cube.rebuild()
+    counts = cube.aggregate(approach='embedded').session_value_counts
+    assert counts['method'] == {'get_accounts': 1, 'get_transactions': 1}
+    assert counts['bank'] == {'ADORSYS': 1, 'BANKX': 1}
+
+
+def test_aggregate_mixed_approaches(tmp_path):
+    """
+    Checks if the cube refuses to filter sessions with mixed approaches by
+    approach and becomes outdated when new logs are cataloged.
+    """
+    _create_log_directory(tmp_path)
+    cube = DfgCube(tmp_path)
+    cube.rebuild()
+    _add_mixed_session(tmp_path)
+    assert not cube.is_current()
+    cube.rebuild()
+    assert cube.aggregate(approach='embedded') is None
+    assert cube.aggregate(approach='OAuth').session_count == 0
+    assert cube.aggregate().session_count == 4
+
+
+def test_update_extended_session(tmp_path):
+    """
+    Checks if the cube equals the stored logs after updating it with an
+    extended and a new session.
+    """
+    factory = _create_log_directory(tmp_path)
+    cube = DfgCube(tmp_path)
+    cube.rebuild()
+    # session 1 changes its error type and therefore its cell
+    _store_entries(tmp_path, '1_extended.csv', [
+        {'timestamp': '2020-01-05T01:00:00.000Z', 'correlationId': '1',
+         'approach': 'embedded', 'method': 'not available', 'label': 'E',
+         'errortype': 'Consent Invalid', 'bank': 'ADORSYS', 'message': 'E'}
+    ])
+    _add_mixed_session(tmp_path)
+    cube.update(['1', '4'])
+    assert cube.is_current()
+
+    for filters in [{}, {'error_type': 'Consent Invalid'}, {'bank': 'BANKX'}]:
+        aggregate = DfgCube(tmp_path).aggregate(**filters)
+        expected = count_frequencies(factory.get_prepared_data_frame(
+            **filters))
+        assert vars(aggregate.frequencies) == vars(expected)
+    assert DfgCube(tmp_path).aggregate(
+        error_type='Consent Invalid').session_count == 2
+    assert DfgCube(tmp_path).aggregate().session_count == 4
+
+
+def test_update_inconsistent_cube(tmp_path):
+    """
+    Checks if the cube gets rebuilt if files of other sessions are missing.
+    """
+    _create_log_directory(tmp_path)
+    cube = DfgCube(tmp_path)
+    cube.rebuild()
+    _add_mixed_session(tmp_path)
+    cube.update(['1'])
+    assert cube.aggregate().session_count == 4
+
+
+def test_uncataloged_logs(tmp_path):
+    """
+    Checks if the cube isn't current while stored logs are missing from the
+    catalog and covers them once they are cataloged.
+    """
+    _create_log_directory(tmp_path)
+    cube = DfgCube(tmp_path)
+    cube.rebuild()
+    assert cube.is_current()
+    session_count = cube.aggregate().session_count
+    _add_mixed_session(tmp_path)
+    catalog = LogCatalog(tmp_path)
+    del catalog.get_entries()['4.csv']
+    catalog.save()
+    cube.update(['4'])
+    assert not cube.is_current()
+    catalog.add_untracked_files('*.csv')
+    cube.rebuild()
+    assert cube.is_current()
+    assert cube.aggregate().session_count == session_count + 1
@@ -0,0 +1,69 @@
+"""
+Tests for the distinct module
+"""
+from process_miner.mining.distinct import DistinctCounts
+
+
+def _entry(timestamp, bank, method='not available', errortype='No Error'):
+    return {'timestamp': timestamp, 'approach': 'embedded', 'bank': bank,
+            'method': method, 'errortype': errortype}
+
+
+def test_count_time_range():
+    """
+    Checks if sessions are counted once per value within the days of a time
+    range.
+    """
+    counts = DistinctCounts()
+    counts.add_entries('1', [_entry('2020-06-01T10:00:00.000Z', 'BANKX'),
+                             _entry('2020-06-02T10:00:00.000Z', 'BANKX',
+                                    'get_accounts')], 'embedded')
+    counts.add_entries('2', [_entry('2020-06-02T11:00:00.000Z', 'BANKY')],
+                       'embedded')
+    counts.add_entries('1', [_entry('2020-06-03T10:00:00.000Z', 'BANKX',
+                                    errortype='Bad Request')], 'embedded')
+    assert counts.count('bank') == {'BANKX': 1, 'BANKY': 1}
+    assert counts.count('bank', '2020-06-02T12:00:00.000Z',
+                        '2020-06-02T12:00:00.000Z') == {'BANKX': 1,
+                                                        'BANKY': 1}
+    assert counts.count('errortype', '2020-06-03T00:00:00.000Z') == {
+        'Bad Request': 1}
+    assert counts.count_sessions(end='2020-06-01T23:00:00.000Z') == 1
+    assert counts.count_methods_per_approach() == {
+        'embedded': {'get_accounts': 1}}
+
+
+def test_save_days(tmp_path):
+    """
+    Checks if the sketches of each day are stored in their own file, only
+    changed days are written and cleared days are removed.
+    """
+    counts = DistinctCounts(tmp_path)
+    counts.add_entries('1', [_entry('2020-06-01T10:00:00.000Z', 'BANKX'),
+                             _entry('2020-06-02T10:00:00.000Z', 'BANKX')],
+                       'embedded')
+    counts.save()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'distinct_counts_2020-06-01.json', 'distinct_counts_2020-06-02.json']
+    first_day = tmp_path / 'distinct_counts_2020-06-01.json'
+    modified = first_day.stat().st_mtime_ns
+    counts.add_entries('2', [_entry('2020-06-02T11:00:00.000Z', 'BANKY')],
+                       'embedded')
+    counts.save()
+    assert first_day.stat().st_mtime_ns == modified
+
+    restored = DistinctCounts(tmp_path)
+    assert restored.count('bank', '2020-06-02T00:00:00.000Z') == {
+        'BANKX': 1, 'BANKY': 1}
+    # only the days of the requested range are loaded
+    assert str(restored) == f'DistinctCounts [directory <{tmp_path}>, ' \
+                            f'_days <1>, _changed <0>]'
+    assert restored.count('approach') == {'embedded': 2}
+
+    restored.clear()
+    restored.add_entries('3', [_entry('2020-06-03T10:00:00.000Z', 'BANKZ')],
+                         'embedded')
+    assert restored.count('bank') == {'BANKZ': 1}
+    restored.save()
+    assert [path.name for path in tmp_path.iterdir()] == [
+        'distinct_counts_2020-06-03.json']
@@ -0,0 +1,112 @@
+"""
+Tests for the frequencies module
+"""
+from pathlib import Path
+
+import pandas
+import pm4py.algo.discovery.dfg.algorithm as dfg_alg
+import pm4py.algo.discovery.heuristics.algorithm as hn_alg
+from pm4py.statistics.attributes.log import get as log_attributes
+from pm4py.statistics.end_activities.log import get as log_ea_filter
+from pm4py.statistics.start_activities.log import get as log_sa_filter
+
+from process_miner.mining import graphs
+import process_miner.mining.util.data as data_util
+from process_miner.mining.frequencies import count_frequencies
+
+MOCKDATA_DIRECTORY = Path(__file__).parents[2] / 'Mockdata' / 'Data'
+# file name, separator, case column, activity column
+MOCKDATA_FILES = [
+    ('EmbeddedGraylog.csv', ';', 'correlationId', 'message'),
+    ('EmbeddedTheory.csv', ',', 'coID', 'Activity'),
+    ('TestData1.csv', ';', 'coID', 'Activity')
+]
+
+
+def _read_mockdata():
+    frames = []
+    for index, (name, separator, case, activity) in enumerate(MOCKDATA_FILES):
+        frame = pandas.read_csv(MOCKDATA_DIRECTORY / name, sep=separator,
+                                encoding='utf-8-sig')
+        frame = frame.rename(columns={case: 'correlationId',
+                                      activity: 'label'})
+        frame['correlationId'] = f'case {index}'
+        frame['position'] = range(len(frame))
+        frames.append(frame[['correlationId', 'label', 'position']])
+    # interleave the cases to make sure they are separated correctly
+    return pandas.concat(frames).sort_values('position', kind='stable')
+
+
+def _convert_to_event_log(frame):
+    renamed = frame.rename(columns={'correlationId': 'case:concept:name',
+                                    'label': 'concept:name'})
+    return data_util.convert_to_log(renamed)
+
+
+def _count_with_pm4py(frame):
+    event_log = _convert_to_event_log(frame)
+    return {
+        'activities': log_attributes.get_attribute_values(event_log,
+                                                          'concept:name'),
+        'dfg': dict(dfg_alg.apply(log=event_log)),
+        'start_activities': log_sa_filter.get_start_activities(event_log),
+        'end_activities': log_ea_filter.get_end_activities(event_log),
+        'dfg_window_2': dict(dfg_alg.apply(log=event_log,
+                                           parameters={'window': 2})),
+        'freq_triples': dict(dfg_alg.apply(
+            log=event_log, variant=dfg_alg.Variants.FREQ_TRIPLES))
+    }
+
+
+def test_count_frequencies_matches_pm4py():
+    """
+    Checks if the native frequencies equal the ones calculated by pm4py.
+    """
+    frame = _read_mockdata()
+    frequencies = count_frequencies(frame)
+    expected = _count_with_pm4py(frame)
+    assert frequencies.activities == expected['activities']
+    assert frequencies.dfg == expected['dfg']
+    assert frequencies.start_activities == expected['start_activities']
+    assert frequencies.end_activities == expected['end_activities']
+    assert frequencies.dfg_window_2 == expected['dfg_window_2']
+    assert frequencies.freq_triples == expected['freq_triples']
+
+
+def test_heuristic_net_matches_pm4py():
+    """
+    Checks if a heuristic net mined from the native frequencies equals the
+    one mined by pm4py from an EventLog.
+    """
+    frame = _read_mockdata()
+    net = graphs.mine_heuristic_net(count_frequencies(frame))
+    expected = hn_alg.apply_heu(_convert_to_event_log(frame))
+    assert net.dependency_matrix == expected.dependency_matrix
+    assert net.dfg_matrix == expected.dfg_matrix
+    assert sorted(net.nodes) == sorted(expected.nodes)
+    for name, node in net.nodes.items():
+        assert sorted(str(n) for n in node.output_connections) == \
+            sorted(str(n) for n in expected.nodes[name].output_connections)
+
+
+def test_count_frequencies_scaled():
+    """
+    Checks if scaling multiplies and rounds all frequencies.
+    """
+    frame = pandas.DataFrame({'correlationId': ['1', '1', '2'],
+                              'label': ['A', 'B', 'A']})
+    frequencies = count_frequencies(frame).scaled(2.5)
+    assert frequencies.activities == {'A': 5, 'B': 2}
+    assert frequencies.dfg == {('A', 'B'): 2}
+    assert frequencies.start_activities == {'A': 5}
+    assert frequencies.end_activities == {'B': 2, 'A': 2}
+
+
+def test_count_frequencies_empty():
+    """
+    Checks if an empty DataFrame results in empty frequencies.
+    """
+    frame = pandas.DataFrame(columns=['correlationId', 'label'])
+    frequencies = count_frequencies(frame)
+    assert not frequencies.activities
+    assert not frequencies.dfg
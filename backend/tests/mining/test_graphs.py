@@ -0,0 +1,132 @@
+"""
+Tests for the graphs module
+"""
+from unittest import mock
+
+import pandas
+import pm4py.visualization.heuristics_net.visualizer as hn_vis
+import pydotplus
+
+from process_miner.mining import graphs
+from process_miner.mining.frequencies import count_frequencies
+from process_miner.mining.performance import calculate_transition_times
+from tests.mining.test_frequencies import _read_mockdata
+
+# pm4py's visualizer uses the activities as node names which breaks for
+# activities containing colons, so those are avoided here
+SESSIONS = [
+    ['Create New Session', 'Status 200', 'Get Accounts', 'Session'],
+    ['Create New Session', 'Get Accounts', 'Status 200', 'Session'],
+    ['Create New Session', 'Status 401 (Error)'],
+    ['Create New Session', 'Status 200', 'Get Accounts', 'Session']
+]
+
+
+def _get_elements(graph):
+    # nodes are identified by their labels as the node names differ
+    labels = {node.get_name(): node.get_attributes()['label'].strip('"')
+              for node in graph.get_nodes()
+              if node.get_name() not in ('node', 'graph', 'edge')}
+    nodes = {labels[node.get_name()]: _unquote(node.get_attributes())
+             for node in graph.get_nodes() if node.get_name() in labels}
+    edges = {(labels[edge.get_source()], labels[edge.get_destination()]):
+             _unquote(edge.get_attributes())
+             for edge in graph.get_edges()}
+    return nodes, edges
+
+
+def _unquote(attributes):
+    # the end node of pm4py uses the invalid color "#" which graphviz ignores
+    return {key: str(value).strip('"') for key, value in attributes.items()
+            if str(value).strip('"') != '#'}
+
+
+def test_heuristic_net_graph_matches_pm4py():
+    """
+    Checks if the description of a Heuristic Net equals the one created by
+    pm4py's visualizer.
+    """
+    frame = pandas.DataFrame({
+        'correlationId': [str(index) for index, labels in enumerate(SESSIONS)
+                          for _ in labels],
+        'label': [label for labels in SESSIONS for label in labels]})
+    net = graphs.mine_heuristic_net(count_frequencies(frame))
+    described = []
+    # capture the description instead of writing it to a temporary file
+    with mock.patch.object(pydotplus.Dot, 'write',
+                           lambda graph, *_, **__: described.append(graph)):
+        hn_vis.apply(net)
+    expected = _get_elements(described[0])
+    graph = pydotplus.graph_from_dot_data(
+        graphs.build_heuristic_net_graph(net).source)
+    assert _get_elements(graph) == expected
+
+
+def test_heuristic_net_graph_supports_colons():
+    """
+    Checks if activities containing colons are only used as labels, as
+    graphviz would interpret them as ports in node names.
+    """
+    frame = pandas.DataFrame({'correlationId': ['1', '1'],
+                              'label': ['Event: ASPSP Found',
+                                        'Status 200: OK']})
+    net = graphs.mine_heuristic_net(count_frequencies(frame))
+    graph = pydotplus.graph_from_dot_data(
+        graphs.build_heuristic_net_graph(net).source)
+    nodes, edges = _get_elements(graph)
+    assert 'Status 200: OK (1)' in nodes
+    assert ('Event: ASPSP Found (1)', 'Status 200: OK (1)') in edges
+
+
+def test_render_graph_pipes_in_memory():
+    """
+    Checks if rendering passes the description to graphviz in the requested
+    format and returns its output.
+    """
+    frequencies = count_frequencies(_read_mockdata())
+    with mock.patch('graphviz.Digraph.pipe',
+                    return_value=b'<svg/>') as pipe:
+        assert graphs.render_directly_follows_graph(frequencies) == b'<svg/>'
+    pipe.assert_called_once_with(format='svg')
+
+
+def test_performance_graph_labels():
+    """
+    Checks if the edges of a performance graph are labeled with the
+    statistics of their transition times.
+    """
+    frame = pandas.DataFrame({
+        'correlationId': ['1', '1', '2', '2'],
+        'label': ['A', 'B', 'A', 'B'],
+        'timestamp': ['2020-06-01T00:00:00.000Z', '2020-06-01T00:00:00.250Z',
+                      '2020-06-01T00:00:00.000Z', '2020-06-01T00:02:00.000Z']})
+    graph = graphs.build_performance_graph(
+        count_frequencies(frame), calculate_transition_times(frame))
+    assert 'label="mean 1m\\nmedian 1m\\np95 1m"' in graph.source
+    # relations missing from the frequencies (eg. after trimming) are left out
+    trimmed = graphs.build_performance_graph(
+        count_frequencies(frame.iloc[:1]), calculate_transition_times(frame))
+    assert 'mean' not in trimmed.source
+
+
+def test_heuristic_net_thresholds():
+    """
+    Checks if the thresholds are passed to the heuristics miner.
+    """
+    frame = pandas.DataFrame({
+        'correlationId': [str(index) for index, labels in enumerate(SESSIONS)
+                          for _ in labels],
+        'label': [label for labels in SESSIONS for label in labels]})
+    frequencies = count_frequencies(frame)
+
+    def _count_edges(net):
+        return sum(len(node.output_connections)
+                   for node in net.nodes.values())
+    default = graphs.mine_heuristic_net(frequencies)
+    strict = graphs.mine_heuristic_net(
+        frequencies, graphs.HeuristicsThresholds(dependency=0.6))
+    observed = graphs.mine_heuristic_net(
+        frequencies, graphs.HeuristicsThresholds(observations=2))
+    assert _count_edges(default) == 5
+    assert _count_edges(strict) == 2
+    assert _count_edges(observed) == 2
@@ -0,0 +1,45 @@
+"""
+Tests for the latency module
+"""
+from process_miner.mining.latency import LatencySketches
+from process_miner.mining.session_summaries import summarize_entries
+
+ENTRIES = [
+    {'timestamp': '2020-01-01T01:00:00.000Z', 'label': 'A',
+     'approach': 'embedded', 'bank': 'ADORSYS'},
+    {'timestamp': '2020-01-01T01:00:02.000Z', 'label': 'B',
+     'approach': 'embedded', 'bank': 'ADORSYS'},
+    {'timestamp': '2020-01-01T01:00:12.000Z', 'label': 'A',
+     'approach': 'embedded', 'bank': 'ADORSYS'}
+]
+
+
+def test_extend_session():
+    """
+    Checks if extending a session results in the same sketches as adding
+    all of its entries at once.
+    """
+    complete = LatencySketches()
+    complete.add_steps(ENTRIES)
+    complete.add_session(summarize_entries(ENTRIES))
+
+    extended = LatencySketches()
+    summary = summarize_entries(ENTRIES[:1])
+    extended.add_steps(ENTRIES[:1])
+    extended.add_session(summary)
+    extended.add_session(summary, -1)
+    extended.add_steps(ENTRIES[1:], summary)
+    extended.add_session(summarize_entries(ENTRIES[1:], summary))
+    assert extended.to_json() == complete.to_json()
+
+    quantiles = complete.get_quantiles(approach='embedded')
+    assert quantiles['sessionDuration']['count'] == 1
+    assert abs(quantiles['sessionDuration']['p50'] - 12) <= 0.12
+    assert quantiles['activities']['A']['count'] == 1
+    assert abs(quantiles['activities']['B']['p99'] - 10) <= 0.1
+    assert complete.get_quantiles(bank='BANKX') == {
+        'relativeAccuracy': 0.01,
+        'sessionDuration': {'count': 0, 'p50': None, 'p95': None,
+                            'p99': None},
+        'activities': {}
+    }
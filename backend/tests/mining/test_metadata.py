@@ -0,0 +1,136 @@
+"""
+Tests for the metadata module
+"""
+from collections import defaultdict
+
+import numpy
+import pandas
+
+from process_miner.mining import metadata
+
+MISSING = metadata.DEFAULT_MISSING_VALUE
+
+
+def _create_frame():
+    return pandas.DataFrame({
+        'correlationId': ['2', '1', '1', '2', '3', '3', '4'],
+        'approach': ['redirect', 'embedded', 'embedded', 'embedded',
+                     'embedded', 'embedded', 'redirect'],
+        'method': [MISSING, 'get_accounts', MISSING, 'get_transactions',
+                   MISSING, MISSING, 'get_accounts'],
+        'bank': ['BANKX', 'ADORSYS', 'ADORSYS', 'BANKY', MISSING, 'BANKX',
+                 'BANKX']})
+
+
+def test_missing_value_only_counted_without_other_values():
+    """
+    Checks if the missing value is only counted for sessions without other
+    values and the counts keep the order of the sorted sessions.
+    """
+    frame = _create_frame()
+    assert list(metadata.get_sessions_per_method_type(frame).items()) == [
+        ('get_accounts', 2), ('get_transactions', 1), (MISSING, 1)]
+    assert metadata.get_sessions_per_value(frame, ['method', 'bank']) == {
+        'method': metadata.get_sessions_per_method_type(frame),
+        'bank': {'ADORSYS': 1, 'BANKX': 3, 'BANKY': 1}
+    }
+
+
+def test_method_type_count_per_approach():
+    """
+    Checks if the methods of each session are counted for the first approach
+    occurring in the session.
+    """
+    assert metadata.get_method_type_count_per_approach(_create_frame()) == {
+        'embedded': {'get_accounts': 1, MISSING: 1},
+        'redirect': {'get_transactions': 1, 'get_accounts': 1}
+    }
+
+
+def _create_random_frame():
+    generator = numpy.random.default_rng(0)
+    row_count = 300
+    values = numpy.array(['get_accounts', 'get_transactions', MISSING,
+                          numpy.nan], dtype=object)
+    sessions = generator.integers(0, 40, row_count).astype(str) \
+        .astype(object)
+    # entries without a session are ignored
+    sessions[:5] = numpy.nan
+    return pandas.DataFrame({
+        'correlationId': sessions,
+        'approach': generator.choice(
+            numpy.array(['embedded', 'redirect', numpy.nan], dtype=object),
+            row_count, p=[0.6, 0.35, 0.05]),
+        'method': generator.choice(values, row_count),
+        'bank': generator.choice(values, row_count, p=[0.1, 0.1, 0.4,
+                                                          0.4])
+    })
+
+
+def _get_relevant_values_per_session(frame, column):
+    # per-session loop used before the counting was vectorized (which
+    # failed for sessions with multiple values but without the missing one)
+    for _, session_frame in frame.groupby('correlationId'):
+        values = session_frame[column].unique().tolist()
+        # make sure we don't count a missing value if session has values
+        if len(values) > 1 and MISSING in values:
+            values.remove(MISSING)
+        yield session_frame, values
+
+
+def _count_values_per_session_loop(frame, column):
+    counts = defaultdict(int)
+    for _, values in _get_relevant_values_per_session(frame, column):
+        for value in values:
+            counts[value] += 1
+    return counts
+
+
+def _count_methods_per_approach_loop(frame):
+    counts = defaultdict(lambda: defaultdict(int))
+    for session_frame, methods in _get_relevant_values_per_session(
+            frame, 'method'):
+        approach = session_frame['approach'].unique().tolist()[0]
+        for method in methods:
+            counts[approach][method] += 1
+    return counts
+
+
+def _key(value):
+    # missing values may be represented by different NaN objects that are
+    # distinct dict keys
+    return None if pandas.isna(value) else value
+
+
+def _normalize(counts):
+    normalized = defaultdict(int)
+    for value, count in counts.items():
+        normalized[_key(value)] += count
+    return dict(normalized)
+
+
+def _normalize_per_approach(counts):
+    normalized = defaultdict(lambda: defaultdict(int))
+    for approach, methods in counts.items():
+        for method, count in methods.items():
+            normalized[_key(approach)][_key(method)] += count
+    return {approach: dict(methods)
+            for approach, methods in normalized.items()}
+
+
+def test_vectorized_counts_match_session_loop():
+    """
+    Checks if the vectorized counts equal the counts of iterating over the
+    sessions for data containing missing values, the missing value and
+    sessions with multiple values.
+    """
+    frame = _create_random_frame()
+    sessions = frame.dropna(subset=['correlationId'])
+    assert sessions.groupby('correlationId')['method'].nunique().max() > 1
+    for column in ['method', 'bank']:
+        assert _normalize(metadata.get_sessions_per_value(
+            frame, [column])[column]) == \
+            _normalize(_count_values_per_session_loop(frame, column))
+    assert _normalize_per_approach(
+        metadata.get_method_type_count_per_approach(frame)) == \
+        _normalize_per_approach(_count_methods_per_approach_loop(frame))
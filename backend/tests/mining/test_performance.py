@@ -0,0 +1,69 @@
+"""
+Tests for the performance module
+"""
+import numpy
+import pandas
+
+from process_miner.mining.performance import calculate_transition_times
+
+
+def _create_frame(seed):
+    random = numpy.random.default_rng(seed)
+    rows = []
+    start = pandas.Timestamp('2020-06-01T00:00:00.000Z')
+    for session in range(50):
+        timestamp = start + pandas.Timedelta(minutes=session)
+        for _ in range(random.integers(1, 8)):
+            timestamp += pandas.Timedelta(
+                milliseconds=int(random.integers(0, 100000)))
+            rows.append({
+                'correlationId': f'session {session}',
+                'label': random.choice(['A', 'B', 'C']),
+                'timestamp': timestamp.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+                             + 'Z'
+            })
+    # interleave the sessions like the timestamp sorted stored logs
+    return pandas.DataFrame(rows).sort_values('timestamp', kind='stable')
+
+
+def _calculate_with_loops(frame):
+    durations = {}
+    for _, session in frame.groupby('correlationId', sort=False):
+        seconds = pandas.to_datetime(session['timestamp']).astype('int64') \
+            / 1e9
+        labels = session['label'].tolist()
+        for index in range(1, len(labels)):
+            durations.setdefault((labels[index - 1], labels[index]), []) \
+                .append(seconds.iloc[index] - seconds.iloc[index - 1])
+    return {
+        relation: {'mean': numpy.mean(values),
+                   'median': numpy.median(values),
+                   'p95': numpy.quantile(values, 0.95)}
+        for relation, values in durations.items()
+    }
+
+
+def test_transition_times_match_loops():
+    """
+    Checks if the vectorized statistics equal the ones calculated for each
+    session separately.
+    """
+    frame = _create_frame(0)
+    transition_times = calculate_transition_times(frame)
+    expected = _calculate_with_loops(frame)
+    assert transition_times.keys() == expected.keys()
+    for relation, statistics in expected.items():
+        for name, value in statistics.items():
+            assert numpy.isclose(transition_times[relation][name], value)
+
+
+def test_transition_times_of_single_entries():
+    """
+    Checks if sessions without directly-follows relations result in no
+    transition times.
+    """
+    frame = pandas.DataFrame({
+        'correlationId': ['1', '2'], 'label': ['A', 'B'],
+        'timestamp': ['2020-06-01T00:00:00.000Z', '2020-06-01T00:00:01.000Z']})
+    assert not calculate_transition_times(frame)
+    assert not calculate_transition_times(frame.iloc[:0])
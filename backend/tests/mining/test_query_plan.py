@@ -0,0 +1,97 @@
+"""
+Tests for the query_plan module
+"""
+from pandas import DataFrame
+
+import process_miner.mining.util.data as data_util
+from process_miner.mining.query_plan import QueryPlan
+
+FRAME = DataFrame({
+    'correlationId': ['1', '1', '2', '2', '3', '3', '4'],
+    'approach': ['embedded', 'redirect', 'embedded', 'embedded', 'redirect',
+                 'redirect', 'embedded'],
+    'method': ['get_accounts', 'na', 'na', 'get_accounts', 'get_accounts',
+               'na', 'na'],
+    'bank': ['A', 'B', 'A', 'A', 'B', 'B', 'A'],
+})
+
+
+def _create_plan(approach=None, method=None, bank=None):
+    plan = QueryPlan('correlationId')
+    if method:
+        plan.add_session_predicate('method', method, scoped=False)
+    if approach:
+        plan.add_row_predicate('approach', approach)
+    if bank:
+        plan.add_session_predicate('bank', bank)
+    return plan
+
+
+def _filter_sequentially(frame, approach=None, method=None, bank=None):
+    if method:
+        frame = data_util.filter_related_entries(frame, 'correlationId',
+                                                 'method', [method])
+    if approach:
+        frame = data_util.filter_by_field(frame, 'approach', approach)
+    if bank:
+        frame = data_util.filter_related_entries(frame, 'correlationId',
+                                                 'bank', [bank])
+    return frame
+
+
+def test_execute_without_predicates():
+    """
+    Checks if the DataFrame is returned unchanged without predicates.
+    """
+    assert QueryPlan('correlationId').execute(FRAME) is FRAME
+
+
+def test_execute_matches_sequential_filtering():
+    """
+    Checks if the combined evaluation returns the same rows as applying the
+    filters one after another.
+    """
+    combinations = [
+        {'approach': 'embedded'},
+        {'method': 'get_accounts'},
+        {'approach': 'redirect', 'method': 'get_accounts'},
+        # session 1 contains bank B only on an entry with another approach
+        {'approach': 'embedded', 'bank': 'B'},
+        {'approach': 'redirect', 'method': 'get_accounts', 'bank': 'B'},
+    ]
+    for filters in combinations:
+        expected = _filter_sequentially(FRAME, **filters)
+        result = _create_plan(**filters).execute(FRAME)
+        assert result.index.tolist() == expected.index.tolist(), filters
+
+
+def test_execute_result_independent_of_selectivities():
+    """
+    Checks if the order of evaluation does not change the result.
+    """
+    plan = _create_plan('redirect', 'get_accounts', 'B')
+    expected = plan.execute(FRAME).index.tolist()
+    selectivities = {('bank', 'B'): 0.1, ('approach', 'redirect'): 0.5,
+                     ('method', 'get_accounts'): 0.9}
+    assert [p.field for p in plan.get_ordered_predicates(selectivities)] == \
+        ['approach', 'method', 'bank']
+    assert plan.execute(FRAME, selectivities).index.tolist() == expected
+
+
+def test_execute_scoped_session_predicate_after_row_predicates():
+    """
+    Checks if a scoped session predicate only matches rows satisfying the row
+    predicates even if it is estimated to be more selective.
+    """
+    frame = DataFrame({
+        'correlationId': ['1', '1', '2'],
+        'approach': ['a', 'b', 'a'],
+        'errortype': ['x', 'E', 'E'],
+    })
+    plan = QueryPlan('correlationId')
+    plan.add_row_predicate('approach', 'a')
+    plan.add_session_predicate('errortype', 'E')
+    for selectivities in [{('errortype', 'E'): 0.1, ('approach', 'a'): 0.9},
+                          {('errortype', 'E'): 0.9, ('approach', 'a'): 0.1}]:
+        result = plan.execute(frame, selectivities)
+        assert result['correlationId'].tolist() == ['2'], selectivities
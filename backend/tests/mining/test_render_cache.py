@@ -0,0 +1,54 @@
+"""
+Tests for the render_cache module
+"""
+import json
+import os
+
+import pandas
+
+from process_miner.mining import graphs
+from process_miner.mining.frequencies import count_frequencies
+from process_miner.mining.render_cache import RenderCache, get_cache_key
+
+
+def _count(correlation_ids, labels):
+    frame = pandas.DataFrame({'correlationId': correlation_ids,
+                              'label': labels})
+    return count_frequencies(frame)
+
+
+def test_structure_is_canonical():
+    """
+    Checks if the structure doesn't depend on the order the frequencies were
+    counted in and is JSON serializable.
+    """
+    first = _count(['1', '1', '2', '2'], ['A', 'B', 'C', 'B'])
+    second = _count(['2', '2', '1', '1'], ['C', 'B', 'A', 'B'])
+    first_structure = graphs.get_directly_follows_graph_structure(first)
+    second_structure = graphs.get_directly_follows_graph_structure(second)
+    assert json.dumps(first_structure) == json.dumps(second_structure)
+    assert get_cache_key(first_structure, 'svg') == \
+        get_cache_key(second_structure, 'svg')
+    net_structure = graphs.get_heuristic_net_structure(
+        graphs.mine_heuristic_net(first))
+    assert json.loads(json.dumps(net_structure)) == net_structure
+    assert [node['name'] for node in net_structure['nodes']] == \
+        ['A', 'B', 'C']
+
+
+def test_least_recently_used_graphs_are_evicted(tmp_path):
+    """
+    Checks if the least recently used graphs are removed once the size limit
+    is exceeded.
+    """
+    cache = RenderCache(tmp_path, max_size=20)
+    cache.put('first', b'0123456789')
+    cache.put('second', b'0123456789')
+    # make sure the modification times differ regardless of their resolution
+    os.utime(tmp_path / 'first.bin', ns=(0, 0))
+    os.utime(tmp_path / 'second.bin', ns=(1, 1))
+    assert cache.get('first') == b'0123456789'
+    cache.put('third', b'0123456789')
+    assert cache.get('second') is None
+    assert cache.get('first') == b'0123456789'
+    assert cache.get('third') == b'0123456789'
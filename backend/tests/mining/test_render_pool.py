@@ -0,0 +1,156 @@
+"""
+Tests for the render_pool module
+"""
+import threading
+
+import pandas
+import pytest
+
+from process_miner.mining import graphs
+from process_miner.mining.frequencies import count_frequencies
+from process_miner.mining.render_pool import RenderPool, RenderTimeoutError
+
+
+def test_render_returns_result():
+    """
+    Checks if the result of a job is returned and its time recorded.
+    """
+    pool = RenderPool(workers=1, timeout=5)
+    assert pool.render(lambda: b'<svg/>') == b'<svg/>'
+    metrics = pool.get_metrics()
+    assert metrics['renderTime']['count'] == 1
+    assert metrics['queueDepth'] == 0
+    assert metrics['running'] == 0
+    pool.shutdown()
+
+
+def test_render_times_out():
+    """
+    Checks if a job exceeding the timeout raises an error while its worker
+    stays occupied until the job is finished.
+    """
+    pool = RenderPool(workers=1, timeout=0.1)
+    release = threading.Event()
+    with pytest.raises(RenderTimeoutError):
+        pool.render(lambda: release.wait(5) and b'')
+    metrics = pool.get_metrics()
+    assert metrics['timeouts'] == 1
+    assert metrics['running'] == 1
+    release.set()
+    pool.shutdown()
+    assert pool.get_metrics()['running'] == 0
+
+
+def test_late_result_is_delivered():
+    """
+    Checks if the result of a job exceeding the timeout is still passed to
+    the result handler once it is finished.
+    """
+    pool = RenderPool(workers=1, timeout=0.1)
+    release = threading.Event()
+    results = []
+    with pytest.raises(RenderTimeoutError):
+        pool.render(lambda: release.wait(5) and b'late', 'graph',
+                    results.append)
+    assert not results
+    release.set()
+    pool.shutdown()
+    assert results == [b'late']
+
+
+def test_queue_wait_times_out():
+    """
+    Checks if waiting for a worker is limited by the timeout and the
+    cancelled job is never run.
+    """
+    pool = RenderPool(workers=1, timeout=0.1)
+    release = threading.Event()
+    with pytest.raises(RenderTimeoutError):
+        pool.render(lambda: release.wait(5) and b'')
+    runs = []
+    with pytest.raises(RenderTimeoutError, match='no render worker'):
+        pool.render(lambda: runs.append(1) or b'')
+    metrics = pool.get_metrics()
+    assert metrics['queueDepth'] == 0
+    assert metrics['timeouts'] == 2
+    release.set()
+    pool.shutdown()
+    assert not runs
+
+
+def test_identical_jobs_are_shared():
+    """
+    Checks if a job with the key of a running job waits for its result
+    instead of rendering the graph again.
+    """
+    pool = RenderPool(workers=2, timeout=2)
+    release = threading.Event()
+    started = threading.Event()
+    runs = []
+    results = []
+
+    def _render():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return b'graph'
+    first = threading.Thread(target=lambda: results.append(
+        pool.render(_render, 'graph')))
+    first.start()
+    started.wait(5)
+    # the first job is blocked until the second one joined it
+    threading.Timer(0.2, release.set).start()
+    assert pool.render(_render, 'graph') == b'graph'
+    first.join()
+    assert results == [b'graph']
+    assert runs == [1]
+    assert pool.render(_render, 'graph') == b'graph'
+    assert runs == [1, 1]
+    pool.shutdown()
+
+
+def test_queued_jobs_are_limited():
+    """
+    Checks if jobs exceeding the concurrency limit wait in the queue and
+    their waiting time doesn't count towards the timeout.
+    """
+    pool = RenderPool(workers=1, timeout=2)
+    release = threading.Event()
+    started = threading.Event()
+    results = []
+
+    def _block():
+        started.set()
+        release.wait(5)
+        return b'first'
+    first = threading.Thread(target=lambda: results.append(
+        pool.render(_block)))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: results.append(
+        pool.render(lambda: b'second')))
+    second.start()
+    while pool.get_metrics()['queueDepth'] == 0:
+        second.join(0.01)
+    assert pool.get_metrics()['running'] == 1
+    release.set()
+    first.join()
+    second.join()
+    assert sorted(results) == [b'first', b'second']
+    pool.shutdown()
+
+
+def test_trim_frequencies():
+    """
+    Checks if trimming keeps only the most frequent relations and the
+    activities connected by them.
+    """
+    frame = pandas.DataFrame({
+        'correlationId': ['1', '1', '1', '2', '2', '3', '3'],
+        'label': ['A', 'B', 'C', 'A', 'B', 'D', 'E']})
+    trimmed = graphs.trim_frequencies(count_frequencies(frame), max_edges=1)
+    assert trimmed.dfg == {('A', 'B'): 2}
+    assert trimmed.activities == {'A': 2, 'B': 2}
+    assert trimmed.start_activities == {'A': 2}
+    assert trimmed.end_activities == {'B': 1}
+    assert not trimmed.freq_triples
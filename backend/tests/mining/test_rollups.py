@@ -0,0 +1,76 @@
+"""
+Tests for the rollups module
+"""
+import random
+
+from process_miner.mining.rollups import TimeRollups
+from process_miner.mining.session_summaries import summarize_entries
+
+
+def _summarize(timestamp, bank, errortype='No Error'):
+    return summarize_entries([{'timestamp': timestamp, 'bank': bank,
+                               'errortype': errortype}])
+
+
+def test_get_series():
+    """
+    Checks if sessions are counted in the bucket of their first entry and
+    empty buckets within the range are included.
+    """
+    rollups = TimeRollups()
+    for summary in [_summarize('2020-06-01T10:15:00.000Z', 'BANKX'),
+                    _summarize('2020-06-01T10:45:00.000Z', 'BANKY'),
+                    _summarize('2020-06-01T13:00:00.000Z', 'BANKX'),
+                    _summarize('2020-06-02T09:00:00.000Z', 'BANKX')]:
+        rollups.add(summary)
+    series = rollups.get_series('bank', 'hour', '2020-06-01T10:30:00.000Z',
+                                '2020-06-01T23:00:00.000Z')
+    assert series['buckets'] == ['2020-06-01T10', '2020-06-01T11',
+                                 '2020-06-01T12', '2020-06-01T13']
+    assert series['sessions'] == [2, 0, 0, 1]
+    assert series['values'] == {'BANKX': [1, 0, 0, 1], 'BANKY': [1, 0, 0, 0]}
+    assert series['totals'] == {'BANKX': 2, 'BANKY': 1}
+    series = rollups.get_series('bank', 'day')
+    assert series['buckets'] == ['2020-06-01', '2020-06-02']
+    assert series['totals'] == {'BANKX': 3, 'BANKY': 1}
+    assert series['sessionCount'] == 4
+
+
+def test_remove_sessions():
+    """
+    Checks if removing a session restores the previous counts.
+    """
+    rollups = TimeRollups()
+    first = _summarize('2020-06-01T10:15:00.000Z', 'BANKX')
+    second = _summarize('2020-06-01T11:15:00.000Z', 'BANKY', 'Bad Request')
+    rollups.add(first)
+    expected = rollups.to_json()
+    rollups.add(second)
+    assert rollups.get_series('errortype', 'day')['totals'] == {
+        'No Error': 1, 'Bad Request': 1}
+    rollups.add(second, -1)
+    assert rollups.to_json() == expected
+    assert rollups.get_series('errortype', 'day')['totals'] == {
+        'No Error': 1}
+
+
+def test_range_sums_match_buckets():
+    """
+    Checks if the sums calculated with prefix sums equal the sums of the
+    buckets of random time ranges.
+    """
+    generator = random.Random(0)
+    rollups = TimeRollups()
+    for _ in range(200):
+        rollups.add(_summarize(
+            f'2020-06-{generator.randint(1, 28):02}T'
+            f'{generator.randint(0, 23):02}:00:00.000Z',
+            generator.choice(['BANKX', 'BANKY', 'BANKZ'])))
+    for _ in range(20):
+        days = sorted(generator.sample(range(1, 29), 2))
+        series = rollups.get_series(
+            'bank', 'hour', f'2020-06-{days[0]:02}T05:00:00.000Z',
+            f'2020-06-{days[1]:02}T17:00:00.000Z')
+        assert series['totals'] == {value: sum(counts) for value, counts
+                                    in series['values'].items()}
+        assert series['sessionCount'] == sum(series['sessions'])
@@ -0,0 +1,108 @@
+"""
+Tests for the session_summaries module
+"""
+from process_miner.log_handling.log_catalog import LogCatalog
+from process_miner.mining import metadata
+from process_miner.mining.dataset_factory import DataFilter
+from process_miner.mining.session_summaries import SessionSummaries
+from tests.mining.test_dataset_factory import _create_log_directory
+from tests.mining.test_dfg_cube import _store_entries
+
+NEW_ENTRIES = {
+    '3': [{'timestamp': '2020-01-03T01:00:02.000Z', 'correlationId': '3',
+           'approach': 'redirect', 'method': 'not available', 'label': 'B',
+           'errortype': 'Consent Invalid', 'bank': 'BANKX', 'message': 'B'}],
+    '4': [{'timestamp': '2020-01-04T01:00:00.000Z', 'correlationId': '4',
+           'approach': 'embedded', 'method': 'not available', 'label': 'A',
+           'errortype': 'No Error', 'bank': 'ADORSYS', 'message': 'A'}]
+}
+
+
+def _assert_counts_match(summaries, factory):
+    frame = factory.get_filtered_data_frame(DataFilter())
+    counts = summaries.get_counts()
+    assert counts.approach_counts == metadata.get_approach_type_count(frame)
+    assert counts.method_counts_per_approach == \
+        metadata.get_method_type_count_per_approach(frame)
+
+
+def test_rebuild(tmp_path):
+    """
+    Checks if the summaries and counts built from the stored logs match the
+    log entries.
+    """
+    factory = _create_log_directory(tmp_path)
+    summaries = SessionSummaries(tmp_path)
+    assert not summaries.is_current()
+    summaries.rebuild()
+    assert SessionSummaries(tmp_path).is_current()
+    assert summaries.get_summaries()['2'] == {
+        'approach': ['redirect'],
+        'method': ['get_transactions', 'not available'],
+        'bank': ['BANKX'],
+        'errortype': ['Consent Invalid'],
+        'status': [],
+        'start': '2020-01-02T01:00:00.000Z',
+        'end': '2020-01-02T01:00:05.000Z',
+        'rows': 2,
+        'last': {'label': 'C', 'approach': 'redirect', 'bank': 'BANKX'}
+    }
+    _assert_counts_match(summaries, factory)
+    assert factory.get_metadata_counts(DataFilter()).approach_counts == {
+        'embedded': 2, 'redirect': 1}
+    assert factory.get_metadata_counts(
+        DataFilter(start='2020-01-02T00:00:00.000Z')) is None
+
+
+def test_update_with_stored_entries(tmp_path):
+    """
+    Checks if new entries are merged into the summaries and counts without
+    rebuilding them.
+    """
+    factory = _create_log_directory(tmp_path)
+    summaries = SessionSummaries(tmp_path)
+    summaries.rebuild()
+    for session, entries in NEW_ENTRIES.items():
+        _store_entries(tmp_path, f'{session}-new.csv', entries)
+    summaries.update(NEW_ENTRIES)
+    assert summaries.is_current()
+    assert summaries.get_summaries()['3']['approach'] == \
+        ['embedded', 'redirect']
+    assert summaries.get_summaries()['3']['rows'] == 2
+    _assert_counts_match(summaries, factory)
+    rollups = summaries.get_rollups().to_json()
+    latencies = summaries.get_latencies().to_json()
+    distinct = summaries.get_distinct_counts().count('approach')
+    summaries.rebuild()
+    assert summaries.get_rollups().to_json() == rollups
+    assert summaries.get_latencies().to_json() == latencies
+    assert summaries.get_distinct_counts().count('approach') == distinct
+    # entries that weren't passed to the update result in a rebuild
+    _store_entries(tmp_path, '5.csv', [
+        {**NEW_ENTRIES['4'][0], 'correlationId': '5'}])
+    summaries.update({})
+    assert '5' in summaries.get_summaries()
+    _assert_counts_match(summaries, factory)
+
+
+def test_uncataloged_logs(tmp_path):
+    """
+    Checks if the summaries aren't current while stored logs are missing
+    from the catalog and count them once they are cataloged.
+    """
+    factory = _create_log_directory(tmp_path)
+    summaries = SessionSummaries(tmp_path)
+    _store_entries(tmp_path, '4.csv', NEW_ENTRIES['4'])
+    catalog = LogCatalog(tmp_path)
+    del catalog.get_entries()['4.csv']
+    catalog.save()
+    summaries.rebuild()
+    assert '4' not in summaries.get_summaries()
+    assert not summaries.is_current()
+    assert factory.get_metadata_counts(DataFilter()) is None
+    catalog.add_untracked_files('*.csv')
+    summaries.rebuild()
+    assert summaries.is_current()
+    _assert_counts_match(summaries, factory)
+    assert factory.get_metadata_counts(DataFilter()).approach_counts == {
+        'embedded': 3, 'redirect': 1}
@@ -0,0 +1,55 @@
+"""
+Tests for the sharding module
+"""
+import pandas
+
+from process_miner.mining.frequencies import count_frequencies
+from process_miner.mining.sharding import ShardedFrequencyCounter
+from process_miner.mining.variants import compute_variants
+
+
+def test_count_merges_shards():
+    """
+    Checks if the merged frequencies of all shards equal the frequencies of
+    the complete DataFrame.
+    """
+    labels = ['A', 'B', 'C', 'B', 'A', 'C', 'C']
+    frame = pandas.DataFrame({
+        'correlationId': [str(i % 5) for i in range(700)],
+        'label': [labels[(i * 3 + i // 5) % len(labels)] for i in range(700)]
+    })
+    counter = ShardedFrequencyCounter(2, min_shard_rows=100)
+    try:
+        assert vars(counter.count(frame)) == vars(count_frequencies(frame))
+    finally:
+        counter.shutdown()
+
+
+def test_count_single_worker():
+    """
+    Checks if frequencies are counted without worker processes by default.
+    """
+    frame = pandas.DataFrame({'correlationId': ['1', '1'],
+                              'label': ['A', 'B']})
+    counter = ShardedFrequencyCounter()
+    assert counter.count(frame).dfg == {('A', 'B'): 1}
+
+
+def test_count_variants_merges_shards():
+    """
+    Checks if the merged weighted frequencies of all variant shards equal the
+    frequencies of the complete DataFrame.
+    """
+    labels = ['A', 'B', 'C', 'B', 'A', 'C', 'C']
+    frame = pandas.DataFrame({
+        'correlationId': [str(i % 50) for i in range(700)],
+        'label': [labels[(i // 50 + i % 7) % len(labels)]
+                  for i in range(700)]
+    })
+    variants = compute_variants(frame)
+    counter = ShardedFrequencyCounter(2, min_shard_rows=40)
+    try:
+        assert vars(counter.count_variants(variants)) == \
+            vars(count_frequencies(frame))
+    finally:
+        counter.shutdown()
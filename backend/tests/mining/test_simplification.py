@@ -0,0 +1,54 @@
+"""
+Tests for the simplification module
+"""
+import pandas
+
+from process_miner.mining.frequencies import count_frequencies
+from process_miner.mining.simplification import Simplification, \
+    simplify_frequencies
+
+
+def _create_frequencies():
+    return count_frequencies(pandas.DataFrame({
+        'correlationId': ['1', '1', '1', '2', '2', '2', '3', '3', '4'],
+        'label': ['A', '_else_', 'B', 'A', '_else_', 'B', 'A', 'C', 'D']}))
+
+
+def test_simplify_without_parameters():
+    """
+    Checks if the default simplification keeps the frequencies unchanged.
+    """
+    frequencies = _create_frequencies()
+    simplified, report = simplify_frequencies(frequencies, Simplification())
+    assert vars(simplified) == vars(frequencies)
+    assert report == {'activities': [], 'edges': 0}
+
+
+def test_simplify_excluded_activities():
+    """
+    Checks if excluded activities and their relations are removed.
+    """
+    simplified, report = simplify_frequencies(
+        _create_frequencies(), Simplification(excluded_activities=('_else_',)))
+    assert simplified.dfg == {('A', 'C'): 1}
+    # B lost all of its relations while D never had any
+    assert simplified.activities == {'A': 3, 'C': 1, 'D': 1}
+    assert simplified.end_activities == {'C': 1, 'D': 1}
+    assert not simplified.freq_triples
+    assert report == {'activities': ['B', '_else_'], 'edges': 2}
+
+
+def test_simplify_frequency_thresholds():
+    """
+    Checks if rare activities and relations are removed and only the most
+    frequent relations are kept.
+    """
+    frequencies = _create_frequencies()
+    simplified, report = simplify_frequencies(
+        frequencies, Simplification(min_activity_frequency=2))
+    assert simplified.dfg == {('A', '_else_'): 2, ('_else_', 'B'): 2}
+    assert report == {'activities': ['C', 'D'], 'edges': 1}
+    simplified, _ = simplify_frequencies(
+        frequencies, Simplification(min_edge_frequency=2, max_edges=1))
+    assert simplified.dfg == {('A', '_else_'): 2}
+    assert set(simplified.activities) == {'A', '_else_', 'D'}
@@ -0,0 +1,68 @@
+"""
+Tests for the sketches module
+"""
+import random
+
+import numpy
+
+from process_miner.mining.sketches import HyperLogLog, QuantileSketch
+
+
+def test_quantiles_within_relative_accuracy():
+    """
+    Checks if the estimated quantiles are within the relative accuracy of the
+    exact quantiles.
+    """
+    rng = random.Random(0)
+    values = [rng.lognormvariate(0, 2) for _ in range(10000)]
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    assert sketch.count == len(values)
+    for quantile in [0.01, 0.5, 0.95, 0.99]:
+        exact = numpy.quantile(values, quantile, method='lower')
+        assert abs(sketch.quantile(quantile) - exact) <= 0.01 * exact
+    assert len(sketch.bins) < 2000
+
+
+def test_merge_and_remove():
+    """
+    Checks if merging sketches equals adding all values to one sketch and
+    removed values no longer influence the quantiles.
+    """
+    first, second, combined = QuantileSketch(), QuantileSketch(), \
+        QuantileSketch()
+    for value in range(100):
+        (first if value % 2 else second).add(value)
+        combined.add(value)
+    first.merge(second)
+    assert first.count == combined.count
+    assert first.bins == combined.bins
+    assert first.zero_count == combined.zero_count == 1
+    for value in range(50, 100):
+        first.add(value, -1)
+    assert first.count == 50
+    assert abs(first.quantile(1) - 49) <= 0.49
+    restored = QuantileSketch.from_json(first.to_json())
+    assert restored.quantile(0.5) == first.quantile(0.5)
+
+
+def test_distinct_count_within_error_bound():
+    """
+    Checks if the estimated numbers of distinct items are within three
+    standard errors and merged sketches estimate the size of the union.
+    """
+    first, second = HyperLogLog(), HyperLogLog()
+    for item in range(20000):
+        first.add(f'session-{item}')
+        # adding items again doesn't change the estimate
+        first.add(f'session-{item}')
+        second.add(f'session-{item + 10000}')
+    error = 3 * first.standard_error
+    assert abs(first.count() - 20000) <= error * 20000
+    first.merge(second)
+    assert abs(first.count() - 30000) <= error * 30000
+    restored = HyperLogLog.from_json(first.to_json())
+    assert (restored.registers == first.registers).all()
+    assert restored.count() == first.count()
+    assert HyperLogLog().count() == 0
@@ -0,0 +1,77 @@
+"""
+Tests for the variants module
+"""
+import pandas
+
+from process_miner.mining import metadata
+from process_miner.mining.frequencies import count_frequencies
+from process_miner.mining.variants import compute_variants
+from tests.mining.test_frequencies import _read_mockdata
+
+
+def _create_sessions():
+    rows = []
+    for session, (labels, bank) in enumerate([
+            (['A', 'B', 'C'], 'BANKX'), (['A', 'C'], 'BANKY'),
+            (['A', 'B', 'C'], 'BANKY'), (['A', 'B', 'C'], 'BANKX'),
+            (['B'], 'not available')]):
+        for label in labels:
+            rows.append({'correlationId': f'session {session}',
+                         'label': label, 'approach': 'embedded',
+                         'method': 'get_accounts', 'bank': bank,
+                         'errortype': 'No Error'})
+    # interleave the sessions like the timestamp sorted stored logs
+    return pandas.DataFrame(rows).sample(frac=1, random_state=0) \
+        .sort_values('correlationId', key=lambda ids: ids.str[-1] == '0',
+                     kind='stable')
+
+
+def test_compute_variants():
+    """
+    Checks if sessions with the same activities are combined to a variant.
+    """
+    frame = pandas.DataFrame({
+        'correlationId': ['1', '2', '1', '2', '3'],
+        'label': ['A', 'A', 'B', 'B', 'A']})
+    variants = compute_variants(frame)
+    assert variants.variants == [('A', 'B'), ('A',)]
+    assert variants.sessions == [['1', '2'], ['3']]
+    assert variants.counts == [2, 1]
+    assert variants.session_count == 3
+
+
+def test_variant_frequencies_match_sessions():
+    """
+    Checks if the weighted frequencies of the variants equal the frequencies
+    counted on all entries.
+    """
+    for frame in [_read_mockdata(), _create_sessions()]:
+        expected = count_frequencies(frame)
+        frequencies = compute_variants(frame).count_frequencies()
+        assert vars(frequencies) == vars(expected)
+
+
+def test_session_values_match_metadata():
+    """
+    Checks if the metadata counted from the session values equals the
+    metadata counted from all entries.
+    """
+    frame = _create_sessions()
+    session_values = compute_variants(frame).session_values
+    assert len(session_values) < len(frame)
+    for extract in [metadata.get_sessions_per_bank,
+                    metadata.get_sessions_per_method_type,
+                    metadata.get_sessions_per_error_type,
+                    metadata.get_method_type_count_per_approach,
+                    metadata.get_approach_type_count]:
+        assert extract(session_values) == extract(frame)
+
+
+def test_compute_variants_empty():
+    """
+    Checks if an empty DataFrame results in no variants.
+    """
+    variants = compute_variants(pandas.DataFrame(
+        columns=['correlationId', 'label']))
+    assert not variants.variants
+    assert not variants.count_frequencies().dfg